@@ -16,6 +16,7 @@ import logging
 import os
 import runpy
 import sys
+import threading
 
 # This is ConfigParser pre-Python3
 if sys.version_info < (3,):
@@ -26,11 +27,18 @@ else:
 from debtcollector import removals
 
 from a10_neutron_lbaas import a10_exceptions as a10_ex
+from a10_neutron_lbaas import device_registry
+from a10_neutron_lbaas import name_expressions
+from a10_neutron_lbaas import vport_rules
 from a10_neutron_lbaas.etc import config as blank_config
 from a10_neutron_lbaas.etc import defaults
 
 LOG = logging.getLogger(__name__)
 
+_lock = threading.Lock()
+_shared = {}
+_neutron_confs = {}
+
 
 class ConfigModule(object):
     def __init__(self, d, provider=None):
@@ -55,10 +63,14 @@ class ConfigModule(object):
 
 class A10Config(object):
 
-    def __init__(self, config_dir=None, config=None, provider=None):
+    def __init__(self, config_dir=None, config=None, provider=None, previous=None):
+        """previous is the A10Config this one replaces on a reload; derived
+        structures for the parts that didn't change are taken from it.
+        """
+
         if config is not None:
             self._config = config
-            self._load_config()
+            self._load_config(previous)
             return
 
         self._config_dir = self._find_config_dir(config_dir)
@@ -70,9 +82,10 @@ class A10Config(object):
             LOG.error("A10Config could not find %s", self._config_path)
             self._config = blank_config
 
-        self._load_config()
+        self._load_config(previous)
 
-    def _find_config_dir(self, config_dir):
+    @staticmethod
+    def _find_config_dir(config_dir):
         # Look for config in the virtual environment
         # virtualenv puts the original prefix in sys.real_prefix
         # pyenv puts it in sys.base_prefix
@@ -93,7 +106,7 @@ class A10Config(object):
 
         return d
 
-    def _load_config(self):
+    def _load_config(self, previous=None):
         # Global defaults
         for dk, dv in defaults.GLOBAL_DEFAULTS.items():
             if not hasattr(self._config, dk):
@@ -137,6 +150,9 @@ class A10Config(object):
 
                 LOG.debug("A10Config, device %s=%s", k, self._devices[k])
 
+                if previous is not None and previous._devices.get(k) == self._devices[k]:
+                    self._devices[k] = previous._devices[k]
+
         self._vthunder = None
 
         if hasattr(self._config, 'vthunder'):
@@ -189,6 +205,32 @@ class A10Config(object):
         if hasattr(self._config, "monitor_expressions"):
             self._monitor_expressions = self._config.monitor_expressions
 
+        if previous is not None:
+            # Unchanged tables keep their old objects, and with them their
+            # compiled matchers and memos
+            for attr in ('_vport_defaults', '_vport_expressions',
+                         '_virtual_server_expressions', '_service_group_expressions',
+                         '_member_expressions', '_monitor_expressions'):
+                if getattr(self, attr) == getattr(previous, attr):
+                    setattr(self, attr, getattr(previous, attr))
+
+        self._name_matchers = [
+            previous.get_name_matcher(x) if previous is not None
+            else name_expressions.NameMatcher(x)
+            for x in (self._vport_expressions, self._virtual_server_expressions,
+                      self._service_group_expressions, self._member_expressions,
+                      self._monitor_expressions)]
+
+        # Compile vport_defaults conditions now, so bad ones fail at startup.
+        # Always a new VportRules: the previous config may still be pinned
+        # by requests in flight, and layer() would change it under them.
+        self._vport_rules = vport_rules.VportRules()
+        self._vport_rules.layer(self._vport_defaults)
+        for d in list(self._devices.values()) + [self._vthunder or {}]:
+            self._vport_rules.layer(d.get('vport_defaults') or {})
+        for v in self._vport_expressions.values():
+            self._vport_rules.layer(v.get('json') or {})
+
         # self._vlan_interfaces = {}
         # if hasattr(self._config, "vlan_interfaces"):
         #    self._vlan_interfaces = self._config.vlan_interfaces
@@ -204,6 +246,9 @@ class A10Config(object):
         # Setup some backwards compat stuff
         self.config = OldConfig(self)
 
+        if previous is not None:
+            device_registry.reconfigure(self)
+
     # We don't use oslo.config here, in a weak attempt to avoid pulling in all
     # the many openstack dependencies. If this proves problematic, we should
     # shoot this manual parser in the head and just use the global config
@@ -212,10 +257,8 @@ class A10Config(object):
         neutron_conf_dir = os.environ.get('NEUTRON_CONF_DIR', self._config.neutron_conf_dir)
         neutron_conf = '%s/neutron.conf' % neutron_conf_dir
 
-        if os.path.exists(neutron_conf):
-            LOG.debug("found neutron.conf file in /etc")
-            n = ini.ConfigParser()
-            n.read(neutron_conf)
+        n = _read_neutron_conf(neutron_conf)
+        if n is not None:
             try:
                 return n.get(section, option)
             except (ini.NoSectionError, ini.NoOptionError):
@@ -239,29 +282,41 @@ class A10Config(object):
         if self.get('use_database'):
             from a10_neutron_lbaas.db import models
 
+            cache = device_registry.get_cache(self)
+            device = cache.get(device_name)
+            if device is not None:
+                return device
+
             instance = models.A10DeviceInstance.find_by(name=device_name, db_session=db_session)
             if instance is not None:
-                self._devices[device_name] = instance.as_dict()
-                return self._devices[device_name]
+                device = instance.as_dict()
+                cache.put(device_name, device)
+                return device
         return None
 
-    # TODO(dougwig) -- later - use of this method should be considered a scalability killer
     def get_devices(self, db_session=None):
         if self.get('use_database'):
-            from a10_neutron_lbaas.db import models
-
             d = dict(self._devices.items())
-            for x in models.A10DeviceInstance.find_all():
-                d[x.name] = x.as_dict()
+            d.update(device_registry.get_registry(self).devices(db_session=db_session))
             return d
         return self._devices
 
+    def invalidate_devices(self, device_id=None):
+        """Tell get_device(s) that a device instance was created, updated or deleted."""
+
+        if self.get('use_database'):
+            device_registry.get_registry(self).invalidate(device_id)
+            device_registry.get_cache(self).evict(device_id)
+
     def get_vthunder_config(self):
         return self._vthunder
 
     def get_vport_defaults(self):
         return self._vport_defaults
 
+    def get_vport_rules(self):
+        return self._vport_rules
+
     def get_vport_expressions(self):
         return self._vport_expressions
 
@@ -277,6 +332,14 @@ class A10Config(object):
     def get_monitor_expressions(self):
         return self._monitor_expressions
 
+    def get_name_matcher(self, expressions):
+        """The NameMatcher for one of the *_expressions tables."""
+
+        for m in self._name_matchers:
+            if m.expressions is expressions:
+                return m
+        return name_expressions.NameMatcher(expressions)
+
     # backwards compat
     @removals.remove
     @property
@@ -299,6 +362,44 @@ class A10Config(object):
         return self.config.verify_appliances
 
 
+def _read_neutron_conf(path):
+    """Parsed neutron.conf, reparsed only when the file changes."""
+
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+
+    with _lock:
+        cached = _neutron_confs.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    LOG.debug("found neutron.conf file in %s", path)
+    n = ini.ConfigParser()
+    n.read(path)
+    with _lock:
+        _neutron_confs[path] = (mtime, n)
+    return n
+
+
+def get_config(config_dir=None, provider=None):
+    """The A10Config shared by everything in this process that reads config_dir.
+
+    Use this instead of A10Config() anywhere that would otherwise load
+    config.py over and over, such as once per API request.
+    """
+
+    key = (A10Config._find_config_dir(config_dir), provider)
+    with _lock:
+        config = _shared.get(key)
+    if config is None:
+        config = A10Config(config_dir=key[0], provider=provider)
+        with _lock:
+            config = _shared.setdefault(key, config)
+    return config
+
+
 # backwards compat
 class OldConfig(object):
 
@@ -12,14 +12,19 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import logging
+import threading
+import time
 
 import acos_client.errors as acos_errors
 
-from a10_neutron_lbaas.vthunder import keystone as keystone_helpers
+from a10_neutron_lbaas.db import api as db_api
 
 LOG = logging.getLogger(__name__)
 
+_batch = threading.local()
+
 
 class A10Context(object):
 
@@ -36,6 +41,7 @@ class A10Context(object):
         LOG.debug("A10Context obj=%s", openstack_lbaas_obj)
         LOG.debug("A10Context action=%s", self.action)
         self.partition_name = "shared"
+        self.batch = None
 
     def _get_device(self):
         if self.device_name:
@@ -47,29 +53,203 @@ class A10Context(object):
         return d
 
     def _get_client(self, device_cfg):
-        return self.a10_driver._get_a10_client(device_cfg, action=self.action)
+        return self.a10_driver.session_pool.acquire(device_cfg, action=self.action)
+
+    def _release_client(self, exc_value):
+        self.a10_driver.session_pool.release(self.device_cfg, self.client, exc_value)
 
     def __enter__(self):
+        # Hold on to one config snapshot for the whole operation
+        self.a10_driver.pin_config()
+        # ... and one database session for device, binding and partition
+        # selection, committed before the body. Holding it across AXAPI
+        # calls, write memory and ha sync would tie up a pooled connection
+        # and keep an old snapshot open for seconds.
+        self.db_session = None
+        try:
+            if self.a10_driver.config.get('use_database'):
+                self.db_session = db_api.begin_request()
+            rv = self._enter()
+        except Exception as e:
+            self._end_db_session(e)
+            self.a10_driver.unpin_config()
+            raise
+
+        try:
+            self._end_db_session(None)
+        except Exception as e:
+            # Give back the session and slot _enter took
+            try:
+                self._exit(e)
+            finally:
+                self.a10_driver.unpin_config()
+            raise
+        return rv
+
+    def _end_db_session(self, exc_value):
+        # Commits the operation's lookups and writes, or rolls them back
+        if self.db_session is not None:
+            self.db_session = None
+            db_api.end_request(exc_value)
+
+    def _enter(self):
+        self._started = time.time()
         self.get_tenant_id()
-        self.device_cfg = self._get_device()
-        self.client = self._get_client(self.device_cfg)
-        self.get_partition_key()
-        self.select_appliance_partition()
-        if hasattr(self.hooks, 'after_select_partition'):
-            self.hooks.after_select_partition(self)
+        if self._join_batch(getattr(_batch, 'current', None)):
+            self._entered = time.time()
+            return self
+
+        with self.timed('device'):
+            self.device_cfg = self._get_device()
+        with self.timed('queue'):
+            self.a10_driver.concurrency.acquire(self.device_cfg)
+
+        self.client = None
+        breaker = self.a10_driver.circuit_breaker
+        try:
+            self.a10_driver.health.before(self.device_cfg)
+            with breaker.guard(self.device_cfg):
+                with self.timed('client'):
+                    self.client = self._get_client(self.device_cfg)
+                    # A pooled session is already logged in, and asks nothing of the device
+                    login = getattr(self.client.session, 'session_id', None) is None
+                    # Log in here, so the login isn't billed to whatever runs first
+                    self.client.session.id
+                if login:
+                    breaker.success(self.device_cfg)
+                with self.timed('partition_key'):
+                    self.get_partition_key()
+                with self.timed('partition'):
+                    self.select_appliance_partition()
+                if hasattr(self.hooks, 'after_select_partition'):
+                    self.hooks.after_select_partition(self)
+        except Exception as e:
+            # __exit__ won't run, so give back what we took
+            if self.client is not None:
+                self._release_client(e)
+            self.a10_driver.concurrency.release(self.device_cfg)
+            raise
+
+        self._entered = time.time()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         try:
-            self.client.session.close()
-        except acos_errors.InvalidSessionID:
-            pass
+            self._exit(exc_value)
+        except Exception as e:
+            self._end_db_session(exc_value or e)
+            raise
+        else:
+            self._end_db_session(exc_value)
+        finally:
+            self.a10_driver.unpin_config()
+
+        if exc_type is not None:
+            return False
+
+    @contextlib.contextmanager
+    def exit_after(self, exit_func, exc_type, exc_value, traceback):
+        """Run the block, then exit_func, the parent class's __exit__.
+
+        If the block raises (a write memory, say), exit_func still runs, and
+        sees that error, so the session, slot and config pin are given back.
+        """
+
+        try:
+            yield
+        except Exception as e:
+            exit_func(type(e), e, None)
+            raise
+        exit_func(exc_type, exc_value, traceback)
+
+    def _exit(self, exc_value):
+        self.end_body()
+        if self.batch is None:
+            # The slot and the client go back whatever else fails here;
+            # a lost slot is lost for good
+            try:
+                try:
+                    # A body that got this far without a connection error heard back
+                    self.a10_driver.circuit_breaker.record(self.device_cfg, exc_value)
+                finally:
+                    self._release_client(exc_value)
+            finally:
+                self.a10_driver.concurrency.release(self.device_cfg)
 
         if hasattr(self.hooks, 'a10_context_exit_final'):
             self.hooks.a10_context_exit_final(self)
 
-        if exc_type is not None:
+        self.record_phase('total', time.time() - self._started)
+        self.a10_driver.metrics.maybe_dump()
+
+    def _join_batch(self, batch):
+        """Borrow the session and partition of an A10BatchContext in progress.
+
+        Only objects of the same tenant (and device, if one was named) join;
+        anything else gets its own session as usual.
+        """
+
+        if batch is None or batch.a10_driver is not self.a10_driver:
             return False
+        if batch.tenant_id != self.tenant_id:
+            return False
+        if self.device_name and self.device_name != batch.device_cfg.get('name'):
+            return False
+
+        self.batch = batch
+        self.device_cfg = batch.device_cfg
+        self.client = batch.client
+        self.partition_key = batch.partition_key
+        self.partition_name = batch.partition_name
+        return True
+
+    def report_status(self, success, on_success, on_failure):
+        """Tell neutron how the operation went, after its write memory.
+
+        Inside a batch, the report waits for the batch to finish.
+        """
+
+        if self.batch is not None:
+            self.batch.deferred_status.append((self, success, on_success, on_failure))
+            return
+
+        if success:
+            # Don't report ACTIVE until the write memory covering it is done
+            try:
+                self.write_memory()
+            except Exception:
+                with self.timed('status'):
+                    on_failure()
+                raise
+        with self.timed('status'):
+            (on_success if success else on_failure)()
+
+    @contextlib.contextmanager
+    def timed(self, phase):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record_phase(phase, time.time() - start)
+
+    def end_body(self):
+        """Record the handler body phase; called once, at the top of __exit__."""
+
+        if getattr(self, '_entered', None) is not None:
+            self.record_phase('body', time.time() - self._entered)
+            self._entered = None
+
+    def record_phase(self, phase, elapsed):
+        device_cfg = getattr(self, 'device_cfg', None) or {}
+        tags = {
+            'handler': self.handler.__class__.__name__,
+            'action': self.action,
+            'device': device_cfg.get('name', device_cfg.get('host')),
+            'partition': self.partition_name,
+        }
+        self.a10_driver.metrics.observe(phase, elapsed, tags)
+        if hasattr(self.hooks, 'a10_context_phase_timing'):
+            self.hooks.a10_context_phase_timing(self, phase, elapsed, tags)
 
     def get_tenant_id(self):
         if hasattr(self.openstack_lbaas_obj, 'tenant_id'):
@@ -81,54 +261,134 @@ class A10Context(object):
         # If use_parent_project is enabled, return that. Else, typical behavior.
         self.partition_key = self.tenant_id
         if self.a10_driver.config.get("use_parent_project") and self.openstack_context:
-            # Hoping we can avoid making this call but I don't think thats possible
-            keystone_context = keystone_helpers.KeystoneFromContext(self.a10_driver.config,
-                                                                    self.openstack_context)
-            thisproject = keystone_context.client.projects.get(self.tenant_id)
-            if not thisproject.parent_id == thisproject.domain_id:
-                self.partition_key = thisproject.parent_id
+            parent_id = self.a10_driver.projects.parent(self.openstack_context, self.tenant_id)
+            if parent_id is not None:
+                self.partition_key = parent_id
 
     def select_appliance_partition(self):
-        self.get_partition_key()
-
         name = self.device_cfg.get("shared_partition", "shared")
 
         if self.device_cfg['v_method'].lower() == 'adp':
             name = self.partition_key[0:13]
 
-        # If we are not using appliance partitions, we are done.
+        # If we are not using appliance partitions, we are done; but a pooled
+        # session may still be sitting in the partition its last user picked.
         if name == 'shared':
+            if self.client.current_partition != 'shared':
+                self.client.system.partition.active(name)
             return
 
         self.partition_name = name
 
+        # The client skips the activate if its session is already there
         try:
             self.client.system.partition.active(name)
             return
         except acos_errors.NotFound:
             pass
 
-        # Create it if not found
-        self.hooks.partition_create(self.client, self.openstack_context, name)
+        # Create it if not found; another worker may beat us to it
+        try:
+            self.hooks.partition_create(self.client, self.openstack_context, name)
+        except acos_errors.Exists:
+            LOG.debug("A10Context: partition %s was created meanwhile", name)
         self.client.system.partition.active(name)
 
 
 class A10WriteContext(A10Context):
 
     def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None and self.device_cfg.get('write_memory', True):
+        self.end_body()
+        with self.exit_after(super(A10WriteContext, self).__exit__,
+                             exc_type, exc_value, traceback):
+            if exc_type is None:
+                self.write_memory()
+
+    def write_memory(self):
+        # Status contexts call this before reporting success; only write once.
+        # Batched contexts leave it to the batch.
+        if getattr(self, "memory_written", False) or self.batch is not None:
+            return
+        self.memory_written = True
+
+        if not self.device_cfg.get('write_memory', True):
+            return
+
+        partition_deleted = getattr(self, "partition_deleted", False)
+        partition_name = None if partition_deleted else self.partition_name
+
+        def flush():
             try:
-                partition_deleted = getattr(self, "partition_deleted", False)
-                partition_name = None if partition_deleted else self.partition_name
                 self.client.system.action.activate_and_write(partition_name)
-
             except acos_errors.InvalidSessionID:
                 pass
 
-            for v in self.device_cfg.get('ha_sync_list', []):
-                self.client.ha.sync(v['ip'], v['username'], v['password'])
+        with self.timed('write_memory'):
+            self.a10_driver.write_scheduler.write(self.device_cfg, partition_name, flush)
+        with self.timed('ha_sync'):
+            self.a10_driver.ha_sync.sync(self.device_cfg, self.client)
+
+
+class A10BatchContext(A10WriteContext):
+    """Runs several handler operations as one.
+
+        with a10_context.A10BatchContext(handler, context, loadbalancer):
+            driver.listener.update(context, old_listener, listener)
+            driver.pool.create(context, pool)
+
+    Contexts opened on this thread for the same tenant while the batch is
+    active reuse its session and partition, and skip their own write
+    memory. When the batch exits without an error, it runs any partition
+    cleanup the deletes asked for, does a single write memory and then
+    reports each object's status to neutron. If the batch fails, objects
+    that completed are reported as failed too, since nothing was saved.
+    """
 
-        super(A10WriteContext, self).__exit__(exc_type, exc_value, traceback)
+    def __enter__(self):
+        self.deferred_status = []
+        self.deferred_cleanup = []
+        super(A10BatchContext, self).__enter__()
+        if self.batch is None:
+            _batch.current = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.batch is not None:
+            return super(A10BatchContext, self).__exit__(exc_type, exc_value, traceback)
+
+        _batch.current = None
+        self.end_body()
+        success = exc_type is None
+        with self.exit_after(super(A10BatchContext, self).__exit__,
+                             exc_type, exc_value, traceback):
+            try:
+                if success:
+                    self._partition_cleanup()
+                    self.write_memory()
+            except Exception:
+                success = False
+                raise
+            finally:
+                self._report_deferred(success)
+
+    def _partition_cleanup(self):
+        for c in self.deferred_cleanup:
+            c.partition_deleted = False
+            c.partition_cleanup_check()
+            if c.partition_deleted:
+                self.partition_deleted = True
+                break
+
+    def _report_deferred(self, batch_success):
+        for c, success, on_success, on_failure in self.deferred_status:
+            try:
+                with c.timed('status'):
+                    if success and batch_success:
+                        on_success()
+                    else:
+                        on_failure()
+            except Exception:
+                LOG.exception("A10BatchContext: status report failed; continuing")
 
 
 class A10ReplayContext(A10WriteContext):
@@ -143,6 +403,13 @@ class A10ReplayContext(A10WriteContext):
     def _get_client(self, device_cfg):
         return self._appliance.client(self, device_cfg, action=self.action)
 
+    def _release_client(self, exc_value):
+        # Replay clients belong to the appliance, not the session pool
+        try:
+            self.client.session.close()
+        except acos_errors.InvalidSessionID:
+            pass
+
 
 # class A10WriteStatusContext(A10WriteContext):
 
@@ -161,13 +428,26 @@ class A10ReplayContext(A10WriteContext):
 class A10DeleteContextBase(A10WriteContext):
 
     def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None:
-            # self.openstack_manager.db_delete(self.openstack_context,
-            #                                  self.openstack_lbaas_obj.id)
-            self.partition_deleted = False
-            self.partition_cleanup_check()
-
-        super(A10DeleteContextBase, self).__exit__(exc_type, exc_value, traceback)
+        self.end_body()
+        with self.exit_after(super(A10DeleteContextBase, self).__exit__,
+                             exc_type, exc_value, traceback):
+            if exc_type is None:
+                # self.openstack_manager.db_delete(self.openstack_context,
+                #                                  self.openstack_lbaas_obj.id)
+                if self.batch is not None:
+                    self.batch.deferred_cleanup.append(self)
+                else:
+                    self.partition_deleted = False
+                    self.partition_cleanup_check()
+                # After the cleanup, so the write memory before it covers the partition
+                callbacks = self.status_callbacks()
+                if callbacks is not None:
+                    self.report_status(True, *callbacks)
+
+    def status_callbacks(self):
+        """(on_success, on_failure) that tell neutron about the delete, or None."""
+
+        return None
 
     def remaining_root_objects(self):
         return 1
@@ -177,7 +457,6 @@ class A10DeleteContextBase(A10WriteContext):
 
         if self.device_cfg['v_method'].lower() != 'adp':
             return
-        self.get_partition_key()
         n = self.remaining_root_objects()
         LOG.debug("A10DeleteContext.partition_cleanup_check(): n=%s" % (n))
         if n == 0 and not self.a10_driver.config.get("disable_partition_delete"):
@@ -73,6 +73,14 @@ class NoDevicesAvailableError(Exception):
     pass
 
 
+class DeviceUnavailable(Exception):
+    pass
+
+
+class DeviceBusy(Exception):
+    pass
+
+
 class NotImplemented(Exception):
     pass
 
@@ -12,11 +12,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
 import logging
 
 import acos_client
 
 from a10_neutron_lbaas import a10_config
+from a10_neutron_lbaas.acos import ha_sync
+from a10_neutron_lbaas.acos import write_memory
+from a10_neutron_lbaas.client_proxies import circuit_breaker
+from a10_neutron_lbaas.client_proxies import concurrency
+from a10_neutron_lbaas.client_proxies import health
+from a10_neutron_lbaas.client_proxies import retry
+from a10_neutron_lbaas.client_proxies import session_pool
+from a10_neutron_lbaas import config_manager
+from a10_neutron_lbaas import metrics
 from a10_neutron_lbaas import monkey_patch
 from a10_neutron_lbaas import version
 
@@ -31,6 +41,7 @@ from a10_neutron_lbaas.v2 import handler_lb as v2_handler_lb
 from a10_neutron_lbaas.v2 import handler_listener as v2_handler_listener
 from a10_neutron_lbaas.v2 import handler_member as v2_handler_member
 from a10_neutron_lbaas.v2 import handler_pool as v2_handler_pool
+from a10_neutron_lbaas.vthunder import keystone
 
 logging.basicConfig()
 LOG = logging.getLogger(__name__)
@@ -51,10 +62,20 @@ class A10OpenstackLBBase(object):
         self.neutron = neutron_hooks_module
         self.barbican_client = barbican_client
         self.cert_db = cert_db
+        self.config_manager = None
         self.config = config
         self.config_dir = config_dir
         self.provider = provider
         self.hooks = None
+        self.session_pool = None
+        self.write_scheduler = None
+        self.ha_sync = None
+        self.projects = None
+        self.metrics = None
+        self.circuit_breaker = None
+        self.concurrency = None
+        self.retry_policy = None
+        self.health = None
 
         LOG.info("A10-neutron-lbaas: pre-initializing, version=%s, acos_client=%s",
                  version.VERSION, acos_client.VERSION)
@@ -65,6 +86,16 @@ class A10OpenstackLBBase(object):
         if provider is not None:
             self._late_init(provider)
 
+    @property
+    def config(self):
+        if self.config_manager is not None:
+            return self.config_manager.current()
+        return self._config
+
+    @config.setter
+    def config(self, value):
+        self._config = value
+
     def _late_init(self, provider):
         LOG.info("A10-neutron-lbaas: initializing, version=%s, acos_client=%s, provider=%s",
                  version.VERSION, acos_client.VERSION, provider)
@@ -72,15 +103,57 @@ class A10OpenstackLBBase(object):
         self.provider = provider
         if self.config is None:
             self.config = a10_config.A10Config(config_dir=self.config_dir, provider=provider)
+            interval = self.config.get('config_reload_interval')
+            if interval:
+                self.config_manager = config_manager.ConfigManager(
+                    self._config, self._reload_config, self._config._config_path)
+                self.config_manager.add_listener(self._config_reloaded)
+                self.config_manager.start(interval)
 
         if self.plumbing_hooks_class is not None:
             self.hooks = self.plumbing_hooks_class(self)
         else:
             self.hooks = self.config.get('plumbing_hooks_class')(self)
 
+        # Long-lived helpers read settings through the manager, if any, so
+        # they follow reloads
+        settings = self.config_manager or self.config
+        self.circuit_breaker = circuit_breaker.CircuitBreaker(settings)
+        self.concurrency = concurrency.ConcurrencyLimiter(settings)
+        self.retry_policy = retry.RetryPolicy(settings)
+        self.session_pool = session_pool.SessionPool(settings, self._get_a10_client)
+        self.write_scheduler = write_memory.WriteMemoryScheduler(settings)
+        self.ha_sync = ha_sync.HaSync(settings, self.session_pool, self.concurrency,
+                                      self.circuit_breaker)
+        self.projects = keystone.ProjectHierarchy(settings)
+        self.metrics = metrics.PhaseMetrics(settings)
+        # Probes go straight to the device; a retried probe hides the problem
+        self.health = health.HealthMonitor(settings, self._new_a10_client)
+        if self.config.get('health_check_interval'):
+            self.health.start(lambda: self.config.get_devices())
+        atexit.register(self.shutdown)
+
         if self.config.get('verify_appliances'):
             self._verify_appliances()
 
+    def _reload_config(self, previous):
+        return a10_config.A10Config(config_dir=previous._config_dir, provider=self.provider,
+                                    previous=previous)
+
+    def _config_reloaded(self, old_config, new_config):
+        if hasattr(self.hooks, 'config_reloaded'):
+            self.hooks.config_reloaded(old_config, new_config)
+
+    def pin_config(self):
+        """Keep self.config at its current snapshot on this thread until unpin_config()."""
+
+        if self.config_manager is not None:
+            self.config_manager.pin()
+
+    def unpin_config(self):
+        if self.config_manager is not None:
+            self.config_manager.unpin()
+
     def _select_a10_device(self, tenant_id, a10_context=None, lbaas_obj=None, **kwargs):
         if hasattr(self.hooks, 'select_device_with_lbaas_obj'):
             return self.hooks.select_device_with_lbaas_obj(
@@ -88,14 +161,37 @@ class A10OpenstackLBBase(object):
         else:
             return self.hooks.select_device(tenant_id, **kwargs)
 
-    def _get_a10_client(self, device_info, **kwargs):
+    def _new_a10_client(self, device_info, **kwargs):
         if hasattr(self.hooks, 'get_a10_client'):
             return self.hooks.get_a10_client(device_info, **kwargs)
-        else:
-            return acos_client.Client(
-                device_info['host'], device_info['api_version'],
-                device_info['username'], device_info['password'],
-                port=device_info['port'], protocol=device_info['protocol'])
+        return acos_client.Client(
+            device_info['host'], device_info['api_version'],
+            device_info['username'], device_info['password'],
+            port=device_info['port'], protocol=device_info['protocol'])
+
+    def _get_a10_client(self, device_info, **kwargs):
+        client = self._new_a10_client(device_info, **kwargs)
+
+        if self.config.get('axapi_retry_attempts'):
+            client = retry.RetryingClient(client, self.retry_policy)
+        return client
+
+    def shutdown(self):
+        LOG.info("A10-neutron-lbaas: shutting down, provider=%s", self.provider)
+
+        if self.config_manager is not None:
+            self.config_manager.stop()
+        if self.health is not None:
+            self.health.stop()
+
+        if self.write_scheduler is not None:
+            self.write_scheduler.shutdown()
+        if self.ha_sync is not None:
+            self.ha_sync.shutdown()
+        if self.session_pool is not None:
+            self.session_pool.close_all()
+        if self.metrics is not None:
+            self.metrics.maybe_dump(force=True)
 
     def _verify_appliances(self):
         LOG.info("A10Driver: verifying appliances")
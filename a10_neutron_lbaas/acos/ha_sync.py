@@ -0,0 +1,184 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import threading
+import time
+
+from a10_neutron_lbaas.client_proxies import session_pool
+
+LOG = logging.getLogger(__name__)
+
+
+def _sync_peers(client, device_cfg):
+    for v in device_cfg.get('ha_sync_list', []):
+        client.ha.sync(v['ip'], v['username'], v['password'])
+
+
+class HaSyncWorker(object):
+    """Runs 'ha sync' for one device on a background thread.
+
+    A sync copies the whole config, so any number of requests that arrive
+    while a sync is running are satisfied by a single follow-up sync. Each
+    sync looks the device up again, so it runs with the current config,
+    and goes through the same session slot and circuit breaker as a
+    context would.
+    """
+
+    def __init__(self, device_cfg, ha_sync):
+        self.device_cfg = device_cfg
+        self.ha_sync = ha_sync
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.in_flight = False
+        self.queue_depth = 0
+        self._oldest_request = None
+        self.syncs = 0
+        self.errors = 0
+        self.last_sync = None
+        self.last_sync_lag = None
+
+    def request(self):
+        with self._cond:
+            self.queue_depth += 1
+            if self._oldest_request is None:
+                self._oldest_request = time.time()
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run,
+                                                name="a10-ha-sync-%s" % self.device_cfg['host'])
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self.queue_depth and not self._stopping:
+                    self._cond.wait()
+                if not self.queue_depth:
+                    return
+                requested_at = self._oldest_request
+                self.queue_depth = 0
+                self._oldest_request = None
+                self.in_flight = True
+
+            try:
+                self._sync()
+                self.syncs += 1
+            except Exception:
+                self.errors += 1
+                LOG.exception("HaSyncWorker: ha sync of %s failed", self.device_cfg['host'])
+            finally:
+                with self._cond:
+                    self.in_flight = False
+                    self.last_sync = time.time()
+                    self.last_sync_lag = self.last_sync - requested_at
+                    self._cond.notify_all()
+
+    def _current_device(self):
+        device_cfg = None
+        if self.device_cfg.get('name'):
+            device_cfg = self.ha_sync.config.get_device(self.device_cfg['name'])
+        return device_cfg or self.device_cfg
+
+    def _sync(self):
+        device_cfg = self._current_device()
+        pool = self.ha_sync.pool
+        breaker = self.ha_sync.circuit_breaker
+        concurrency = self.ha_sync.concurrency
+
+        concurrency.acquire(device_cfg)
+        try:
+            with breaker.guard(device_cfg):
+                client = pool.acquire(device_cfg)
+                exc = None
+                try:
+                    # A pooled session may still be in its last user's partition
+                    client.system.partition.active('shared')
+                    _sync_peers(client, device_cfg)
+                except Exception as e:
+                    exc = e
+                    raise
+                finally:
+                    pool.release(device_cfg, client, exc)
+            breaker.record(device_cfg, None)
+        finally:
+            concurrency.release(device_cfg)
+
+    def drain(self, timeout=None):
+        """Wait until nothing is queued or running; True if that happened."""
+
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self.queue_depth or self.in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout=None):
+        self.drain(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'queue_depth': self.queue_depth,
+                'in_flight': self.in_flight,
+                'syncs': self.syncs,
+                'errors': self.errors,
+                'last_sync_lag': self.last_sync_lag,
+            }
+
+
+class HaSync(object):
+    """Runs ha sync after writes, inline or through per-device workers."""
+
+    def __init__(self, config, pool, concurrency, circuit_breaker):
+        self.config = config
+        self.pool = pool
+        self.concurrency = concurrency
+        self.circuit_breaker = circuit_breaker
+        self._lock = threading.Lock()
+        self._workers = {}
+
+    def _worker(self, device_cfg):
+        key = session_pool.device_key(device_cfg)
+        with self._lock:
+            if key not in self._workers:
+                self._workers[key] = HaSyncWorker(device_cfg, self)
+            return self._workers[key]
+
+    def sync(self, device_cfg, client):
+        if not device_cfg.get('ha_sync_list'):
+            return
+
+        if self.config.get('ha_sync_async'):
+            self._worker(device_cfg).request()
+        else:
+            _sync_peers(client, device_cfg)
+
+    def stats(self):
+        with self._lock:
+            workers = list(self._workers.values())
+        return dict((w.device_cfg['host'], w.stats()) for w in workers)
+
+    def shutdown(self, timeout=30):
+        with self._lock:
+            workers = list(self._workers.values())
+        for w in workers:
+            w.stop(timeout)
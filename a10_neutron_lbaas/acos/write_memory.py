@@ -0,0 +1,143 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import threading
+import time
+
+from a10_neutron_lbaas.client_proxies import session_pool
+
+LOG = logging.getLogger(__name__)
+
+
+class _PartitionState(object):
+
+    def __init__(self, lock):
+        self.cond = threading.Condition(lock)
+        self.dirty = 0
+        self.flushed = 0
+        self.flushing = False
+        self.waiters = 0
+        self.first_dirty = None
+        self.last_flush = 0
+
+
+class WriteMemoryScheduler(object):
+    """Coalesces write memory calls per (device, partition).
+
+    Every write context marks its partition dirty and then waits until a
+    write memory that started after its change has completed. Only one
+    write memory per partition runs at a time; contexts that finish while
+    one is in flight are all covered by a single follow-up write.
+
+    With write_memory_window > 0, a partition is written at most once per
+    window, and a change waits no longer than write_memory_max_delay for
+    its write. The flush runs on the thread of one of the waiting contexts,
+    using that context's client, so no extra sessions are opened.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._partitions = {}
+        self._shutdown = False
+        self.writes = 0
+        self.requests = 0
+
+    def _state(self, key):
+        if key not in self._partitions:
+            self._partitions[key] = _PartitionState(self._lock)
+        return self._partitions[key]
+
+    def _flush_at(self, st):
+        if self._shutdown:
+            return 0
+        window = self.config.get('write_memory_window') or 0
+        max_delay = self.config.get('write_memory_max_delay') or 0
+        if max_delay <= 0:
+            # No cap; the window alone decides
+            return st.last_flush + window
+        first_dirty = st.first_dirty or time.time()
+        return min(st.last_flush + window, first_dirty + max_delay)
+
+    def write(self, device_cfg, partition_name, flush):
+        """Mark partition dirty and return once a covering flush() is done."""
+
+        key = (session_pool.device_key(device_cfg), partition_name)
+
+        with self._lock:
+            st = self._state(key)
+            st.dirty += 1
+            st.waiters += 1
+            self.requests += 1
+            mine = st.dirty
+            if st.first_dirty is None:
+                st.first_dirty = time.time()
+
+        try:
+            self._write(key, st, mine, flush)
+        finally:
+            with self._lock:
+                st.waiters -= 1
+                st.cond.notify_all()
+
+    def _write(self, key, st, mine, flush):
+        with self._lock:
+            while True:
+                if st.flushed >= mine:
+                    return
+                if st.flushing:
+                    st.cond.wait()
+                    continue
+                delay = self._flush_at(st) - time.time()
+                if delay > 0:
+                    st.cond.wait(delay)
+                    continue
+                break
+
+            st.flushing = True
+            target = st.dirty
+            st.first_dirty = None
+
+        LOG.debug("WriteMemoryScheduler: writing %s change(s) for %s",
+                  target - st.flushed, key)
+        ok = False
+        try:
+            flush()
+            ok = True
+        finally:
+            with self._lock:
+                st.flushing = False
+                st.last_flush = time.time()
+                if ok:
+                    st.flushed = target
+                    self.writes += 1
+                elif st.first_dirty is None:
+                    # Whoever is still waiting retries with their own client
+                    st.first_dirty = time.time()
+                st.cond.notify_all()
+
+    def pending(self):
+        with self._lock:
+            return sum(st.waiters for st in self._partitions.values())
+
+    def shutdown(self, timeout=30):
+        """Wake up any delayed flushes and wait for them to finish."""
+
+        deadline = time.time() + timeout
+        with self._lock:
+            self._shutdown = True
+            for st in self._partitions.values():
+                st.cond.notify_all()
+
+        while self.pending() and time.time() < deadline:
+            time.sleep(0.05)
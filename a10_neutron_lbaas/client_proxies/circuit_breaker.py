@@ -0,0 +1,181 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import logging
+import socket
+import threading
+import time
+
+import requests
+
+from a10_neutron_lbaas import a10_exceptions as ex
+
+LOG = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+CONNECTION_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    socket.error,
+)
+
+
+def is_connection_error(exc_value):
+    """True if the device didn't answer, as opposed to answering with an error."""
+
+    return isinstance(exc_value, CONNECTION_ERRORS)
+
+
+class _Device(object):
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.probing = False
+
+
+class CircuitBreaker(object):
+    """Fails fast for devices that stopped answering.
+
+    After circuit_breaker_threshold consecutive connection failures a
+    device is opened, and contexts for it raise DeviceUnavailable at once
+    instead of waiting out connect timeouts and retries. Once
+    circuit_breaker_cooldown seconds have passed, one context is let
+    through as a probe (half-open); its success closes the breaker, its
+    failure reopens it for another cool-down.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._devices = {}
+        self.rejected = 0
+
+    def _threshold(self):
+        return self.config.get('circuit_breaker_threshold') or 0
+
+    def _device(self, device_cfg):
+        host = device_cfg['host']
+        if host not in self._devices:
+            self._devices[host] = _Device()
+        return self._devices[host]
+
+    def before(self, device_cfg):
+        """Raise DeviceUnavailable unless this call may go to the device.
+
+        Returns True if the caller is the half-open probe.
+        """
+
+        if not self._threshold():
+            return False
+
+        with self._lock:
+            d = self._device(device_cfg)
+            if d.state == CLOSED:
+                return False
+
+            cooldown = self.config.get('circuit_breaker_cooldown')
+            if d.state == OPEN and time.time() - d.opened_at >= cooldown:
+                d.state = HALF_OPEN
+            if d.state == HALF_OPEN and not d.probing:
+                d.probing = True
+                LOG.info("CircuitBreaker: probing device %s", device_cfg['host'])
+                return True
+
+            self.rejected += 1
+
+        raise ex.DeviceUnavailable(
+            "Device %s is not responding; circuit breaker is open" % device_cfg['host'])
+
+    def success(self, device_cfg):
+        if not self._threshold():
+            return
+
+        with self._lock:
+            d = self._device(device_cfg)
+            if d.state != CLOSED:
+                LOG.info("CircuitBreaker: device %s is back; closing", device_cfg['host'])
+            d.state = CLOSED
+            d.failures = 0
+            d.probing = False
+
+    def failure(self, device_cfg):
+        threshold = self._threshold()
+        if not threshold:
+            return
+
+        with self._lock:
+            d = self._device(device_cfg)
+            d.failures += 1
+            d.probing = False
+            if d.state == HALF_OPEN or d.failures >= threshold:
+                if d.state != OPEN:
+                    LOG.error("CircuitBreaker: device %s failed %s time(s); opening",
+                              device_cfg['host'], d.failures)
+                d.state = OPEN
+                d.opened_at = time.time()
+
+    def end_probe(self, device_cfg):
+        """Let another probe through, without deciding anything."""
+
+        if not self._threshold():
+            return
+
+        with self._lock:
+            self._device(device_cfg).probing = False
+
+    def record(self, device_cfg, exc_value):
+        """Feed the outcome of a call to the device into the breaker.
+
+        exc_value is None if the device answered.
+        """
+
+        if exc_value is not None and not isinstance(exc_value, Exception):
+            # Interrupted (GreenletExit, KeyboardInterrupt); we learned nothing
+            self.end_probe(device_cfg)
+        elif is_connection_error(exc_value):
+            self.failure(device_cfg)
+        else:
+            self.success(device_cfg)
+
+    @contextlib.contextmanager
+    def guard(self, device_cfg):
+        """Fail fast if the device is open, and record errors from the block.
+
+        A block that finishes decides nothing by itself, since it may never
+        have reached the device (a pooled session's login is free). The
+        caller calls success() or record() once the device has answered; a
+        probe stays in flight until then.
+        """
+
+        self.before(device_cfg)
+        try:
+            yield
+        except BaseException as e:
+            self.record(device_cfg, e)
+            raise
+
+    def state(self, device_cfg):
+        with self._lock:
+            return self._device(device_cfg).state
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rejected': self.rejected,
+                'devices': dict((h, d.state) for h, d in self._devices.items()),
+            }
@@ -0,0 +1,110 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+import threading
+import time
+
+from a10_neutron_lbaas import a10_exceptions as ex
+
+LOG = logging.getLogger(__name__)
+
+
+class _Device(object):
+
+    def __init__(self):
+        self.active = 0
+        self.waiters = collections.deque()
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+
+class ConcurrencyLimiter(object):
+    """Caps concurrent operations per device at max_concurrent_sessions.
+
+    Waiters are served first come, first served: a released slot is handed
+    straight to the oldest waiter, so a burst drains in order instead of
+    whoever wakes up first winning. Waiting longer than
+    max_concurrent_sessions_timeout raises DeviceBusy.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._devices = {}
+
+    def _limit(self, device_cfg):
+        return device_cfg.get('max_concurrent_sessions') or 0
+
+    def _device(self, device_cfg):
+        host = device_cfg['host']
+        if host not in self._devices:
+            self._devices[host] = _Device()
+        return self._devices[host]
+
+    def acquire(self, device_cfg):
+        """Take a slot for device_cfg; returns the seconds spent waiting."""
+
+        limit = self._limit(device_cfg)
+        if not limit:
+            return 0
+
+        with self._lock:
+            d = self._device(device_cfg)
+            if d.active < limit and not d.waiters:
+                d.active += 1
+                return 0
+            granted = threading.Event()
+            d.waiters.append(granted)
+
+        start = time.time()
+        granted.wait(self.config.get('max_concurrent_sessions_timeout'))
+        waited = time.time() - start
+
+        with self._lock:
+            d.waits += 1
+            d.wait_time += waited
+            d.max_wait = max(d.max_wait, waited)
+            if not granted.is_set():
+                d.waiters.remove(granted)
+                d.timeouts += 1
+                raise ex.DeviceBusy(
+                    "Timed out after %.1fs waiting for one of %s sessions on device %s" %
+                    (waited, limit, device_cfg['host']))
+
+        return waited
+
+    def release(self, device_cfg):
+        if not self._limit(device_cfg):
+            return
+
+        with self._lock:
+            d = self._device(device_cfg)
+            if d.waiters:
+                # The slot passes to the oldest waiter; active stays the same
+                d.waiters.popleft().set()
+            else:
+                d.active -= 1
+
+    def stats(self):
+        with self._lock:
+            return dict((host, {
+                'active': d.active,
+                'queued': len(d.waiters),
+                'waits': d.waits,
+                'wait_time': d.wait_time,
+                'max_wait': d.max_wait,
+                'timeouts': d.timeouts,
+            }) for host, d in self._devices.items())
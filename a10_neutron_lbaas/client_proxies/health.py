@@ -0,0 +1,285 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+import random
+import threading
+import time
+
+import acos_client.errors as acos_errors
+
+from a10_neutron_lbaas import a10_exceptions as ex
+
+LOG = logging.getLogger(__name__)
+
+UNKNOWN = 'unknown'
+HEALTHY = 'healthy'
+DEGRADED = 'degraded'
+DOWN = 'down'
+
+# Weight of the newest sample in the latency average
+LATENCY_ALPHA = 0.3
+
+
+class _Device(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.status = UNKNOWN
+        self.latency = None
+        self.results = collections.deque()
+        self.consecutive_failures = 0
+        self.last_checked = None
+        self.last_error = None
+        self.probing = False
+        # Bumped by each probe and by a timeout; a probe whose token is
+        # stale has already been counted and must not record again
+        self.token = 0
+
+    def error_rate(self):
+        if not self.results:
+            return 0.0
+        return float(self.results.count(False)) / len(self.results)
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'status': self.status,
+            'latency': self.latency,
+            'error_rate': self.error_rate(),
+            'consecutive_failures': self.consecutive_failures,
+            'last_checked': self.last_checked,
+            'last_error': self.last_error,
+        }
+
+
+class HealthMonitor(object):
+    """Probes every device in the background and keeps a health table.
+
+    Every health_check_interval seconds, give or take health_check_jitter
+    of it so that several neutron-servers don't probe in step, each
+    configured and database device gets a system.information call, all
+    devices at once. A device whose probe fails health_check_down_failures
+    times in a row is down: contexts for it fail at once and the
+    scheduler gives it no new tenants. A device that answers, but fails
+    more than health_check_degraded_error_rate of its last
+    health_check_window probes, or whose average latency is over
+    health_check_degraded_latency seconds, is degraded, and the scheduler
+    prefers other devices. Devices that were never probed are assumed
+    healthy.
+
+    Each device keeps one logged-in client between rounds, so a round costs
+    one AXAPI session per device rather than a login and logoff each. A
+    client whose probe fails is closed, and the next probe logs in again.
+    """
+
+    def __init__(self, config, client_factory):
+        self.config = config
+        self.client_factory = client_factory
+        self._lock = threading.Lock()
+        self._devices = {}
+        self._clients = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.rounds = 0
+        self.rejected = 0
+
+    def _device(self, device_cfg):
+        host = device_cfg['host']
+        if host not in self._devices:
+            self._devices[host] = _Device(device_cfg.get('name', host))
+        return self._devices[host]
+
+    def _classify(self, d):
+        if d.consecutive_failures >= (self.config.get('health_check_down_failures') or 1):
+            return DOWN
+        rate = self.config.get('health_check_degraded_error_rate')
+        if rate and d.error_rate() > rate:
+            return DEGRADED
+        latency = self.config.get('health_check_degraded_latency')
+        if latency and d.latency is not None and d.latency > latency:
+            return DEGRADED
+        return HEALTHY
+
+    def record(self, device_cfg, latency=None, exc_value=None, token=None):
+        """Add one probe result to the device's health.
+
+        token is the one probe() handed the probe; a probe that already
+        timed out is dropped.
+        """
+
+        window = self.config.get('health_check_window') or 1
+        with self._lock:
+            d = self._device(device_cfg)
+            if token is not None:
+                d.probing = False
+                if token != d.token:
+                    return
+                d.token += 1
+            d.last_checked = time.time()
+            d.results.append(exc_value is None)
+            while len(d.results) > window:
+                d.results.popleft()
+            if exc_value is None:
+                d.consecutive_failures = 0
+                d.last_error = None
+                if d.latency is None:
+                    d.latency = latency
+                else:
+                    d.latency += LATENCY_ALPHA * (latency - d.latency)
+            else:
+                d.consecutive_failures += 1
+                d.last_error = str(exc_value) or exc_value.__class__.__name__
+
+            old, d.status = d.status, self._classify(d)
+
+        if old != d.status:
+            log = LOG.warning if d.status in (DEGRADED, DOWN) else LOG.info
+            log("HealthMonitor: device %s is %s (was %s)", d.name, d.status, old)
+
+    def _close(self, client):
+        try:
+            client.session.close()
+        except Exception:
+            pass
+
+    def _information(self, device_cfg):
+        host = device_cfg['host']
+        with self._lock:
+            client = self._clients.pop(host, None)
+        if client is None:
+            client = self.client_factory(device_cfg)
+        try:
+            client.system.information()
+        except acos_errors.InvalidSessionID:
+            # ACOS timed the kept session out between rounds; log in again
+            self._close(client)
+            client = self.client_factory(device_cfg)
+            try:
+                client.system.information()
+            except Exception:
+                self._close(client)
+                raise
+        except Exception:
+            self._close(client)
+            raise
+        with self._lock:
+            self._clients[host] = client
+
+    def _probe(self, device_cfg, token):
+        start = time.time()
+        try:
+            self._information(device_cfg)
+        except Exception as e:
+            LOG.debug("HealthMonitor: probe of %s failed: %s", device_cfg['host'], e)
+            self.record(device_cfg, exc_value=e, token=token)
+        else:
+            self.record(device_cfg, latency=time.time() - start, token=token)
+
+    def probe(self, devices):
+        """Probe every device in devices ({name: device dict}) in parallel.
+
+        Waits at most health_check_timeout seconds. A probe still running
+        then counts as a failure, and the device is skipped by later rounds
+        until it returns.
+        """
+
+        threads = []
+        with self._lock:
+            for device_cfg in devices.values():
+                d = self._device(device_cfg)
+                if d.probing:
+                    continue
+                d.probing = True
+                t = threading.Thread(target=self._probe, args=(device_cfg, d.token),
+                                     name="a10-health-%s" % device_cfg['host'])
+                t.daemon = True
+                threads.append((device_cfg, d.token, t))
+
+        for device_cfg, token, t in threads:
+            t.start()
+
+        deadline = time.time() + (self.config.get('health_check_timeout') or 0)
+        for device_cfg, token, t in threads:
+            t.join(max(0, deadline - time.time()))
+            with self._lock:
+                d = self._device(device_cfg)
+                if d.token != token:
+                    continue
+                # Counted as a failure now; the probe's own result, when it
+                # comes, only clears probing
+                d.token += 1
+            self.record(device_cfg, exc_value=ex.DeviceUnavailable(
+                "No answer in %s seconds" % self.config.get('health_check_timeout')))
+
+        self.rounds += 1
+
+    def status(self, device_cfg):
+        with self._lock:
+            d = self._devices.get(device_cfg['host'])
+            return d.status if d is not None else UNKNOWN
+
+    def before(self, device_cfg):
+        """Raise DeviceUnavailable if the device is down."""
+
+        if self.status(device_cfg) == DOWN:
+            with self._lock:
+                self.rejected += 1
+            raise ex.DeviceUnavailable(
+                "Device %s is failing its health checks" % device_cfg['host'])
+
+    def table(self):
+        """{host: health dict} for every device probed so far."""
+
+        with self._lock:
+            return dict((h, d.as_dict()) for h, d in self._devices.items())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rounds': self.rounds,
+                'rejected': self.rejected,
+                'devices': dict((h, d.status) for h, d in self._devices.items()),
+            }
+
+    def _delay(self):
+        interval = self.config.get('health_check_interval')
+        jitter = self.config.get('health_check_jitter') or 0
+        return interval * (1 + random.uniform(-jitter, jitter))
+
+    def _run(self, devices_func):
+        while not self._stop.wait(self._delay()):
+            try:
+                self.probe(devices_func())
+            except Exception:
+                LOG.exception("HealthMonitor: error probing devices")
+
+    def start(self, devices_func):
+        """Probe devices_func() in the background, until stop()."""
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(devices_func,),
+                                        name='a10-health-monitor')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            self._close(client)
@@ -0,0 +1,138 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import functools
+import inspect
+import logging
+import random
+import socket
+import time
+
+import acos_client.errors as acos_errors
+from acos_client.v21 import base as v21_base
+from acos_client.v30 import base as v30_base
+import requests
+
+LOG = logging.getLogger(__name__)
+
+# AXAPI methods that leave the device in the same state however many times
+# they run. Anything else (create, and names we don't know) is assumed not to.
+IDEMPOTENT_PREFIXES = (
+    'get', 'all', 'exists', 'stats', 'oper', 'information', 'available',
+    'update', 'replace', 'delete', 'remove', 'active', 'activate_and_write',
+    'write_memory', 'sync',
+)
+
+# The request never reached the device, or the device refused to start on
+# it; safe to repeat even when the call isn't idempotent.
+NOT_APPLIED_ERRORS = (
+    requests.exceptions.ConnectTimeout,
+    acos_errors.ACOSSystemIsBusy,
+    acos_errors.ACOSSystemNotReady,
+    acos_errors.ConfigManagerNotReady,
+)
+
+# The request may or may not have been applied.
+TRANSIENT_ERRORS = NOT_APPLIED_ERRORS + (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    socket.error,
+    acos_errors.ACOSUnknownError,
+)
+
+
+def is_idempotent(method_name):
+    return method_name.startswith(IDEMPOTENT_PREFIXES)
+
+
+class RetryPolicy(object):
+    """When and how long to retry a failed AXAPI call.
+
+    A call is retried up to axapi_retry_attempts more times, with full
+    jitter exponential backoff starting at axapi_retry_backoff seconds, as
+    long as that fits in axapi_retry_deadline seconds from the first try.
+    Idempotent calls are retried on any transient error; other calls only
+    when the error shows the device never applied the request.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.retries = 0
+        self.gave_up = 0
+
+    def retryable(self, method_name, exc_value):
+        if is_idempotent(method_name):
+            return isinstance(exc_value, TRANSIENT_ERRORS)
+        return isinstance(exc_value, NOT_APPLIED_ERRORS)
+
+    def backoff(self, attempt):
+        base = self.config.get('axapi_retry_backoff')
+        return random.uniform(0, min(base * (2 ** attempt), base * 32))
+
+    def call(self, path, method, *args, **kwargs):
+        name = path.rsplit('.', 1)[-1]
+        attempts = self.config.get('axapi_retry_attempts') or 0
+        deadline = time.time() + self.config.get('axapi_retry_deadline')
+        attempt = 0
+
+        while True:
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                if attempt >= attempts or not self.retryable(name, e):
+                    raise
+                delay = self.backoff(attempt)
+                if time.time() + delay > deadline:
+                    self.gave_up += 1
+                    raise
+                attempt += 1
+                self.retries += 1
+                LOG.warning("AXAPI %s failed with %s; retry %s in %.2fs",
+                            path, e.__class__.__name__, attempt, delay)
+                time.sleep(delay)
+
+
+def _is_axapi_object(value):
+    return isinstance(value, (v21_base.BaseV21, v30_base.BaseV30))
+
+
+class _Proxy(object):
+
+    def __init__(self, target, policy, path):
+        self.__dict__['_target'] = target
+        self.__dict__['_policy'] = policy
+        self.__dict__['_path'] = path
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        path = self._path + (name,)
+        if _is_axapi_object(value):
+            return _Proxy(value, self._policy, path)
+        if not inspect.ismethod(value) or name.startswith('_'):
+            return value
+        if _is_axapi_object(self._target):
+            return functools.partial(self._policy.call, '.'.join(path), value)
+        return value
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+
+class RetryingClient(_Proxy):
+    """An acos client whose AXAPI methods retry according to a RetryPolicy.
+
+    Everything else (session, current_partition, ...) passes straight
+    through to the wrapped client.
+    """
+
+    def __init__(self, client, policy):
+        super(RetryingClient, self).__init__(client, policy, ())
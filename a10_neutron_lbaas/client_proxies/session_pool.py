@@ -0,0 +1,127 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+import threading
+import time
+
+import acos_client.errors as acos_errors
+
+from a10_neutron_lbaas.client_proxies import circuit_breaker
+
+LOG = logging.getLogger(__name__)
+
+
+def device_key(device_info):
+    """Identity of an AXAPI session; two device dicts with the same key can
+    share authenticated clients.
+    """
+
+    return (device_info['host'], device_info.get('port'), device_info.get('protocol'),
+            device_info['username'], str(device_info.get('api_version')))
+
+
+class SessionPool(object):
+    """Per-device pool of authenticated acos clients.
+
+    Contexts check a client out on __enter__ and hand it back on __exit__,
+    so consecutive operations against a device reuse one AXAPI login instead
+    of paying for an authenticate/logoff pair every time. The pool never
+    blocks; if every pooled client is checked out a new one is created, and
+    clients returned to a full pool are logged off.
+    """
+
+    def __init__(self, config, client_factory):
+        self.config = config
+        self.client_factory = client_factory
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(collections.deque)
+        self.hits = 0
+        self.misses = 0
+
+    def _size(self, device_info):
+        size = device_info.get('session_pool_size')
+        if size is None:
+            size = self.config.get('session_pool_size')
+        return size or 0
+
+    def _close(self, client):
+        try:
+            client.session.close()
+        except acos_errors.InvalidSessionID:
+            pass
+        except Exception:
+            LOG.exception("SessionPool: error closing acos session; ignoring")
+
+    def acquire(self, device_info, **kwargs):
+        if self._size(device_info) > 0:
+            key = device_key(device_info)
+            max_idle = self.config.get('session_pool_idle_timeout')
+            expired = []
+            client = None
+
+            with self._lock:
+                idle = self._idle[key]
+                while idle:
+                    last_used, c = idle.pop()
+                    if max_idle and time.time() - last_used > max_idle:
+                        expired.append(c)
+                    else:
+                        client = c
+                        break
+                if client is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+
+            # ACOS has most likely timed these out already; don't hand them out.
+            for c in expired:
+                self._close(c)
+
+            if client is not None:
+                return client
+
+        return self.client_factory(device_info, **kwargs)
+
+    def release(self, device_info, client, exc_value=None):
+        size = self._size(device_info)
+
+        # A session ACOS no longer recognizes, or one to a device that
+        # stopped answering, is thrown away, and the next checkout logs in again.
+        discard = circuit_breaker.is_connection_error(exc_value)
+        if isinstance(exc_value, acos_errors.InvalidSessionID):
+            discard = True
+        if size > 0 and not discard:
+            key = device_key(device_info)
+            with self._lock:
+                idle = self._idle[key]
+                if len(idle) < size:
+                    idle.append((time.time(), client))
+                    return
+
+        self._close(client)
+
+    def close_all(self):
+        with self._lock:
+            clients = [c for idle in self._idle.values() for _, c in idle]
+            self._idle.clear()
+
+        for c in clients:
+            self._close(c)
+
+    def stats(self):
+        with self._lock:
+            idle = collections.Counter()
+            for k, v in self._idle.items():
+                idle[k[0]] += len(v)
+            return {'hits': self.hits, 'misses': self.misses, 'idle': dict(idle)}
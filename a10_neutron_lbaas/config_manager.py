@@ -0,0 +1,133 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import os
+import threading
+
+LOG = logging.getLogger(__name__)
+
+
+class ConfigManager(object):
+    """Holds the running A10Config, and swaps in a new one when config.py changes.
+
+    A published config is a snapshot that is never modified: a reload
+    builds (and so validates) a whole new A10Config from the file, and
+    replaces the reference in one assignment. A file that fails to load is
+    logged and the running config stays. Anything that needs one
+    consistent config for a while, such as an A10Context, pins the current
+    snapshot for its thread; current() returns the pinned snapshot until
+    it is unpinned.
+
+    Attribute lookups fall through to the current snapshot, so the manager
+    can be handed to anything that expects an A10Config.
+    """
+
+    def __init__(self, config, loader, path):
+        self._config = config
+        self._loader = loader
+        self._path = path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._listeners = []
+        self._mtime = self._stat()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reloads = 0
+        self.errors = 0
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+    def _stat(self):
+        try:
+            return os.stat(self._path).st_mtime
+        except OSError:
+            return None
+
+    def current(self):
+        pinned = getattr(self._local, 'pinned', None)
+        if pinned:
+            return pinned[-1]
+        return self._config
+
+    def pin(self):
+        """Make current() return today's snapshot on this thread until unpin()."""
+
+        if not hasattr(self._local, 'pinned'):
+            self._local.pinned = []
+        config = self.current()
+        self._local.pinned.append(config)
+        return config
+
+    def unpin(self):
+        pinned = getattr(self._local, 'pinned', None)
+        if pinned:
+            pinned.pop()
+
+    def add_listener(self, listener):
+        """Call listener(old_config, new_config) after every reload."""
+
+        self._listeners.append(listener)
+
+    def check(self):
+        """Reload if config.py changed since it was last loaded."""
+
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return False
+        return self.reload(mtime)
+
+    def reload(self, mtime=None):
+        with self._lock:
+            old = self._config
+            try:
+                new = self._loader(old)
+            except Exception:
+                self.errors += 1
+                # Don't retry the same broken file every interval
+                self._mtime = mtime
+                LOG.exception("ConfigManager: could not load %s; keeping the running config",
+                              self._path)
+                return False
+            self._config = new
+            self._mtime = mtime if mtime is not None else self._stat()
+            self.reloads += 1
+
+        LOG.info("ConfigManager: reloaded %s", self._path)
+        for listener in self._listeners:
+            try:
+                listener(old, new)
+            except Exception:
+                LOG.exception("ConfigManager: reload listener %s failed", listener)
+        return True
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                LOG.exception("ConfigManager: error checking %s", self._path)
+
+    def start(self, interval):
+        """Check config.py for changes every interval seconds, in the background."""
+
+        self._thread = threading.Thread(target=self._run, args=(interval,),
+                                        name='a10-config-reload')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -11,6 +11,9 @@
 #    under the License.
 
 from contextlib import contextmanager
+import logging
+import os
+import threading
 
 import sqlalchemy
 import sqlalchemy.ext.declarative
@@ -18,40 +21,187 @@ import sqlalchemy.orm
 
 from a10_neutron_lbaas import a10_exceptions as ex
 
+LOG = logging.getLogger(__name__)
+
 A10_CFG = None
 Base = sqlalchemy.ext.declarative.declarative_base()
 
+_lock = threading.Lock()
+_engines = {}
+_sessionmakers = {}
+_request = threading.local()
+
 
 def get_base():
     return Base
 
 
-def get_engine(url=None):
+def _config():
     global A10_CFG
 
-    if url is None:
-        if A10_CFG is None:
-            from a10_neutron_lbaas import a10_config
-            A10_CFG = a10_config.A10Config()
+    if A10_CFG is None:
+        from a10_neutron_lbaas import a10_config
+        A10_CFG = a10_config.get_config()
+    return A10_CFG
+
 
-        if not A10_CFG.get('use_database'):
+def _url(url):
+    if url is None:
+        if not _config().get('use_database'):
             raise ex.InternalError("attempted to use database when it is disabled")
-        url = A10_CFG.get('database_connection')
+        url = _config().get('database_connection')
+    return url
+
+
+def _engine_args(url):
+    cfg = _config()
+    args = {}
+    # sqlite uses its own single connection pools, which take none of these
+    if not str(url).startswith('sqlite'):
+        args['pool_size'] = cfg.get('db_pool_size')
+        args['max_overflow'] = cfg.get('db_max_overflow')
+        args['pool_timeout'] = cfg.get('db_pool_timeout')
+    args['pool_recycle'] = cfg.get('db_pool_recycle')
+    if cfg.get('db_pool_pre_ping'):
+        args['pool_pre_ping'] = True
+    return args
 
-    return sqlalchemy.create_engine(url)
+
+def _key(url):
+    # Pooled connections must not be shared with a forked child
+    return (os.getpid(), str(url))
+
+
+def get_engine(url=None):
+    """The engine, and so the connection pool, for url; one per process."""
+
+    url = _url(url)
+    key = _key(url)
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            args = _engine_args(url)
+            engine = _engines[key] = sqlalchemy.create_engine(url, **args)
+            # repr() of the engine url hides the password
+            LOG.debug("db: created engine for %r in pid %s, pool args %s",
+                      engine.url, key[0], args)
+        return engine
+
+
+def _sessionmaker(url):
+    key = _key(url)
+    with _lock:
+        maker = _sessionmakers.get(key)
+    if maker is None:
+        maker = sqlalchemy.orm.sessionmaker(bind=get_engine(url))
+        with _lock:
+            maker = _sessionmakers.setdefault(key, maker)
+    return maker
 
 
 def get_session(url=None, **kwargs):
-    DBSession = sqlalchemy.orm.sessionmaker(bind=get_engine(url=url))
-    return DBSession(**kwargs)
+    return _sessionmaker(_url(url))(**kwargs)
+
+
+def pool_stats():
+    """Connection pool usage for every engine in this process, by url."""
+
+    rv = {}
+    with _lock:
+        engines = [e for k, e in _engines.items() if k[0] == os.getpid()]
+    for engine in engines:
+        pool = engine.pool
+        stats = {'status': pool.status()}
+        # Only QueuePool has all of these
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            if callable(getattr(pool, name, None)):
+                stats[name] = getattr(pool, name)()
+        # repr() of the url hides the password
+        rv[repr(engine.url)] = stats
+    return rv
+
+
+def dispose_engines():
+    """Close every pooled connection and forget the engines."""
+
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+        _sessionmakers.clear()
+    for engine in engines:
+        engine.dispose()
+
+
+def current_session():
+    """The request session open on this thread, if any."""
+
+    return getattr(_request, 'session', None)
+
+
+def begin_request(url=None):
+    """Open this thread's request session, or join the one already open.
+
+    Until the matching end_request(), magic_session() hands out this
+    session instead of making one per call, so the lookups made in between
+    share one session and one transaction. Keep the span short: the
+    session holds a pooled connection until it ends.
+    """
+
+    if current_session() is None:
+        _request.session = get_session(url, expire_on_commit=False)
+        _request.depth = 0
+    _request.depth += 1
+    return _request.session
+
+
+def end_request(exc_value=None):
+    """Leave the request session; the outermost caller commits and closes it.
+
+    The transaction commits if exc_value is None and rolls back otherwise.
+    """
+
+    session = current_session()
+    if session is None:
+        return
+    _request.depth -= 1
+    if _request.depth > 0:
+        return
+
+    _request.session = None
+    try:
+        if exc_value is None:
+            try:
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+        else:
+            session.rollback()
+    finally:
+        session.close()
+
+
+@contextmanager
+def request_session(url=None):
+    session = begin_request(url)
+    try:
+        yield session
+    except Exception as e:
+        end_request(e)
+        raise
+    end_request()
 
 
 @contextmanager
 def magic_session(db_session=None, url=None):
-    """Either does nothing with the session you already have or
-    makes one that commits and closes no matter what happens
+    """Either does nothing with the session you already have (or the
+    request session open on this thread) or makes one that commits and
+    closes no matter what happens
     """
 
+    if db_session is None and url is None:
+        db_session = current_session()
+
     if db_session is not None:
         yield db_session
     else:
@@ -0,0 +1,55 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""hot path lookup indexes
+
+Revision ID: a62d0abeeaf5
+Revises: c4e1caaa618d
+Create Date: 2026-10-17 02:26:44.299203
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'a62d0abeeaf5'
+down_revision = 'c4e1caaa618d'
+branch_labels = None
+depends_on = None
+
+from alembic import op  # noqa
+import sqlalchemy as sa  # noqa
+
+
+def upgrade():
+    op.create_index('ix_a10_tenant_bindings_tenant_id',
+                    'a10_tenant_bindings', ['tenant_id'])
+    op.create_index('ix_a10_slbs_loadbalancer_id',
+                    'a10_slbs', ['loadbalancer_id'])
+    op.create_index('ix_a10_certificatelistenerbindings_listener_id',
+                    'a10_certificatelistenerbindings', ['listener_id'])
+    # name is a String(1024), too long for a full MySQL index key
+    op.create_index('ix_a10_device_instances_name',
+                    'a10_device_instances', ['name'], mysql_length=255)
+    # neutron_id first, so MySQL keeps its own index for the member_id
+    # foreign key and the downgrade can drop this one
+    op.create_index('uq_a10_scaling_group_member_virtual_servers_neutron_id',
+                    'a10_scaling_group_member_virtual_servers',
+                    ['neutron_id', 'member_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_a10_scaling_group_member_virtual_servers_neutron_id',
+                  'a10_scaling_group_member_virtual_servers')
+    op.drop_index('ix_a10_device_instances_name', 'a10_device_instances')
+    op.drop_index('ix_a10_certificatelistenerbindings_listener_id',
+                  'a10_certificatelistenerbindings')
+    op.drop_index('ix_a10_slbs_loadbalancer_id', 'a10_slbs')
+    op.drop_index('ix_a10_tenant_bindings_tenant_id', 'a10_tenant_bindings')
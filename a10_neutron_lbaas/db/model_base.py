@@ -21,6 +21,9 @@ from a10_neutron_lbaas.db import api as db_api
 
 Base = db_api.get_base()
 
+# Most databases cap the number of bound parameters in one statement
+IN_CHUNK_SIZE = 500
+
 
 def _uuid_str():
     return str(uuid.uuid4())
@@ -30,6 +33,18 @@ def _get_date():
     return datetime.datetime.now()
 
 
+def _constant(value):
+    return lambda instance: value
+
+
+def _commit(db):
+    # The request session is committed, or rolled back, by end_request
+    if db is db_api.current_session():
+        db.flush()
+    else:
+        db.commit()
+
+
 class A10Base(Base):
     __abstract__ = True
 
@@ -60,19 +75,66 @@ class A10Base(Base):
             return q.filter(
                 getattr(cls, attribute_name) == attribute).first()
 
+    @classmethod
+    def find_by_many(cls, attribute_name, values, db_session=None, chunk_size=IN_CHUNK_SIZE):
+        """Every row whose attribute is one of values, in chunked IN queries."""
+
+        values = list(set(values))
+        column = getattr(cls, attribute_name)
+        rv = []
+        with cls._query(db_session) as q:
+            for i in range(0, len(values), chunk_size):
+                rv.extend(q.filter(column.in_(values[i:i + chunk_size])).all())
+        return rv
+
+    @classmethod
+    def find_all_by_ids(cls, ids, db_session=None):
+        return cls.find_by_many('id', ids, db_session=db_session)
+
     @classmethod
     def find_all(cls, db_session=None):
         with cls._query(db_session) as q:
             return q.all()
 
+    @classmethod
+    def find_updated_since(cls, when, db_session=None):
+        with cls._query(db_session) as q:
+            return q.filter(cls.updated_at >= when).all()
+
+    @classmethod
+    def version(cls, db_session=None):
+        """(row count, latest updated_at); changes whenever rows are added,
+        updated or removed.
+        """
+
+        with db_api.magic_session(db_session) as db:
+            count, latest = db.query(sa.func.count(), sa.func.max(cls.updated_at)).one()
+            return (count, latest)
+
+    @classmethod
+    def _column_defaults(cls):
+        """(key, default function) for every column with a default; built
+        once per class.
+        """
+
+        # Looked up in cls.__dict__, so subclasses don't see their parent's
+        defaults = cls.__dict__.get('_a10_column_defaults')
+        if defaults is None:
+            defaults = []
+            for key, column in inspect(cls).columns.items():
+                if column.default is not None:
+                    arg = column.default.arg
+                    column_default = arg if callable(arg) else _constant(arg)
+                    defaults.append((key, column_default))
+            cls._a10_column_defaults = defaults
+        return defaults
+
     @classmethod
     def create(cls, **kwargs):
         instance = cls(**kwargs)
         # Populate all the unspecified columns with their defaults
-        for key, column in inspect(cls).columns.items():
-            if key not in kwargs and column.default is not None:
-                arg = column.default.arg
-                column_default = arg if callable(arg) else lambda: arg
+        for key, column_default in cls._column_defaults():
+            if key not in kwargs:
                 setattr(instance, key, column_default(instance))
         return instance
 
@@ -81,9 +143,36 @@ class A10Base(Base):
         m = cls.create(**kwargs)
         with db_api.magic_session(db_session) as db:
             db.add(m)
-            db.commit()
+            _commit(db)
             return m
 
+    @classmethod
+    def bulk_create_and_save(cls, rows, db_session=None):
+        """create() a model for each kwargs dict in rows; save them in one commit.
+
+        Inside a request session the rows are only flushed; end_request
+        commits them with the rest of the request.
+        """
+
+        models = [cls.create(**kwargs) for kwargs in rows]
+        with db_api.magic_session(db_session) as db:
+            db.add_all(models)
+            _commit(db)
+            return models
+
+    @classmethod
+    def bulk_update(cls, rows, db_session=None):
+        """Apply each dict in rows to the row with its 'id', in one commit.
+
+        Goes straight to UPDATE statements, without loading the rows.
+        """
+
+        now = _get_date()
+        mappings = [dict(row, updated_at=row.get('updated_at', now)) for row in rows]
+        with db_api.magic_session(db_session) as db:
+            db.bulk_update_mappings(cls, mappings)
+            _commit(db)
+
     def as_dict(self):
         d = dict(self.__dict__)
         d.pop('_sa_instance_state', None)
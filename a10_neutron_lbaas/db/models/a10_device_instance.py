@@ -19,6 +19,9 @@ class A10DeviceInstance(model_base.A10BaseMixin, model_base.A10Base):
     """An orchestrated vThunder that is being used as a device."""
 
     __tablename__ = 'a10_device_instances'
+    __table_args__ = (
+        sa.Index('ix_a10_device_instances_name', 'name', mysql_length=255),
+    )
 
     # This field is directly analagous to the device name in config.py;
     # and will be used as such throughout.
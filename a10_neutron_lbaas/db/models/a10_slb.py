@@ -17,6 +17,9 @@ from a10_neutron_lbaas.db import model_base
 
 class A10SLB(model_base.A10BaseMixin, model_base.A10Base):
     __tablename__ = 'a10_slbs'
+    __table_args__ = (
+        sa.Index('ix_a10_slbs_loadbalancer_id', 'loadbalancer_id'),
+    )
 
     # For vip specific binding (as opposed to tenant level binding), this will
     # differ from A10TenantBinding, if that row exists at all.
@@ -17,6 +17,9 @@ from a10_neutron_lbaas.db import model_base
 
 class A10TenantBinding(model_base.A10BaseMixin, model_base.A10Base):
     __tablename__ = "a10_tenant_bindings"
+    __table_args__ = (
+        sa.Index('ix_a10_tenant_bindings_tenant_id', 'tenant_id'),
+    )
 
     device_name = sa.Column(sa.String(1024), nullable=False)
 
@@ -176,6 +176,10 @@ class A10ScalingGroupSwitch(A10ScalingGroupMember):
 
 class A10ScalingGroupMemberVirtualServer(models.A10Base):
     __tablename__ = "a10_scaling_group_member_virtual_servers"
+    __table_args__ = (
+        sa.Index('uq_a10_scaling_group_member_virtual_servers_neutron_id',
+                 'neutron_id', 'member_id', unique=True),
+    )
 
     id = sa.Column(sa.String(36),
                    primary_key=True,
@@ -0,0 +1,104 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+
+class VersionedTableCache(object):
+    """In-memory index of a whole A10Base table, kept fresh cheaply.
+
+    Instead of reading the table on every use, the cache asks the database
+    for its version (row count and latest updated_at) and only reads the
+    rows touched since the last refresh. A row count that the changed rows
+    can't explain (rows were deleted, or forgotten here) forces a full
+    reload. The version is checked at most every refresh_interval_option
+    seconds (0 checks on every use).
+
+    Subclasses say which model to read, and keep their own indexes in
+    _clear(), _add(row) and _size(). Methods starting with _ expect
+    self._lock to be held.
+    """
+
+    refresh_interval_option = None
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0
+        self.full_loads = 0
+        self.incremental_loads = 0
+
+    def _model(self):
+        raise NotImplementedError()
+
+    def _clear(self):
+        raise NotImplementedError()
+
+    def _add(self, row):
+        raise NotImplementedError()
+
+    def _size(self):
+        """How many rows are indexed."""
+
+        raise NotImplementedError()
+
+    def _full_load(self, db_session, version=None):
+        model = self._model()
+        if version is None:
+            version = model.version(db_session=db_session)
+        self._clear()
+        for row in model.find_all(db_session=db_session):
+            self._add(row)
+        self._version = version
+        self.full_loads += 1
+
+    def _refresh(self, db_session):
+        model = self._model()
+        version = model.version(db_session=db_session)
+        if version == self._version and self._size() == version[0]:
+            return
+
+        count, latest = version
+        if self._version is None or self._version[1] is None or latest is None:
+            self._full_load(db_session, version)
+            return
+
+        for row in model.find_updated_since(self._version[1], db_session=db_session):
+            self._add(row)
+        self.incremental_loads += 1
+        if self._size() != count:
+            LOG.debug("%s: %s indexed, %s in db; reloading",
+                      self.__class__.__name__, self._size(), count)
+            self._full_load(db_session, version)
+        else:
+            self._version = version
+
+    def _check(self, db_session):
+        """Refresh if the interval has passed since the last check."""
+
+        now = time.time()
+        interval = self.config.get(self.refresh_interval_option)
+        if self._version is None or now - self._checked_at >= interval:
+            self._refresh(db_session)
+            self._checked_at = now
+
+    def _recheck(self, everything=False):
+        """Check the table on next use; reread all of it if everything."""
+
+        if everything:
+            self._version = None
+        self._checked_at = 0
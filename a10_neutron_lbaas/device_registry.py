@@ -0,0 +1,180 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+import threading
+import time
+
+from a10_neutron_lbaas.db import table_cache
+
+LOG = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_registries = {}
+_caches = {}
+
+
+class DeviceRegistry(table_cache.VersionedTableCache):
+    """In-memory index of the a10_device_instances table, by name and id.
+
+    Reads only the rows changed since the last check, at most every
+    device_registry_refresh_interval seconds (0 checks on every call);
+    invalidate() makes the next call check regardless.
+    """
+
+    refresh_interval_option = 'device_registry_refresh_interval'
+
+    def __init__(self, config):
+        super(DeviceRegistry, self).__init__(config)
+        self._by_id = {}
+        self._by_name = {}
+
+    def _model(self):
+        from a10_neutron_lbaas.db import models
+        return models.A10DeviceInstance
+
+    def _clear(self):
+        self._by_id = {}
+        self._by_name = {}
+
+    def _add(self, row):
+        d = row.as_dict()
+        old = self._by_id.get(d['id'])
+        if old is not None and self._by_name.get(old['name']) is old:
+            del self._by_name[old['name']]
+        self._by_id[d['id']] = d
+        self._by_name[d['name']] = d
+
+    def _size(self):
+        return len(self._by_id)
+
+    def devices(self, db_session=None):
+        """Device dicts for every a10_device_instances row, keyed by name."""
+
+        with self._lock:
+            self._check(db_session)
+            return dict(self._by_name)
+
+    def get(self, device_id, db_session=None):
+        """The device dict for the row with id device_id, or None."""
+
+        self.devices(db_session=db_session)
+        with self._lock:
+            return self._by_id.get(device_id)
+
+    def invalidate(self, device_id=None):
+        """Forget device_id, or the whole index, and recheck on next use."""
+
+        with self._lock:
+            if device_id is not None:
+                d = self._by_id.pop(device_id, None)
+                if d is not None and self._by_name.get(d['name']) is d:
+                    del self._by_name[d['name']]
+            self._recheck(everything=device_id is None)
+
+    def stats(self):
+        with self._lock:
+            return {'devices': len(self._by_id),
+                    'full_loads': self.full_loads,
+                    'incremental_loads': self.incremental_loads}
+
+
+class DeviceCache(object):
+    """Bounded LRU of device dicts looked up one at a time by name.
+
+    Holds at most device_cache_size entries, each for at most
+    device_cache_ttl seconds; a size of 0 disables the cache. evict()
+    drops the entry for a deleted or changed device instance.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._devices = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name):
+        ttl = self.config.get('device_cache_ttl')
+        with self._lock:
+            entry = self._devices.pop(name, None)
+            if entry is None or (ttl and time.time() - entry[0] > ttl):
+                self.misses += 1
+                return None
+            self._devices[name] = entry
+            self.hits += 1
+            return entry[1]
+
+    def put(self, name, device):
+        max_size = self.config.get('device_cache_size')
+        if not max_size:
+            return
+        with self._lock:
+            self._devices.pop(name, None)
+            self._devices[name] = (time.time(), device)
+            while len(self._devices) > max_size:
+                self._devices.popitem(last=False)
+
+    def evict(self, device_id=None):
+        """Drop the device with id device_id, or everything."""
+
+        with self._lock:
+            if device_id is None:
+                self._devices.clear()
+                return
+            for name in [k for k, v in self._devices.items() if v[1].get('id') == device_id]:
+                del self._devices[name]
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'devices': len(self._devices)}
+
+
+def _shared(registries, cls, config):
+    url = config.get('database_connection')
+    with _lock:
+        if url not in registries:
+            registries[url] = cls(config)
+        return registries[url]
+
+
+def get_registry(config):
+    """The registry shared by every A10Config using the same database.
+
+    Sharing it means an invalidate() from the device instance extension is
+    seen by the driver straight away when both run in one process.
+    """
+
+    return _shared(_registries, DeviceRegistry, config)
+
+
+def get_cache(config):
+    """The DeviceCache shared by every A10Config using the same database."""
+
+    return _shared(_caches, DeviceCache, config)
+
+
+def reconfigure(config):
+    """Point the registry and cache for config's database at config.
+
+    Called on a reload, so the shared objects read the new refresh
+    interval, size and ttl rather than those of the config that happened
+    to create them.
+    """
+
+    url = config.get('database_connection')
+    with _lock:
+        for registries in (_registries, _caches):
+            if url in registries:
+                registries[url].config = config
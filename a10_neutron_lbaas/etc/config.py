@@ -35,17 +35,209 @@
 
 # database_connection = None
 
+# The database connection pool, one per process: how many connections to
+# keep open, how many more to open under load, how many seconds to wait
+# for a free one, after how many seconds to replace a connection (keep
+# this below the server's idle timeout, e.g. MySQL wait_timeout), and
+# whether to test each connection before use.
+
+# db_pool_size = 5
+# db_max_overflow = 10
+# db_pool_timeout = 30
+# db_pool_recycle = 3600
+# db_pool_pre_ping = False
+
+# Devices stored in the database are kept in memory and refreshed from
+# the rows that changed since the last look. This sets how many seconds
+# may pass between checks for changes; 0 checks on every lookup, which is
+# a single aggregate query. Changes made through the device instance
+# extension in this process are always seen at once.
+
+# device_registry_refresh_interval = 0
+
+# Single devices looked up by name in the database are remembered for up
+# to device_cache_ttl seconds, keeping at most device_cache_size of them
+# and dropping the least recently used. A size of 0 disables this cache;
+# a ttl of 0 keeps entries until they are evicted.
+# Devices from this file are not affected.
+
+# device_cache_size = 1000
+# device_cache_ttl = 300
+
+# The default scheduler keeps every tenant -> device binding in memory,
+# loaded once at startup. Other neutron workers' changes to the bindings
+# table are picked up by a generation check (row count and last update
+# time) made at most every tenant_binding_refresh_interval seconds; 0
+# checks on every scheduling decision. A tenant that isn't in memory is
+# always looked up in the database before it is bound.
+
+# tenant_binding_refresh_interval = 10
+
+# With use_database, the default hooks place a new tenant in two steps:
+# filters rule devices out, then weighers score the rest and the best
+# total wins. Each weigher's scores are scaled to 0..1 across the
+# candidates and multiplied by its multiplier. Ties are broken by the
+# tenant's consistent hash, so with no weighers placement is as before,
+# except that the default 'status' filter keeps new tenants off devices
+# with "status": False, which the plain hash ring used to pick; take it
+# out of the list to get the old behavior. Existing tenants stay where
+# they are bound.
+#
+# Filters:
+#   'status'           - device "status" is true
+#   'api_version'      - device "api_version" is in
+#                        device_scheduling_api_versions (None allows all)
+#   'partition_quota'  - an ADP device has fewer tenants than its
+#                        "max_partitions"
+#   'ha_role'          - device "ha_role" is not 'standby'
+#   'health'           - the health monitor hasn't found the device down
+# Weighers:
+#   'capacity'             - device "capacity" (default 1); bigger wins
+#   'tenant_count'         - fewest tenants per unit of capacity
+#   'health'               - devices the health monitor finds degraded lose
+#
+# Either list can also hold functions, f(device, load, config), where load
+# is a dict of the device's 'tenants' count and its 'down' and 'degraded'
+# health flags. The health filter and weigher do
+# nothing unless health_check_interval is set.
+
+# device_scheduling_filters = ['status', 'api_version', 'partition_quota', 'ha_role',
+#                              'health']
+# device_scheduling_weighers = {'health': 1.0}
+# device_scheduling_api_versions = None
+#
+# For example, to fill devices in proportion to their size:
+# device_scheduling_weighers = {'health': 1.0, 'tenant_count': 1.0}
+
+# The tie break between equally weighted devices can use a consistent hash
+# ring with bounded loads instead: each device gets device_hash_vnodes
+# points per unit of "capacity", and a new tenant goes to the first device
+# clockwise from its hash that holds fewer than device_hash_load_factor
+# times its share of the tenants. 1.25 is a good start; 0 keeps the plain
+# ring. Tenants that are already bound never move; to even out existing
+# load, see 'a10-manage rebalance-plan'.
+
+# device_hash_load_factor = 0
+# device_hash_vnodes = 160
+
 # Should only be set to true if projects have been created with
 # parent-child relationships within openstack.
 
 # use_parent_project = False
 
+# With use_parent_project, project parents and children looked up in
+# keystone are remembered for this many seconds (0 disables caching), and
+# at most this many projects are kept.
+
+# keystone_project_cache_ttl = 300
+# keystone_project_cache_size = 10000
+
 #
 # Used to persist partitions upon deletion of lb objects
 #
 
 # disable_partition_delete = False
 
+# Number of authenticated AXAPI sessions to keep open per device between
+# operations. With the default of 0, every operation logs in to the device
+# and logs off again when it is done. Can be overridden per device with
+# a "session_pool_size" key in the device entry.
+
+# session_pool_size = 0
+
+# Pooled sessions that have been idle for longer than this many seconds are
+# logged off instead of reused. Keep this below the ACOS admin idle timeout.
+
+# session_pool_idle_timeout = 300
+
+# Write memory is slow on ACOS. Changes to the same device partition that
+# finish while a write memory is running always share the next one. Setting
+# a window (in seconds) additionally limits each partition to one write
+# memory per window, which helps bulk imports at the cost of up to
+# write_memory_max_delay seconds of extra latency per operation (0 for no
+# cap, so a change may wait a whole window). Neutron status is only set to
+# ACTIVE once the covering write memory is done.
+
+# write_memory_window = 0
+# write_memory_max_delay = 2
+
+# Run 'ha sync' against the devices in a device's ha_sync_list on a
+# background thread, instead of making the neutron request wait for it.
+# Syncs requested while one is already running are collapsed into a single
+# follow-up sync.
+
+# ha_sync_async = False
+
+# After this many consecutive connection failures to a device, operations
+# on it fail immediately with DeviceUnavailable instead of waiting for
+# connect timeouts. After circuit_breaker_cooldown seconds, one operation
+# is let through to see whether the device is back. 0 disables this.
+
+# circuit_breaker_threshold = 5
+# circuit_breaker_cooldown = 30
+
+# How long an operation waits for a free session slot on a device with
+# max_concurrent_sessions set, before failing with DeviceBusy.
+
+# max_concurrent_sessions_timeout = 60
+
+# Every health_check_interval seconds (randomized by health_check_jitter
+# of it), a background thread calls system.information on every device,
+# configured and database, all at once, and keeps a table of their health.
+# A device that fails health_check_down_failures probes in a row, or
+# doesn't answer in health_check_timeout seconds that many times, is down:
+# operations on it fail at once with DeviceUnavailable, and the scheduler
+# gives it no new tenants. A device that fails more than
+# health_check_degraded_error_rate of its last health_check_window probes,
+# or takes more than health_check_degraded_latency seconds on average to
+# answer, is degraded, and new tenants go elsewhere if they can. Tenants
+# already bound to a device stay there. 0 disables the health checks.
+# Each device keeps one AXAPI admin session open for the probes; it logs in
+# again only after a failed probe, or when ACOS has timed the session out
+# between rounds.
+
+# health_check_interval = 0
+# health_check_jitter = 0.2
+# health_check_timeout = 10
+# health_check_window = 10
+# health_check_down_failures = 3
+# health_check_degraded_error_rate = 0.2
+# health_check_degraded_latency = 2.0
+
+# AXAPI calls that fail with a connection error, timeout, busy or unknown
+# error are retried up to axapi_retry_attempts times, with randomized
+# exponential backoff starting at axapi_retry_backoff seconds, and never
+# past axapi_retry_deadline seconds after the first try. Calls that are not
+# safe to repeat, like create, are only retried when the device clearly
+# didn't act on them. Off (0) by default: acos_client already retries
+# connection errors itself (max_retries) and logs in again on an expired
+# session, and these retries come on top of those. Against a dead device
+# that multiplies the time each call takes, and delays the circuit
+# breaker's fast failure by as much. Keep attempts and the deadline low
+# when turning this on.
+
+# axapi_retry_attempts = 0
+# axapi_retry_backoff = 0.5
+# axapi_retry_deadline = 30
+
+# Every operation records how long it spent selecting a device, waiting for
+# a session slot, logging in, looking up and selecting a partition, in the
+# handler itself, in write memory, in ha sync and reporting status back to
+# neutron. If set, these histograms are written to this file in Prometheus
+# text format, at most once every metrics_dump_interval seconds, along with
+# the size and use of each database connection pool. Plumbing hooks can also
+# get each timing through a10_context_phase_timing().
+
+# metrics_file = '/var/lib/node_exporter/textfile/a10_neutron_lbaas.prom'
+# metrics_dump_interval = 60
+
+# If set, this file is checked for changes every config_reload_interval
+# seconds, and a changed file is loaded without restarting neutron-server.
+# Operations already running finish with the config they started with. A
+# file that fails to load is logged and ignored. 0 disables reloading.
+
+# config_reload_interval = 0
+
 # Sometimes we need things from neutron. We will look in the usual places,
 # but this is here if you need to override the location.
 
@@ -197,6 +389,21 @@ devices = {
     # changes ACOS's running state. Turning this off also disables all ha sync
     # operations, regardless of the settings in ha_sync_list.
     #     "write_memory": True,
+    #
+    # Maximum number of operations the driver runs against this device at
+    # once; further operations queue up in arrival order, and give up after
+    # max_concurrent_sessions_timeout seconds. 0 means no limit.
+    #     "max_concurrent_sessions": 0,
+    #
+    # Relative size of the device, for the scheduler's weighers; a device
+    # with capacity 4 is given four times the tenants of one with 1.
+    #     "capacity": 1,
+    #
+    # Set to 'standby' to keep new tenants off the device.
+    #     "ha_role": "active",
+    #
+    # With v_method ADP, the most tenants (partitions) to place on it.
+    #     "max_partitions": None,
     # },
 }
 
@@ -246,4 +453,21 @@ devices = {
 #         'password': ''
 #     }
 # }
+# Extra settings for every vport. Devices may have their own
+# "vport_defaults", which win over these, and the "json" of a matching
+# vport_expressions entry wins over both. A setting that only applies to
+# some protocols can carry a condition:
+#
+# vport_defaults = {
+#     "template-cache": {
+#         "value": "my-cache-template",
+#         "condition": {"field": "protocol", "op": "in", "value": ["http", "https"]},
+#     },
+# }
+#
+# Supported ops are "=", "!=", "in" and "not in"; "protocol" is the only
+# field. Without a condition of their own, "ha-conn-mirror" only applies to
+# tcp/udp, "template-http" only to http/https, and "no-dest-nat" to
+# everything except http/https.
+
 vport_defaults = {}
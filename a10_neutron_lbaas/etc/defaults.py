@@ -20,14 +20,52 @@ GLOBAL_DEFAULTS = {
     "verify_appliances": False,
     "use_database": False,
     "database_connection": None,
+    "db_pool_size": 5,
+    "db_max_overflow": 10,
+    "db_pool_timeout": 30,
+    "db_pool_recycle": 3600,
+    "db_pool_pre_ping": False,
+    "device_registry_refresh_interval": 0,
+    "device_cache_size": 1000,
+    "device_cache_ttl": 300,
+    "tenant_binding_refresh_interval": 10,
+    "device_scheduling_filters": ['status', 'api_version', 'partition_quota', 'ha_role',
+                                  'health'],
+    "device_scheduling_weighers": {'health': 1.0},
+    "device_scheduling_api_versions": None,
+    "device_hash_load_factor": 0,
+    "device_hash_vnodes": 160,
     "neutron_conf_dir": '/etc/neutron',
+    "config_reload_interval": 0,
     "member_name_use_uuid": False,
     "keystone_auth_url": None,
     "keystone_version": 2,
     "plumbing_hooks_class": a10_neutron_lbaas.plumbing_hooks.PlumbingHooks,
     "nova_api_version": "2.1",
     "vport_defaults": {},
-    "use_parent_project": False
+    "use_parent_project": False,
+    "keystone_project_cache_ttl": 300,
+    "keystone_project_cache_size": 10000,
+    "session_pool_size": 0,
+    "session_pool_idle_timeout": 300,
+    "write_memory_window": 0,
+    "write_memory_max_delay": 2,
+    "ha_sync_async": False,
+    "circuit_breaker_threshold": 5,
+    "circuit_breaker_cooldown": 30,
+    "max_concurrent_sessions_timeout": 60,
+    "axapi_retry_attempts": 0,
+    "axapi_retry_backoff": 0.5,
+    "axapi_retry_deadline": 30,
+    "metrics_file": None,
+    "metrics_dump_interval": 60,
+    "health_check_interval": 0,
+    "health_check_jitter": 0.2,
+    "health_check_timeout": 10,
+    "health_check_window": 10,
+    "health_check_down_failures": 3,
+    "health_check_degraded_error_rate": 0.2,
+    "health_check_degraded_latency": 2.0,
 }
 
 DEVICE_REQUIRED_FIELDS = [
@@ -50,6 +88,7 @@ DEVICE_OPTIONAL_DEFAULTS = {
     "ha_sync_list": [],
     "write_memory": True,
     "vport_defaults": {},
+    "max_concurrent_sessions": 0,
     # "max_instance": 5000,
     # "method": "hash",
 
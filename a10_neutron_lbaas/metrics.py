@@ -0,0 +1,133 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import os
+import threading
+import time
+
+from a10_neutron_lbaas.db import api as db_api
+
+LOG = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+TAG_NAMES = ('handler', 'action', 'device', 'partition')
+
+
+class Histogram(object):
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, le in enumerate(self.buckets):
+            if value <= le:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class PhaseMetrics(object):
+    """Latency histograms for the phases of an A10Context, by tag set.
+
+    Phases are recorded as a10_context_phase_seconds{phase=...,handler=...,
+    action=...,device=...,partition=...}. If metrics_file is configured, the
+    histograms are written there in Prometheus text format at most every
+    metrics_dump_interval seconds, e.g. for the node_exporter textfile
+    collector.
+
+    The dump also carries the database connection pools, as
+    a10_db_pool_connections{url=...,state=size|checkedin|checkedout|overflow}.
+    """
+
+    name = 'a10_context_phase_seconds'
+    pool_name = 'a10_db_pool_connections'
+
+    def __init__(self, config=None):
+        self.config = config
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._last_dump = 0
+
+    def observe(self, phase, elapsed, tags):
+        key = (phase,) + tuple(tags.get(t) or '' for t in TAG_NAMES)
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = Histogram()
+            h.observe(elapsed)
+
+    def snapshot(self):
+        with self._lock:
+            return dict((k, (list(h.counts), h.count, h.sum))
+                        for k, h in self._histograms.items())
+
+    def prometheus_text(self):
+        lines = ['# HELP %s Time spent in each A10Context phase.' % self.name,
+                 '# TYPE %s histogram' % self.name]
+        for key, (counts, count, total) in sorted(self.snapshot().items()):
+            labels = ','.join('%s="%s"' % (n, _escape(v))
+                              for n, v in zip(('phase',) + TAG_NAMES, key))
+            cumulative = 0
+            for le, n in zip(BUCKETS + ('+Inf',), counts):
+                cumulative += n
+                lines.append('%s_bucket{%s,le="%s"} %d' % (self.name, labels, le, cumulative))
+            lines.append('%s_sum{%s} %.6f' % (self.name, labels, total))
+            lines.append('%s_count{%s} %d' % (self.name, labels, count))
+        lines.extend(self._pool_lines())
+        return '\n'.join(lines) + '\n'
+
+    def _pool_lines(self):
+        pools = db_api.pool_stats()
+        if not pools:
+            return []
+        lines = ['# HELP %s Database connections by pool state.' % self.pool_name,
+                 '# TYPE %s gauge' % self.pool_name]
+        for url, stats in sorted(pools.items()):
+            for state in ('size', 'checkedin', 'checkedout', 'overflow'):
+                if state in stats:
+                    lines.append('%s{url="%s",state="%s"} %d' % (
+                        self.pool_name, _escape(url), state, stats[state]))
+        return lines
+
+    def dump(self, path):
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus_text())
+        os.rename(tmp, path)
+
+    def maybe_dump(self, force=False):
+        path = self.config.get('metrics_file') if self.config else None
+        if not path:
+            return
+
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_dump < self.config.get('metrics_dump_interval'):
+                return
+            self._last_dump = now
+
+        try:
+            self.dump(path)
+        except Exception:
+            LOG.exception("PhaseMetrics: could not write %s; ignoring", path)
@@ -0,0 +1,75 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import re
+import threading
+
+from six import iteritems
+
+# Characters that make a pattern more than a plain string
+_SPECIAL = re.compile(r'[\\.^$*+?{}\[\]|()]')
+
+MEMO_SIZE = 4096
+
+
+def _literal_prefix(regex_str):
+    """'abc' for '^abc', None if the pattern needs the regex engine."""
+
+    if regex_str.startswith('^') and not _SPECIAL.search(regex_str[1:]):
+        return regex_str[1:]
+    return None
+
+
+class NameMatcher(object):
+    """A compiled *_expressions table from config.py.
+
+    Patterns are compiled once, in table order; the first one that
+    searches true for a name wins, exactly as before. '^literal' patterns
+    are checked with startswith instead of the regex engine. The result
+    for each name is remembered, so names seen again cost a dict lookup.
+    """
+
+    def __init__(self, expressions):
+        self.expressions = expressions
+        self._lock = threading.Lock()
+        self._memo = {}
+        self._rules = []
+        for k, v in iteritems(expressions):
+            prefix = _literal_prefix(v["regex"])
+            if prefix is not None:
+                self._rules.append((prefix, None, v["json"]))
+            else:
+                self._rules.append((None, re.compile(v["regex"]), v["json"]))
+
+    def _search(self, name):
+        for prefix, regex, json_merge in self._rules:
+            if prefix is not None:
+                if name.startswith(prefix):
+                    return json_merge
+            elif regex.search(name):
+                return json_merge
+        return None
+
+    def match(self, name):
+        """The json of the first expression matching name, or None."""
+
+        with self._lock:
+            if name in self._memo:
+                return self._memo[name]
+
+        json_merge = self._search(name)
+
+        with self._lock:
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[name] = json_merge
+        return json_merge
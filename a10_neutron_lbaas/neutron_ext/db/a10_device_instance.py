@@ -36,7 +36,7 @@ class A10DeviceInstanceDbMixin(common_db_mixin.CommonDbMixin,
 
     def __init__(self, *args, **kwargs):
         super(A10DeviceInstanceDbMixin, self).__init__(*args, **kwargs)
-        self.config = a10_config.A10Config()
+        self.config = a10_config.get_config()
 
     def _get_a10_device_instance(self, context, a10_device_instance_id):
         try:
@@ -95,6 +95,7 @@ class A10DeviceInstanceDbMixin(common_db_mixin.CommonDbMixin,
                 host=body['host'])
             context.session.add(instance_record)
 
+        self.config.invalidate_devices(instance_record.id)
         return self._make_a10_device_instance_dict(instance_record)
 
     def get_a10_device_instance(self, context, a10_device_instance_id, fields=None):
@@ -118,10 +119,14 @@ class A10DeviceInstanceDbMixin(common_db_mixin.CommonDbMixin,
             instance = self._get_by_id(context, models.A10DeviceInstance, id)
             context.session.delete(instance)
 
+        self.config.invalidate_devices(id)
+
     def update_a10_device_instance(self, context, id, a10_device_instance):
         with context.session.begin(subtransactions=True):
             instance = self._get_by_id(context, models.A10DeviceInstance,
                                        id)
             instance.update(**a10_device_instance.get("a10_device_instance"))
+            result = self._make_a10_device_instance_dict(instance)
 
-            return self._make_a10_device_instance_dict(instance)
+        self.config.invalidate_devices(id)
+        return result
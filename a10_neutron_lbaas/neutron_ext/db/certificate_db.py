@@ -110,7 +110,7 @@ class A10CertificateDbMixin(common_db_mixin.CommonDbMixin, a10Certificate.A10Cer
 
     def __init__(self, *args, **kwargs):
         super(A10CertificateDbMixin, self).__init__(*args, **kwargs)
-        self.config = a10_config.A10Config()
+        self.config = a10_config.get_config()
 
     """Class to support SSL certificates and their association with VIPs."""
 
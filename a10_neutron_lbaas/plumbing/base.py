@@ -81,3 +81,9 @@ class BasePlumbingHooks(object):
 
     def after_select_partition(self, a10_context):
         pass
+
+    def a10_context_phase_timing(self, a10_context, phase, elapsed, tags):
+        pass
+
+    def config_reloaded(self, old_config, new_config):
+        pass
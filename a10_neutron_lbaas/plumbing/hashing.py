@@ -0,0 +1,107 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import bisect
+import hashlib
+import math
+import threading
+
+from a10_neutron_lbaas import a10_exceptions as ex
+
+DEFAULT_VNODES = 160
+
+_lock = threading.Lock()
+_rings = {}
+_MAX_RINGS = 64
+
+
+def _point(key):
+    return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:16], 16)
+
+
+class BoundedLoadHash(object):
+    """Consistent hash ring with bounded loads.
+
+    Each device gets vnodes points on the ring per unit of capacity, so
+    adding a device only takes over the arcs next to its own points. A
+    token goes to the first device clockwise from its point that is under
+    its bound: load_factor times its capacity share of the total load
+    (with the new token counted). No device ever ends up above the bound,
+    and a token only moves past its home when the home is full.
+    """
+
+    def __init__(self, servers, capacities=None, vnodes=DEFAULT_VNODES):
+        capacities = capacities or {}
+        self.capacities = dict((s, float(capacities.get(s, 1)) or 1.0) for s in servers)
+        points = []
+        for s in servers:
+            for i in range(int(math.ceil(vnodes * self.capacities[s]))):
+                points.append((_point('%s-%d' % (s, i)), s))
+        points.sort()
+        self._points = [p for p, s in points]
+        self._servers = [s for p, s in points]
+
+    def walk(self, token):
+        """Every device, in ring order clockwise from token."""
+
+        if not self._points:
+            raise ex.NoDevicesAvailableError("Hash ring has no devices")
+        start = bisect.bisect(self._points, _point(token))
+        n = len(self._points)
+        seen = set()
+        for i in range(n):
+            s = self._servers[(start + i) % n]
+            if s not in seen:
+                seen.add(s)
+                yield s
+                if len(seen) == len(self.capacities):
+                    return
+
+    def bounds(self, loads, load_factor, extra=1):
+        """{device: most tokens it may hold} with extra more tokens placed."""
+
+        total = sum(loads.get(s, 0) for s in self.capacities) + extra
+        weight = sum(self.capacities.values())
+        return dict((s, math.ceil(load_factor * total * c / weight))
+                    for s, c in self.capacities.items())
+
+    def get_server(self, token, loads=None, load_factor=0):
+        """The device for token; with loads and a load_factor, the first
+        one clockwise that isn't full.
+        """
+
+        if not loads or not load_factor:
+            return next(self.walk(token))
+
+        bounds = self.bounds(loads, load_factor)
+        for s in self.walk(token):
+            if loads.get(s, 0) < bounds[s]:
+                return s
+        # Only possible with a load_factor below 1
+        return next(self.walk(token))
+
+
+def get_ring(servers, capacities=None, vnodes=DEFAULT_VNODES):
+    """A BoundedLoadHash for servers, shared while the device set stays the same."""
+
+    capacities = capacities or {}
+    servers = sorted(servers)
+    key = (tuple(servers), tuple(capacities.get(s, 1) for s in servers), vnodes)
+    with _lock:
+        ring = _rings.get(key)
+    if ring is None:
+        ring = BoundedLoadHash(servers, capacities, vnodes)
+        with _lock:
+            if len(_rings) >= _MAX_RINGS:
+                _rings.clear()
+            _rings[key] = ring
+    return ring
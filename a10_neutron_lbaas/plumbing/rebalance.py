@@ -0,0 +1,182 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Plan tenant moves that even out the load across devices.
+
+Reads a10_tenant_bindings and the configured devices, and writes a JSON
+plan; nothing is moved. Each device gets a target share of the tenants
+in proportion to its "capacity". Only devices more than the tolerance
+over their target give tenants up, and only as many as it takes, so the
+plan is the smallest set of moves that brings every device within
+tolerance. Tenants bound to devices that are no longer configured are
+always moved. Receiving devices are picked with the bounded-load hash
+ring, so a moved tenant lands where the scheduler would place it.
+
+The moves are grouped into steps, one per source device partition, for
+a migration tool to run one partition at a time.
+
+    python -m a10_neutron_lbaas.plumbing.rebalance [--tolerance 0.1] [plan.json]
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import datetime
+import json
+import math
+import os
+import sys
+
+from six import iteritems
+
+from a10_neutron_lbaas.plumbing import hashing
+
+PLAN_VERSION = 1
+
+
+def _receives(device):
+    return bool(device.get('status', True)) and device.get('ha_role', 'active') != 'standby'
+
+
+def _partition(device, tenant_id):
+    if device is None:
+        return None
+    if str(device.get('v_method', '')).upper() == 'ADP':
+        return tenant_id[0:13]
+    return device.get('shared_partition', 'shared')
+
+
+def plan(bindings, devices, tolerance=0.1, vnodes=hashing.DEFAULT_VNODES):
+    """The rebalance plan for bindings ({tenant_id: device_name}) over
+    devices ({name: device dict}), as a dict ready for json.
+    """
+
+    by_device = collections.defaultdict(list)
+    for tenant_id, device_name in iteritems(bindings):
+        by_device[device_name].append(tenant_id)
+
+    receivers = sorted(k for k, d in iteritems(devices) if _receives(d))
+    capacities = dict((k, float(devices[k].get('capacity', 1)) or 1.0) for k in receivers)
+
+    # Devices that take no new tenants keep what they have
+    kept = sum(len(v) for k, v in iteritems(by_device) if k in devices and k not in receivers)
+    total = len(bindings) - kept
+    weight = sum(capacities.values())
+
+    targets = {}
+    upper = {}
+    for k in receivers:
+        targets[k] = total * capacities[k] / weight
+        upper[k] = max(int(math.ceil(targets[k])), int(math.floor(targets[k] * (1 + tolerance))))
+
+    ring = hashing.BoundedLoadHash(receivers, capacities, vnodes) if receivers else None
+
+    # Pick who leaves each device over its limit; tenants the ring would
+    # place elsewhere go first, since the scheduler agrees they belong there
+    moving = []
+    for device_name in sorted(by_device):
+        tenants = sorted(by_device[device_name])
+        if device_name not in devices:
+            limit = 0
+        elif device_name not in receivers:
+            continue
+        else:
+            limit = upper[device_name]
+        surplus = len(tenants) - limit
+        if surplus <= 0:
+            continue
+        tenants.sort(key=lambda t: (ring is not None and ring.get_server(t) == device_name, t))
+        moving.extend((t, device_name) for t in tenants[:surplus])
+
+    loads = dict((k, len(by_device.get(k, []))) for k in receivers)
+    for t, source in moving:
+        if source in loads:
+            loads[source] -= 1
+
+    moves = []
+    for tenant_id, source in moving:
+        dest = None
+        if ring is not None:
+            dest = next((k for k in ring.walk(tenant_id) if loads[k] < upper[k]), None)
+        if dest is None:
+            raise ValueError("Not enough device capacity to place tenant %s" % tenant_id)
+        loads[dest] += 1
+        moves.append({'tenant_id': tenant_id, 'from': source, 'to': dest,
+                      'partition': _partition(devices.get(source), tenant_id)})
+
+    steps = collections.OrderedDict()
+    for m in sorted(moves, key=lambda m: (m['from'], m['partition'] or '', m['tenant_id'])):
+        steps.setdefault((m['from'], m['partition']), []).append(
+            {'tenant_id': m['tenant_id'], 'from': m['from'], 'to': m['to']})
+
+    after = collections.Counter(bindings.values())
+    for m in moves:
+        after[m['from']] -= 1
+        after[m['to']] += 1
+
+    summary = {}
+    for k in sorted(set(devices) | set(by_device)):
+        summary[k] = {
+            'capacity': capacities.get(k),
+            'target': round(targets[k], 2) if k in targets else None,
+            'tenants_before': len(by_device.get(k, [])),
+            'tenants_after': after[k],
+        }
+
+    return {
+        'version': PLAN_VERSION,
+        'created_at': datetime.datetime.utcnow().isoformat(),
+        'tolerance': tolerance,
+        'devices': summary,
+        'moves': len(moves),
+        'steps': [{'device': device_name, 'partition': partition, 'moves': tenant_moves}
+                  for (device_name, partition), tenant_moves in iteritems(steps)],
+    }
+
+
+def write_plan(rebalance_plan, path):
+    """Write the plan to path, replacing any old plan in one rename."""
+
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(rebalance_plan, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.rename(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan tenant moves between A10 devices")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="how far over its target a device may stay (default 0.1)")
+    parser.add_argument('output', nargs='?', help="plan file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    from a10_neutron_lbaas import a10_config
+    from a10_neutron_lbaas.db import models
+
+    config = a10_config.get_config()
+    bindings = dict((b.tenant_id, b.device_name) for b in models.A10TenantBinding.find_all())
+    rebalance_plan = plan(bindings, config.get_devices(), args.tolerance,
+                          config.get('device_hash_vnodes'))
+
+    if args.output:
+        write_plan(rebalance_plan, args.output)
+        print("%d moves in %d steps written to %s" % (
+            rebalance_plan['moves'], len(rebalance_plan['steps']), args.output))
+    else:
+        json.dump(rebalance_plan, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+
+import acos_client
+from six import iteritems
+from six import string_types
+
+from a10_neutron_lbaas import a10_exceptions as ex
+from a10_neutron_lbaas.plumbing import hashing
+
+LOG = logging.getLogger(__name__)
+
+
+# Filters: f(device, load, config) -> False to rule the device out.
+# load is a dict of the device's 'tenants' count and its 'down' and
+# 'degraded' flags from the health monitor.
+
+def status_filter(device, load, config):
+    return bool(device.get('status', True))
+
+
+def api_version_filter(device, load, config):
+    versions = config.get('device_scheduling_api_versions')
+    return not versions or device.get('api_version') in versions
+
+
+def partition_quota_filter(device, load, config):
+    # Every tenant on an ADP device takes a partition of its own
+    limit = device.get('max_partitions')
+    if not limit or str(device.get('v_method', '')).upper() != 'ADP':
+        return True
+    return load['tenants'] < limit
+
+
+def ha_role_filter(device, load, config):
+    return device.get('ha_role', 'active') != 'standby'
+
+
+def health_filter(device, load, config):
+    return not load['down']
+
+
+# Weighers: f(device, load, config) -> number; bigger is better.
+
+def _capacity(device):
+    return float(device.get('capacity', 1)) or 1.0
+
+
+def capacity_weigher(device, load, config):
+    return _capacity(device)
+
+
+def tenant_count_weigher(device, load, config):
+    return -load['tenants'] / _capacity(device)
+
+
+def health_weigher(device, load, config):
+    return -load['degraded']
+
+
+FILTERS = {
+    'status': status_filter,
+    'api_version': api_version_filter,
+    'partition_quota': partition_quota_filter,
+    'ha_role': ha_role_filter,
+    'health': health_filter,
+}
+
+WEIGHERS = {
+    'capacity': capacity_weigher,
+    'tenant_count': tenant_count_weigher,
+    'health': health_weigher,
+}
+
+
+def _resolve(entry, table, kind):
+    if isinstance(entry, string_types):
+        if entry not in table:
+            raise ex.InvalidConfig("Unknown device scheduling %s %s" % (kind, entry))
+        return table[entry]
+    return entry
+
+
+class DeviceScheduler(object):
+    """Picks the device for a new tenant with a filter and weigher pipeline.
+
+    Filters named in device_scheduling_filters rule devices out. Each
+    weigher in device_scheduling_weighers scores the survivors; the
+    scores are scaled to 0..1 across the candidates, multiplied by the
+    weigher's multiplier and summed, and the best total wins. Devices
+    that tie are chosen between by consistent hash of the tenant, so with
+    no weighers the choice is the hash ring's, as before. With
+    device_hash_load_factor set, that hash is a bounded-load ring, which
+    skips devices already holding more than their share of tenants.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def _filters(self):
+        return [_resolve(x, FILTERS, 'filter')
+                for x in self.config.get('device_scheduling_filters') or []]
+
+    def _weighers(self):
+        weighers = self.config.get('device_scheduling_weighers') or {}
+        if isinstance(weighers, dict):
+            weighers = weighers.items()
+        return [(_resolve(k, WEIGHERS, 'weigher'), float(v)) for k, v in weighers]
+
+    def weigh(self, candidates, devices, loads):
+        """{device name: total weight} for the candidate device names."""
+
+        totals = dict((k, 0.0) for k in candidates)
+        for weigher, multiplier in self._weighers():
+            raw = dict((k, weigher(devices[k], loads[k], self.config)) for k in candidates)
+            lo, hi = min(raw.values()), max(raw.values())
+            if hi == lo:
+                continue
+            for name, w in iteritems(raw):
+                totals[name] += multiplier * (w - lo) / (hi - lo)
+        return totals
+
+    def select(self, tenant_id, devices, load, ring=None):
+        """The device dict for tenant_id, from devices ({name: device}).
+
+        load(name) returns the device's load dict. ring, if given, is an
+        acos_client.Hash of all of devices, used when every device ties.
+        """
+
+        loads = {}
+        for name in devices:
+            loads[name] = collections.defaultdict(int, load(name))
+
+        candidates = list(devices)
+        for f in self._filters():
+            candidates = [k for k in candidates if f(devices[k], loads[k], self.config)]
+        if not candidates:
+            raise ex.NoDevicesAvailableError(
+                "No device passed the scheduling filters for tenant %s" % tenant_id)
+
+        totals = self.weigh(candidates, devices, loads)
+        best = max(totals.values())
+        names = [k for k, v in iteritems(totals) if best - v < 1e-9]
+        factor = self.config.get('device_hash_load_factor')
+        if factor:
+            capacities = dict((k, devices[k].get('capacity', 1)) for k in names)
+            vnodes = self.config.get('device_hash_vnodes') or hashing.DEFAULT_VNODES
+            bounded = hashing.get_ring(names, capacities, vnodes)
+            tenants = dict((k, loads[k]['tenants']) for k in names)
+            name = bounded.get_server(tenant_id, tenants, factor)
+        else:
+            if ring is None or len(names) != len(devices):
+                ring = acos_client.Hash(sorted(names))
+            name = ring.get_server(tenant_id)
+        LOG.debug("DeviceScheduler: tenant %s -> %s (weights %s)", tenant_id, name, totals)
+        return devices[name]
@@ -15,9 +15,12 @@
 import acos_client
 
 from a10_neutron_lbaas import a10_exceptions as ex
+from a10_neutron_lbaas.client_proxies import health
 from a10_neutron_lbaas.db import models
 
 from a10_neutron_lbaas.plumbing import base
+from a10_neutron_lbaas.plumbing import scheduler
+from a10_neutron_lbaas.plumbing import tenant_bindings
 
 
 # The default set of plumbing hooks/scheduler, meant for hardware or manual orchestration
@@ -33,13 +36,55 @@ class PlumbingHooks(base.BasePlumbingHooks):
             self.devices = get_devices_func()
         else:
             self.devices = None
+        self._devices_from_config = self.devices is None
         self.appliance_hash = None
+        self.tenant_bindings = None
 
     def _late_init(self):
         if self.devices is None:
             self.devices = self.driver.config.get_devices()
         if self.appliance_hash is None:
             self.appliance_hash = acos_client.Hash(list(self.devices))
+        if self.driver is not None and self.driver.config.get('use_database'):
+            self._tenant_bindings()
+
+    def _tenant_bindings(self, db_session=None):
+        if self.tenant_bindings is None:
+            if self.driver is not None:
+                config = self.driver.config
+            else:
+                config = {'tenant_binding_refresh_interval': 0}
+            bindings = tenant_bindings.TenantBindingCache(config)
+            bindings.load(db_session=db_session)
+            self.tenant_bindings = bindings
+        return self.tenant_bindings
+
+    def _device_load(self, device_name):
+        load = {'tenants': self.tenant_bindings.tenant_count(device_name)}
+        monitor = getattr(self.driver, 'health', None)
+        if monitor is not None:
+            status = monitor.status(self.devices[device_name])
+            if status in (health.DOWN, health.DEGRADED):
+                load[status] = 1
+        return load
+
+    def _select_device_scheduled(self, tenant_id):
+        self._late_init()
+
+        # Only new tenants are scheduled; a binding never moves by itself
+        config = self.driver.config if self.driver is not None else {}
+        return scheduler.DeviceScheduler(config).select(
+            tenant_id, self.devices, self._device_load, ring=self.appliance_hash)
+
+    def config_reloaded(self, old_config, new_config):
+        if not self._devices_from_config or self.devices is None:
+            return
+
+        # Only rebuild the hash ring if the device set changed
+        devices = new_config.get_devices()
+        if devices != self.devices:
+            self.devices = devices
+            self.appliance_hash = acos_client.Hash(list(devices))
 
     def _select_device_hash(self, tenant_id):
         self._late_init()
@@ -52,21 +97,30 @@ class PlumbingHooks(base.BasePlumbingHooks):
         self._late_init()
 
         # See if we have a saved tenant
-        a10 = models.A10TenantBinding.find_by_tenant_id(tenant_id, db_session=db_session)
-        if a10 is not None:
-            if a10.device_name in self.devices:
-                return self.devices[a10.device_name]
+        bindings = self._tenant_bindings(db_session)
+        device_name = bindings.get(tenant_id, db_session=db_session)
+        if device_name is None:
+            # Another worker may have bound it since we last looked
+            a10 = models.A10TenantBinding.find_by_tenant_id(tenant_id, db_session=db_session)
+            if a10 is not None:
+                bindings.put(a10)
+                device_name = a10.device_name
+
+        if device_name is not None:
+            if device_name in self.devices:
+                return self.devices[device_name]
             else:
                 raise ex.DeviceConfigMissing(
                     'A10 device %s mapped to tenant %s is not present in config; '
                     'add it back to config or migrate loadbalancers' %
-                    (a10.device_name, tenant_id))
+                    (device_name, tenant_id))
 
-        # Nope, so we hash and save
-        d = self._select_device_hash(tenant_id)
-        models.A10TenantBinding.create_and_save(
+        # Nope, so we schedule and save
+        d = self._select_device_scheduled(tenant_id)
+        a10 = models.A10TenantBinding.create_and_save(
             tenant_id=tenant_id, device_name=d['name'],
             db_session=db_session)
+        bindings.put(a10)
 
         return d
 
@@ -0,0 +1,121 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import logging
+import time
+
+from a10_neutron_lbaas.db import table_cache
+
+LOG = logging.getLogger(__name__)
+
+
+class TenantBindingCache(table_cache.VersionedTableCache):
+    """Write-through copy of a10_tenant_bindings, as tenant_id -> device_name.
+
+    load() reads the whole table once. After that, get() is a dict lookup,
+    plus a check for rows other workers changed at most every
+    tenant_binding_refresh_interval seconds. Bindings this process creates
+    go in through put(). A tenant that isn't cached is always looked up in
+    the database before the caller makes a new binding for it.
+
+    The number of tenants bound to each device is kept alongside, for the
+    scheduler.
+    """
+
+    refresh_interval_option = 'tenant_binding_refresh_interval'
+
+    def __init__(self, config):
+        super(TenantBindingCache, self).__init__(config)
+        self._by_id = {}
+        self._by_tenant = {}
+        self._tenants = collections.Counter()
+        self.hits = 0
+        self.misses = 0
+
+    def _model(self):
+        from a10_neutron_lbaas.db import models
+        return models.A10TenantBinding
+
+    def _clear(self):
+        self._by_id = {}
+        self._by_tenant = {}
+        self._tenants = collections.Counter()
+
+    def _bind(self, tenant_id, device_name):
+        old = self._by_tenant.get(tenant_id)
+        if old is not None:
+            self._tenants[old] -= 1
+        if device_name is None:
+            self._by_tenant.pop(tenant_id, None)
+        else:
+            self._by_tenant[tenant_id] = device_name
+            self._tenants[device_name] += 1
+
+    def _add(self, row):
+        old = self._by_id.get(row.id)
+        if old is not None and old[0] != row.tenant_id:
+            self._bind(old[0], None)
+        self._by_id[row.id] = (row.tenant_id, row.device_name)
+        self._bind(row.tenant_id, row.device_name)
+
+    def _size(self):
+        return len(self._by_id)
+
+    def load(self, db_session=None):
+        """Read every binding; called once, when the plumbing hooks start."""
+
+        with self._lock:
+            self._full_load(db_session)
+            self._checked_at = time.time()
+        LOG.debug("TenantBindingCache: loaded %s bindings", len(self._by_tenant))
+
+    def get(self, tenant_id, db_session=None):
+        """The device name tenant_id is bound to, or None if not cached."""
+
+        with self._lock:
+            self._check(db_session)
+            device_name = self._by_tenant.get(tenant_id)
+            if device_name is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return device_name
+
+    def put(self, binding):
+        """Remember a binding row this process found or saved."""
+
+        with self._lock:
+            self._add(binding)
+
+    def invalidate(self, tenant_id=None):
+        """Forget tenant_id, or everything, and recheck the table on next use."""
+
+        with self._lock:
+            if tenant_id is not None:
+                self._bind(tenant_id, None)
+                for k in [k for k, v in self._by_id.items() if v[0] == tenant_id]:
+                    del self._by_id[k]
+            self._recheck(everything=tenant_id is None)
+
+    def tenant_count(self, device_name):
+        """How many tenants are bound to device_name."""
+
+        with self._lock:
+            return self._tenants[device_name]
+
+    def stats(self):
+        with self._lock:
+            return {'bindings': len(self._by_tenant),
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'full_loads': self.full_loads}
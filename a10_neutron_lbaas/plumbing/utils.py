@@ -13,11 +13,10 @@
 #    under the License.
 
 from netaddr import IPAddress as ipaddr
-from netaddr import IPRange as iprange
-from netaddr import IPSet as ipset
 
 from oslo_log import log
 
+import bisect
 import random
 
 LOG = log.getLogger.__name__
@@ -35,16 +34,21 @@ class IPHelpers(object):
         return mac_address
 
     @staticmethod
-    def find_unused_ip(ip_range_begin, ip_range_end, ips_in_use):
-        candidate = None
-
-        in_range = ipset(iprange(ip_range_begin, ip_range_end))
-        in_use = ipset(ips_in_use)
-
-        try:
-            candidate = str(ipaddr((in_range - in_use).pop()))
-        except Exception:
-            LOG.error("Could not allocate IP address for range:{0}-{1}".format(
-                ip_range_begin, ip_range_end))
-        finally:
-            return candidate
+    def unused_ips(pools, ips_in_use):
+        """Yield the free addresses of pools, [(first_ip, last_ip)], lowest first.
+
+        Only the addresses in use are held in memory, as sorted integers;
+        the pools are walked, never expanded, so a /16 costs no more than
+        a /28 with the same allocations.
+        """
+        used = sorted(set(int(ipaddr(x)) for x in ips_in_use))
+        for first, last in sorted((ipaddr(a), ipaddr(b)) for a, b in pools):
+            candidate, end = int(first), int(last)
+            i = bisect.bisect_left(used, candidate)
+            while candidate <= end:
+                if i < len(used) and used[i] == candidate:
+                    candidate += 1
+                    i += 1
+                    continue
+                yield str(ipaddr(candidate, first.version))
+                candidate += 1
@@ -76,7 +76,8 @@ class VThunderPerTenantPlumbingHooks(base.BasePlumbingHooks):
             "vport_expressions",
             "virtual_server_expressions",
             "service_group_expressions",
-            "member_expressions"
+            "member_expressions",
+            "max_concurrent_sessions",
         ]
 
         for x in remove_config_keys:
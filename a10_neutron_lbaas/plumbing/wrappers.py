@@ -15,6 +15,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from neutron_lib import exceptions as n_exc
+from oslo_db import exception as db_exc
 from oslo_log import log
 from oslo_utils import uuidutils
 
@@ -101,6 +103,8 @@ class NeutronDbWrapper(object):
     BINDING_PROFILE = ""
     BINDING_VIF_TYPE = "unbound"
     BINDING_VIF_DETAILS = ""
+    # Addresses tried before giving up when other servers keep taking them first
+    ALLOCATE_IP_ATTEMPTS = 16
 
     """Wraps neutron DB ops for easy testing"""
     def __init__(self, session, *args, **kwargs):
@@ -139,12 +143,14 @@ class NeutronDbWrapper(object):
         ip, mask, port_id = self.a10_allocate_ip_from_dhcp_range(subnet, "vlan", mac, port_id)
         return ip, mask, port_id
 
-    def get_ipallocationpool_by_subnet_id(self, subnet_id):
+    def get_ipallocationpools_by_subnet_id(self, subnet_id):
         return self._session.query(nmodels.IPAllocationPool).filter(
-            nmodels.IPAllocationPool.subnet_id == subnet_id).first()
+            nmodels.IPAllocationPool.subnet_id == subnet_id).all()
 
-    def get_ipallocations_by_subnet_id(self, subnet_id):
-        return self._session.query(nmodels.IPAllocation).filter_by(subnet_id=subnet_id).all()
+    def get_allocated_ips_by_subnet_id(self, subnet_id):
+        query = self._session.query(nmodels.IPAllocation.ip_address).filter_by(
+            subnet_id=subnet_id)
+        return [ip_address for (ip_address,) in query]
 
     def create_port(self, network_id, project_id, mac_address, device_id):
         device_owner = self.VLAN_PORT_OWNER
@@ -193,36 +199,46 @@ class NeutronDbWrapper(object):
         return ipallocation
 
     def a10_allocate_ip_from_dhcp_range(self, subnet, interface_id, mac, port_id):
-        """Search for an available IP.addr from unallocated nmodels.IPAllocationPool range.
-        If no addresses are available then an error is raised. Returns the address as a string.
-        This search is conducted by a difference of the nmodels.IPAllocationPool set_a
-        and the current IP allocations.
+        """Allocate the lowest free address in any of the subnet's allocation pools.
+
+        Only the ip_address column of the subnet's allocations is read; the
+        pools are never expanded into address sets. Each candidate is
+        inserted in a savepoint, so an address another server took since it
+        was read just moves the search on to the next one. Raises
+        IpAddressGenerationFailure if the pools are full.
         """
         subnet_id = subnet["id"]
         network_id = subnet["network_id"]
 
-        iprange_result = self.get_ipallocationpool_by_subnet_id(subnet_id)
-        ip_in_use_list = [x.ip_address for x in self.get_ipallocations_by_subnet_id(subnet_id)]
-
-        range_begin, range_end = iprange_result.first_ip, iprange_result.last_ip
-        ip_address = IPHelpers.find_unused_ip(range_begin, range_end, ip_in_use_list)
-
-        if not ip_address:
-            msg = "Cannot allocate from subnet {0}".format(subnet)
-            LOG.error(msg)
-            # TODO(mdurrant) - Raise neutron exception
-            raise Exception
-
-        mark_in_use = {
-            "ip_address": ip_address,
-            "network_id": network_id,
-            "port_id": port_id,
-            "subnet_id": subnet["id"]
-        }
+        pools = [(p.first_ip, p.last_ip)
+                 for p in self.get_ipallocationpools_by_subnet_id(subnet_id)]
+        ip_in_use_list = self.get_allocated_ips_by_subnet_id(subnet_id)
 
-        self.create_ipallocation(mark_in_use)
-
-        return ip_address, subnet["cidr"], mark_in_use["port_id"]
+        candidates = IPHelpers.unused_ips(pools, ip_in_use_list)
+        with self._session.begin(subtransactions=True):
+            for attempt in range(self.ALLOCATE_IP_ATTEMPTS):
+                ip_address = next(candidates, None)
+                if ip_address is None:
+                    break
+
+                mark_in_use = {
+                    "ip_address": ip_address,
+                    "network_id": network_id,
+                    "port_id": port_id,
+                    "subnet_id": subnet_id
+                }
+                try:
+                    with self._session.begin_nested():
+                        self.create_ipallocation(mark_in_use)
+                except db_exc.DBDuplicateEntry:
+                    LOG.debug("IP {0} on subnet {1} was just taken; trying the next one".format(
+                        ip_address, subnet_id))
+                    continue
+
+                return ip_address, subnet["cidr"], mark_in_use["port_id"]
+
+        LOG.error("Cannot allocate from subnet {0}".format(subnet))
+        raise n_exc.IpAddressGenerationFailure(net_id=network_id)
 
     def _build_port_dict(self, tenant_id, name, network_id, mac_address, device_id, device_owner):
         return {
@@ -0,0 +1,153 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Hot path lookups with and without the a62d0abeeaf5 indexes.
+
+Fills a throwaway SQLite database with rows in every indexed table, times
+the lookups the driver makes on them, then drops the indexes and times
+them again.
+
+    python -m a10_neutron_lbaas.tests.benchmark.db_indexes [rows] [lookups]
+"""
+
+from __future__ import print_function
+
+import datetime
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+import uuid
+
+import sqlalchemy as sa
+import sqlalchemy.orm
+
+from a10_neutron_lbaas.db import api as db_api
+from a10_neutron_lbaas.db.models import a10_certificates
+from a10_neutron_lbaas.db.models import a10_device_instance
+from a10_neutron_lbaas.db.models import a10_slb
+from a10_neutron_lbaas.db.models import a10_tenant_binding
+from a10_neutron_lbaas.db.models import scaling_group
+
+INDEXES = [
+    ('ix_a10_tenant_bindings_tenant_id', 'a10_tenant_bindings'),
+    ('ix_a10_slbs_loadbalancer_id', 'a10_slbs'),
+    ('ix_a10_certificatelistenerbindings_listener_id', 'a10_certificatelistenerbindings'),
+    ('ix_a10_device_instances_name', 'a10_device_instances'),
+    ('uq_a10_scaling_group_member_virtual_servers_neutron_id',
+     'a10_scaling_group_member_virtual_servers'),
+]
+
+
+def _id():
+    return str(uuid.uuid4())
+
+
+def populate(conn, n):
+    now = datetime.datetime.now()
+    stamps = {'created_at': now, 'updated_at': now}
+    ids = dict((k, [_id() for i in range(n)])
+               for k in ('tenant', 'lb', 'listener', 'member', 'vip'))
+
+    conn.execute(a10_tenant_binding.A10TenantBinding.__table__.insert(), [
+        dict(stamps, id=_id(), tenant_id=t, device_name='dev%d' % (i % 50))
+        for i, t in enumerate(ids['tenant'])])
+    conn.execute(a10_slb.A10SLB.__table__.insert(), [
+        dict(stamps, id=_id(), tenant_id=ids['tenant'][i], device_name='dev', loadbalancer_id=lb)
+        for i, lb in enumerate(ids['lb'])])
+    conn.execute(a10_certificates.CertificateListenerBinding.__table__.insert(), [
+        dict(stamps, id=_id(), tenant_id=ids['tenant'][i], certificate_id=_id(),
+             listener_id=listener, status=0)
+        for i, listener in enumerate(ids['listener'])])
+    conn.execute(a10_device_instance.A10DeviceInstance.__table__.insert(), [
+        dict(stamps, id=_id(), tenant_id=ids['tenant'][i], name='vthunder-%s' % t,
+             username='admin', password='a10', api_version='3.0', protocol='https',
+             port=443, autosnat=True, v_method='adp', shared_partition='shared',
+             use_float=True, ipinip=False, write_memory=False,
+             nova_instance_id=_id(), host='10.0.0.1')
+        for i, t in enumerate(ids['tenant'])])
+    conn.execute(scaling_group.A10ScalingGroupMemberVirtualServer.__table__.insert(), [
+        dict(stamps, id=_id(), member_id=ids['member'][i], neutron_id=vip,
+             ip_address='10.0.0.1', sflow_uuid=_id())
+        for i, vip in enumerate(ids['vip'])])
+    return ids
+
+
+def lookups(session, ids):
+    TB = a10_tenant_binding.A10TenantBinding
+    SLB = a10_slb.A10SLB
+    CLB = a10_certificates.CertificateListenerBinding
+    DI = a10_device_instance.A10DeviceInstance
+    VS = scaling_group.A10ScalingGroupMemberVirtualServer
+    n = len(ids['tenant'])
+
+    def pick(k):
+        return ids[k][random.randrange(n)]
+
+    return [
+        ('tenant binding by tenant_id',
+         lambda: TB.find_by_tenant_id(pick('tenant'), db_session=session)),
+        ('slb by loadbalancer_id',
+         lambda: SLB.find_by_loadbalancer_id(pick('lb'), db_session=session)),
+        ('cert bindings by listener_id',
+         lambda: session.query(CLB).filter_by(listener_id=pick('listener')).all()),
+        ('device instance by name',
+         lambda: DI.find_by(name='vthunder-%s' % pick('tenant'), db_session=session)),
+        ('virtual server by member, vip',
+         lambda: session.query(VS).filter_by(member_id=pick('member'),
+                                             neutron_id=pick('vip')).first()),
+    ]
+
+
+def run(session, ids, m):
+    return [(name, timeit.timeit(f, number=m) / m) for name, f in lookups(session, ids)]
+
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 20000
+    m = int(argv[2]) if len(argv) > 2 else 500
+
+    tmp = tempfile.mkdtemp()
+    try:
+        engine = sa.create_engine('sqlite:///' + os.path.join(tmp, 'bench.db'))
+        db_api.get_base().metadata.create_all(engine, tables=[
+            a10_tenant_binding.A10TenantBinding.__table__,
+            a10_slb.A10SLB.__table__,
+            a10_certificates.CertificateListenerBinding.__table__,
+            a10_device_instance.A10DeviceInstance.__table__,
+            scaling_group.A10ScalingGroupMemberVirtualServer.__table__,
+        ])
+        with engine.begin() as conn:
+            ids = populate(conn, n)
+        session = sqlalchemy.orm.sessionmaker(bind=engine)()
+
+        indexed = run(session, ids, m)
+        with engine.begin() as conn:
+            for name, table in INDEXES:
+                conn.execute('DROP INDEX %s' % name)
+        scanned = run(session, ids, m)
+        session.close()
+        engine.dispose()
+    finally:
+        shutil.rmtree(tmp)
+
+    print("%d rows per table, %d lookups each" % (n, m))
+    print("%-32s %12s %12s %8s" % ('', 'no index', 'index', ''))
+    for (name, before), (_, after) in zip(scanned, indexed):
+        print("%-32s %9.1f us %9.1f us %7.0fx" % (name, before * 1e6, after * 1e6,
+                                                  before / after))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,68 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from nose.plugins.attrib import attr
+
+from a10_neutron_lbaas.db import models
+from a10_neutron_lbaas.db.models import a10_certificates
+
+from a10_neutron_lbaas.tests.db import test_base
+
+
+@attr(db=True)
+class TestBulk(test_base.UnitTestBase):
+
+    def create(self, n):
+        db = self.open_session()
+        return models.A10TenantBinding.bulk_create_and_save(
+            [dict(tenant_id='t%d' % i, device_name='d%d' % i) for i in range(n)],
+            db_session=db)
+
+    def test_bulk_create_and_save(self):
+        created = self.create(3)
+        self.assertEqual(3, len(set(x.id for x in created)))
+
+        db = self.open_session()
+        rows = db.query(models.A10TenantBinding).all()
+        self.assertEqual(['t0', 't1', 't2'], sorted(x.tenant_id for x in rows))
+        self.assertTrue(all(x.created_at is not None for x in rows))
+
+    def test_find_all_by_ids(self):
+        ids = [x.id for x in self.create(5)]
+        db = self.open_session()
+        found = models.A10TenantBinding.find_all_by_ids(ids[:3] + ['missing'], db_session=db)
+        self.assertEqual(sorted(ids[:3]), sorted(x.id for x in found))
+
+    def test_find_by_many_chunked(self):
+        self.create(7)
+        db = self.open_session()
+        found = models.A10TenantBinding.find_by_many(
+            'tenant_id', ['t%d' % i for i in range(6)] + ['t0'], db_session=db, chunk_size=2)
+        self.assertEqual(6, len(found))
+
+    def test_bulk_update(self):
+        created = self.create(2)
+        db = self.open_session()
+        models.A10TenantBinding.bulk_update(
+            [{'id': created[0].id, 'device_name': 'moved'}], db_session=db)
+
+        db = self.open_session()
+        moved = models.A10TenantBinding.get(created[0].id, db_session=db)
+        kept = models.A10TenantBinding.get(created[1].id, db_session=db)
+        self.assertEqual('moved', moved.device_name)
+        self.assertEqual('d1', kept.device_name)
+        self.assertTrue(moved.updated_at >= created[0].updated_at)
+
+    def test_create_scalar_default(self):
+        binding = a10_certificates.CertificateListenerBinding.create(
+            tenant_id='t', certificate_id='c', listener_id='l')
+        self.assertEqual(0, binding.status)
@@ -0,0 +1,139 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import mock
+import requests
+
+from a10_neutron_lbaas.acos import ha_sync
+from a10_neutron_lbaas.client_proxies import circuit_breaker
+from a10_neutron_lbaas.client_proxies import concurrency
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas.tests.unit.unit_config import helper
+
+
+DEVICE = {
+    'host': '10.10.100.20',
+    'username': 'admin',
+    'api_version': '3.0',
+    'ha_sync_list': [
+        {'ip': '1.1.1.1', 'username': 'admin', 'password': 'a10'},
+    ],
+}
+
+
+class TestHaSync(test_case.TestCase):
+
+    def _ha_sync(self, async_sync, **kwargs):
+        self.client = mock.MagicMock()
+        pool = mock.Mock()
+        pool.acquire.return_value = self.client
+        config = helper.config(dict(kwargs, ha_sync_async=async_sync))
+        return ha_sync.HaSync(config, pool, concurrency.ConcurrencyLimiter(config),
+                              circuit_breaker.CircuitBreaker(config))
+
+    def test_inline(self):
+        s = self._ha_sync(False)
+        client = mock.MagicMock()
+        s.sync(DEVICE, client)
+        client.ha.sync.assert_called_once_with('1.1.1.1', 'admin', 'a10')
+        self.assertEqual({}, s.stats())
+
+    def test_no_peers(self):
+        s = self._ha_sync(True)
+        client = mock.MagicMock()
+        s.sync(dict(DEVICE, ha_sync_list=[]), client)
+        client.ha.sync.assert_not_called()
+        s.pool.acquire.assert_not_called()
+
+    def test_background(self):
+        s = self._ha_sync(True)
+        client = mock.MagicMock()
+        s.sync(DEVICE, client)
+        s.shutdown()
+        client.ha.sync.assert_not_called()
+        self.client.ha.sync.assert_called_once_with('1.1.1.1', 'admin', 'a10')
+        s.pool.release.assert_called_once_with(DEVICE, self.client, None)
+        stats = s.stats()['10.10.100.20']
+        self.assertEqual(1, stats['syncs'])
+        self.assertEqual(0, stats['queue_depth'])
+        self.assertIsNotNone(stats['last_sync_lag'])
+
+    def test_collapses_while_in_flight(self):
+        s = self._ha_sync(True)
+        started = threading.Event()
+        proceed = threading.Event()
+
+        def slow_sync(*args):
+            started.set()
+            proceed.wait(5)
+
+        self.client.ha.sync.side_effect = slow_sync
+        s.sync(DEVICE, None)
+        self.assertTrue(started.wait(5))
+        for i in range(5):
+            s.sync(DEVICE, None)
+        self.assertEqual(5, s.stats()['10.10.100.20']['queue_depth'])
+        proceed.set()
+        s.shutdown()
+        self.assertEqual(2, self.client.ha.sync.call_count)
+
+    def test_error_releases_client(self):
+        s = self._ha_sync(True)
+        exc = Exception("sync failed")
+        self.client.ha.sync.side_effect = exc
+        s.sync(DEVICE, None)
+        s.shutdown()
+        s.pool.release.assert_called_once_with(DEVICE, self.client, exc)
+        self.assertEqual(1, s.stats()['10.10.100.20']['errors'])
+
+    def test_background_in_shared_partition(self):
+        s = self._ha_sync(True)
+        self.client.current_partition = 'tenant1'
+        s.sync(DEVICE, None)
+        s.shutdown()
+        self.assertEqual(['system.partition.active', 'ha.sync'],
+                         [x[0] for x in self.client.mock_calls])
+        self.client.system.partition.active.assert_called_once_with('shared')
+
+    def test_background_takes_a_slot(self):
+        s = self._ha_sync(True)
+        device = dict(DEVICE, max_concurrent_sessions=1)
+        s.concurrency.acquire(device)
+        s.sync(device, None)
+        self.assertFalse(s._worker(device).drain(0.1))
+        self.client.ha.sync.assert_not_called()
+        s.concurrency.release(device)
+        s.shutdown()
+        self.client.ha.sync.assert_called_once_with('1.1.1.1', 'admin', 'a10')
+        self.assertEqual(0, s.concurrency.stats()['10.10.100.20']['active'])
+
+    def test_background_respects_open_breaker(self):
+        s = self._ha_sync(True, circuit_breaker_threshold=1)
+        s.circuit_breaker.record(DEVICE, requests.exceptions.ConnectionError())
+        s.sync(DEVICE, None)
+        s.shutdown()
+        s.pool.acquire.assert_not_called()
+        self.assertEqual(1, s.stats()['10.10.100.20']['errors'])
+
+    def test_background_uses_current_device(self):
+        s = self._ha_sync(True)
+        reloaded = dict(DEVICE, name='ax1', ha_sync_list=[
+            {'ip': '2.2.2.2', 'username': 'admin', 'password': 'new'}])
+        s.config = mock.Mock()
+        s.config.get.return_value = True
+        s.config.get_device.return_value = reloaded
+        s.sync(dict(DEVICE, name='ax1'), None)
+        s.shutdown()
+        s.config.get_device.assert_called_with('ax1')
+        self.client.ha.sync.assert_called_once_with('2.2.2.2', 'admin', 'new')
@@ -0,0 +1,114 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+import mock
+
+from a10_neutron_lbaas.acos import write_memory
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas.tests.unit.unit_config import helper
+
+
+DEVICE = {
+    'host': '10.10.100.20',
+    'username': 'admin',
+    'api_version': '3.0',
+}
+
+
+class TestWriteMemoryScheduler(test_case.TestCase):
+
+    def _scheduler(self, window=0, max_delay=2):
+        return write_memory.WriteMemoryScheduler(helper.config({
+            'write_memory_window': window,
+            'write_memory_max_delay': max_delay,
+        }))
+
+    def test_write_is_immediate(self):
+        s = self._scheduler()
+        flush = mock.Mock()
+        s.write(DEVICE, 'p1', flush)
+        s.write(DEVICE, 'p1', flush)
+        self.assertEqual(2, flush.call_count)
+        self.assertEqual(0, s.pending())
+
+    def test_concurrent_writes_coalesce(self):
+        s = self._scheduler()
+        in_flush = threading.Event()
+        release = threading.Event()
+        first = mock.Mock(side_effect=lambda: in_flush.set() or release.wait(5))
+        others = [mock.Mock() for _ in range(3)]
+
+        threads = [threading.Thread(target=s.write, args=(DEVICE, 'p1', first))]
+        threads[0].start()
+        in_flush.wait(5)
+        for f in others:
+            threads.append(threading.Thread(target=s.write, args=(DEVICE, 'p1', f)))
+            threads[-1].start()
+        while s.pending() < 4:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(1, first.call_count)
+        self.assertEqual(1, sum(f.call_count for f in others))
+        self.assertEqual(2, s.writes)
+        self.assertEqual(4, s.requests)
+
+    def test_partitions_are_independent(self):
+        s = self._scheduler(window=60)
+        flush = mock.Mock()
+        s.write(DEVICE, 'p1', flush)
+        s.write(DEVICE, 'p2', flush)
+        self.assertEqual(2, flush.call_count)
+
+    def test_window_bounded_by_max_delay(self):
+        s = self._scheduler(window=60, max_delay=0.05)
+        flush = mock.Mock()
+        s.write(DEVICE, 'p1', flush)
+        start = time.time()
+        s.write(DEVICE, 'p1', flush)
+        self.assertTrue(time.time() - start >= 0.04)
+        self.assertEqual(2, flush.call_count)
+
+    def test_window_without_max_delay(self):
+        s = self._scheduler(window=0.1, max_delay=0)
+        flush = mock.Mock()
+        s.write(DEVICE, 'p1', flush)
+        start = time.time()
+        s.write(DEVICE, 'p1', flush)
+        self.assertTrue(time.time() - start >= 0.08)
+        self.assertEqual(2, flush.call_count)
+
+    def test_failed_flush_raises(self):
+        s = self._scheduler()
+        flush = mock.Mock(side_effect=[Exception(), None])
+        self.assertRaises(Exception, s.write, DEVICE, 'p1', flush)
+        s.write(DEVICE, 'p1', flush)
+        self.assertEqual(2, flush.call_count)
+        self.assertEqual(1, s.writes)
+
+    def test_shutdown_flushes_delayed(self):
+        s = self._scheduler(window=60, max_delay=60)
+        flush = mock.Mock()
+        s.write(DEVICE, 'p1', flush)
+        t = threading.Thread(target=s.write, args=(DEVICE, 'p1', flush))
+        t.start()
+        while not s.pending():
+            time.sleep(0.01)
+        s.shutdown(timeout=5)
+        t.join(5)
+        self.assertEqual(2, flush.call_count)
+        self.assertEqual(0, s.pending())
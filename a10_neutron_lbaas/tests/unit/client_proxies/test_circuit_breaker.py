@@ -0,0 +1,109 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import acos_client.errors as acos_errors
+import mock
+import requests
+
+from a10_neutron_lbaas import a10_exceptions as ex
+from a10_neutron_lbaas.client_proxies import circuit_breaker
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas.tests.unit.unit_config import helper
+
+DEVICE = {'host': '10.10.100.20'}
+
+
+class TestCircuitBreaker(test_case.TestCase):
+
+    def _breaker(self, threshold=2, cooldown=30):
+        return circuit_breaker.CircuitBreaker(helper.config({
+            'circuit_breaker_threshold': threshold,
+            'circuit_breaker_cooldown': cooldown}))
+
+    def _fail(self, breaker):
+        try:
+            with breaker.guard(DEVICE):
+                raise requests.exceptions.ConnectionError()
+        except requests.exceptions.ConnectionError:
+            pass
+
+    def _open(self, breaker):
+        with mock.patch.object(circuit_breaker.time, 'time', return_value=0):
+            self._fail(breaker)
+            self._fail(breaker)
+
+    def test_opens_after_threshold(self):
+        b = self._breaker()
+        self._fail(b)
+        self.assertEqual(circuit_breaker.CLOSED, b.state(DEVICE))
+        self._fail(b)
+        self.assertEqual(circuit_breaker.OPEN, b.state(DEVICE))
+        self.assertRaises(ex.DeviceUnavailable, b.before, DEVICE)
+        self.assertEqual(1, b.stats()['rejected'])
+
+    def test_success_resets_count(self):
+        b = self._breaker()
+        self._fail(b)
+        b.record(DEVICE, None)
+        self._fail(b)
+        self.assertEqual(circuit_breaker.CLOSED, b.state(DEVICE))
+
+    def test_clean_guard_decides_nothing(self):
+        b = self._breaker()
+        self._open(b)
+        with mock.patch.object(circuit_breaker.time, 'time', return_value=31):
+            with b.guard(DEVICE):
+                pass
+            self.assertEqual(circuit_breaker.HALF_OPEN, b.state(DEVICE))
+            # The probe is still out
+            self.assertRaises(ex.DeviceUnavailable, b.before, DEVICE)
+
+    def test_interrupted_probe_lets_next_through(self):
+        b = self._breaker()
+        self._open(b)
+        with mock.patch.object(circuit_breaker.time, 'time', return_value=31):
+            try:
+                with b.guard(DEVICE):
+                    raise KeyboardInterrupt()
+            except KeyboardInterrupt:
+                pass
+            self.assertEqual(circuit_breaker.HALF_OPEN, b.state(DEVICE))
+            self.assertTrue(b.before(DEVICE))
+
+    def test_device_errors_dont_count(self):
+        b = self._breaker(threshold=1)
+        b.record(DEVICE, acos_errors.NotFound())
+        self.assertEqual(circuit_breaker.CLOSED, b.state(DEVICE))
+
+    def test_single_probe_after_cooldown(self):
+        b = self._breaker()
+        self._open(b)
+        with mock.patch.object(circuit_breaker.time, 'time', return_value=31):
+            self.assertTrue(b.before(DEVICE))
+            self.assertEqual(circuit_breaker.HALF_OPEN, b.state(DEVICE))
+            self.assertRaises(ex.DeviceUnavailable, b.before, DEVICE)
+        b.success(DEVICE)
+        self.assertEqual(circuit_breaker.CLOSED, b.state(DEVICE))
+
+    def test_failed_probe_reopens(self):
+        b = self._breaker()
+        self._open(b)
+        with mock.patch.object(circuit_breaker.time, 'time', return_value=31):
+            self._fail(b)
+            self.assertEqual(circuit_breaker.OPEN, b.state(DEVICE))
+            self.assertRaises(ex.DeviceUnavailable, b.before, DEVICE)
+
+    def test_disabled(self):
+        b = self._breaker(threshold=0)
+        for i in range(5):
+            self._fail(b)
+        self.assertFalse(b.before(DEVICE))
@@ -0,0 +1,79 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+from a10_neutron_lbaas import a10_exceptions as ex
+from a10_neutron_lbaas.client_proxies import concurrency
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas.tests.unit.unit_config import helper
+
+DEVICE = {'host': '10.10.100.20', 'max_concurrent_sessions': 1}
+
+
+class TestConcurrencyLimiter(test_case.TestCase):
+
+    def _limiter(self, timeout=5):
+        return concurrency.ConcurrencyLimiter(helper.config({
+            'max_concurrent_sessions_timeout': timeout}))
+
+    def _wait_queued(self, limiter, n):
+        for i in range(500):
+            if limiter.stats()[DEVICE['host']]['queued'] == n:
+                return
+            time.sleep(0.01)
+        self.fail("never saw %s waiter(s)" % n)
+
+    def test_unlimited(self):
+        limiter = self._limiter()
+        device = dict(DEVICE, max_concurrent_sessions=0)
+        for i in range(10):
+            self.assertEqual(0, limiter.acquire(device))
+        self.assertEqual({}, limiter.stats())
+
+    def test_fifo_handoff(self):
+        limiter = self._limiter()
+        limiter.acquire(DEVICE)
+        order = []
+
+        def worker(n):
+            limiter.acquire(DEVICE)
+            order.append(n)
+            limiter.release(DEVICE)
+
+        threads = []
+        for n in range(3):
+            t = threading.Thread(target=worker, args=(n,))
+            t.start()
+            threads.append(t)
+            self._wait_queued(limiter, n + 1)
+
+        limiter.release(DEVICE)
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual([0, 1, 2], order)
+        stats = limiter.stats()[DEVICE['host']]
+        self.assertEqual(0, stats['active'])
+        self.assertEqual(3, stats['waits'])
+        self.assertGreater(stats['max_wait'], 0)
+
+    def test_timeout(self):
+        limiter = self._limiter(timeout=0.05)
+        limiter.acquire(DEVICE)
+        self.assertRaises(ex.DeviceBusy, limiter.acquire, DEVICE)
+        stats = limiter.stats()[DEVICE['host']]
+        self.assertEqual(1, stats['timeouts'])
+        self.assertEqual(0, stats['queued'])
+        limiter.release(DEVICE)
+        self.assertEqual(0, limiter.stats()[DEVICE['host']]['active'])
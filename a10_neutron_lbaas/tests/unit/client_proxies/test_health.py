@@ -0,0 +1,182 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import acos_client.errors as acos_errors
+import mock
+import requests
+
+from a10_neutron_lbaas import a10_exceptions as ex
+from a10_neutron_lbaas.client_proxies import health
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas.tests.unit.unit_config import helper
+
+DEVICES = {
+    'ax1': {'name': 'ax1', 'host': '10.10.100.20'},
+    'ax2': {'name': 'ax2', 'host': '10.10.100.21'},
+}
+AX1 = DEVICES['ax1']
+
+
+class TestHealthMonitor(test_case.TestCase):
+
+    def _monitor(self, client_factory=None, **kwargs):
+        settings = {
+            'health_check_interval': 0,
+            'health_check_jitter': 0.2,
+            'health_check_timeout': 5,
+            'health_check_window': 4,
+            'health_check_down_failures': 2,
+            'health_check_degraded_error_rate': 0.2,
+            'health_check_degraded_latency': 1.0,
+        }
+        settings.update(kwargs)
+        return health.HealthMonitor(helper.config(settings),
+                                    client_factory or mock.MagicMock())
+
+    def _fail(self, monitor, device=AX1):
+        monitor.record(device, exc_value=requests.exceptions.ConnectionError())
+
+    def test_unknown_until_probed(self):
+        m = self._monitor()
+        self.assertEqual(health.UNKNOWN, m.status(AX1))
+        m.before(AX1)
+
+    def test_down_after_consecutive_failures(self):
+        m = self._monitor()
+        self._fail(m)
+        self.assertEqual(health.DEGRADED, m.status(AX1))
+        self._fail(m)
+        self.assertEqual(health.DOWN, m.status(AX1))
+        self.assertRaises(ex.DeviceUnavailable, m.before, AX1)
+        self.assertEqual(1, m.stats()['rejected'])
+
+        m.record(AX1, latency=0.1)
+        self.assertNotEqual(health.DOWN, m.status(AX1))
+        m.before(AX1)
+
+    def test_error_rate_window(self):
+        m = self._monitor()
+        self._fail(m)
+        for i in range(3):
+            m.record(AX1, latency=0.1)
+        self.assertEqual(0.25, m.table()['10.10.100.20']['error_rate'])
+        self.assertEqual(health.DEGRADED, m.status(AX1))
+        m.record(AX1, latency=0.1)
+        self.assertEqual(0.0, m.table()['10.10.100.20']['error_rate'])
+        self.assertEqual(health.HEALTHY, m.status(AX1))
+
+    def test_slow_is_degraded(self):
+        m = self._monitor()
+        m.record(AX1, latency=0.5)
+        self.assertEqual(health.HEALTHY, m.status(AX1))
+        for i in range(5):
+            m.record(AX1, latency=3.0)
+        self.assertEqual(health.DEGRADED, m.status(AX1))
+        self.assertTrue(m.table()['10.10.100.20']['latency'] > 1.0)
+
+    def test_probe_all_devices(self):
+        clients = {}
+
+        def factory(device_cfg):
+            clients[device_cfg['name']] = c = mock.MagicMock()
+            if device_cfg['name'] == 'ax2':
+                c.system.information.side_effect = requests.exceptions.ConnectionError()
+            return c
+
+        m = self._monitor(factory, health_check_down_failures=1)
+        m.probe(DEVICES)
+        self.assertEqual(1, m.stats()['rounds'])
+        self.assertEqual(health.HEALTHY, m.status(AX1))
+        self.assertEqual(health.DOWN, m.status(DEVICES['ax2']))
+        for c in clients.values():
+            c.system.information.assert_called_once_with()
+        # The failed client is dropped, the working one kept for next round
+        self.assertFalse(clients['ax1'].session.close.called)
+        clients['ax2'].session.close.assert_called_once_with()
+
+    def test_client_kept_between_rounds(self):
+        factory = mock.MagicMock()
+        m = self._monitor(factory)
+        m.probe({'ax1': AX1})
+        m.probe({'ax1': AX1})
+        self.assertEqual(1, factory.call_count)
+        self.assertEqual(2, factory.return_value.system.information.call_count)
+
+        m.stop()
+        factory.return_value.session.close.assert_called_once_with()
+
+    def test_expired_session_logs_in_again(self):
+        old, new = mock.MagicMock(), mock.MagicMock()
+        old.system.information.side_effect = acos_errors.InvalidSessionID()
+        factory = mock.MagicMock(side_effect=[new])
+        m = self._monitor(factory)
+        m._clients[AX1['host']] = old
+
+        m.probe({'ax1': AX1})
+        self.assertEqual(health.HEALTHY, m.status(AX1))
+        old.session.close.assert_called_once_with()
+        self.assertIs(new, m._clients[AX1['host']])
+
+    def test_probe_timeout(self):
+        release = threading.Event()
+        client = mock.MagicMock()
+        client.system.information.side_effect = lambda: release.wait(5)
+
+        m = self._monitor(lambda d: client, health_check_timeout=0.05,
+                          health_check_down_failures=1)
+        m.probe({'ax1': AX1})
+        self.assertEqual(health.DOWN, m.status(AX1))
+
+        # The hung probe isn't doubled up on
+        m.probe({'ax1': AX1})
+        self.assertEqual(1, client.system.information.call_count)
+        release.set()
+
+    def test_late_probe_not_recorded(self):
+        release = threading.Event()
+        done = threading.Event()
+        client = mock.MagicMock()
+        client.system.information.side_effect = lambda: release.wait(5)
+
+        m = self._monitor(lambda d: client, health_check_timeout=0.05)
+        record = m.record
+
+        def recorded(*args, **kwargs):
+            record(*args, **kwargs)
+            if kwargs.get('token') is not None:
+                done.set()
+
+        m.record = recorded
+        m.probe({'ax1': AX1})
+        release.set()
+        self.assertTrue(done.wait(5))
+
+        self.assertEqual(1, m.table()['10.10.100.20']['consecutive_failures'])
+        self.assertEqual(1.0, m.table()['10.10.100.20']['error_rate'])
+        # Free to probe again
+        m.probe({'ax1': AX1})
+        self.assertEqual(2, client.system.information.call_count)
+
+    def test_jitter(self):
+        m = self._monitor(health_check_interval=10, health_check_jitter=0.2)
+        for i in range(20):
+            self.assertTrue(8 <= m._delay() <= 12)
+
+    def test_start_stop(self):
+        m = self._monitor(health_check_interval=0.01)
+        probed = threading.Event()
+        m.start(lambda: probed.set() or {})
+        self.assertTrue(probed.wait(5))
+        m.stop(5)
+        self.assertIsNone(m._thread)
@@ -0,0 +1,99 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import acos_client.errors as acos_errors
+from acos_client.v30 import base as v30_base
+import mock
+import requests
+
+from a10_neutron_lbaas.client_proxies import retry
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas.tests.unit.unit_config import helper
+
+
+class FakeServiceGroup(v30_base.BaseV30):
+
+    def __init__(self, client, errors):
+        super(FakeServiceGroup, self).__init__(client)
+        self.errors = list(errors)
+        self.calls = []
+
+    def _fail_or_return(self, name):
+        self.calls.append(name)
+        if self.errors:
+            raise self.errors.pop(0)
+        return name
+
+    def get(self, name):
+        return self._fail_or_return('get')
+
+    def create(self, name):
+        return self._fail_or_return('create')
+
+
+class FakeClient(object):
+
+    def __init__(self, errors=()):
+        self.http = None
+        self.current_partition = 'shared'
+        self.service_group = FakeServiceGroup(self, errors)
+
+
+class TestRetryingClient(test_case.TestCase):
+
+    def _client(self, errors, attempts=3, deadline=30):
+        config = helper.config({'axapi_retry_attempts': attempts,
+                                'axapi_retry_backoff': 0.01,
+                                'axapi_retry_deadline': deadline})
+        self.policy = retry.RetryPolicy(config)
+        self.raw = FakeClient(errors)
+        return retry.RetryingClient(self.raw, self.policy)
+
+    def test_passthrough(self):
+        c = self._client([])
+        self.assertEqual('get', c.service_group.get('sg1'))
+        self.assertEqual('shared', c.current_partition)
+        c.current_partition = 'p1'
+        self.assertEqual('p1', self.raw.current_partition)
+
+    def test_idempotent_retried(self):
+        c = self._client([requests.exceptions.ReadTimeout(), acos_errors.ACOSUnknownError()])
+        self.assertEqual('get', c.service_group.get('sg1'))
+        self.assertEqual(3, len(self.raw.service_group.calls))
+        self.assertEqual(2, self.policy.retries)
+
+    def test_create_not_retried_when_maybe_applied(self):
+        c = self._client([requests.exceptions.ReadTimeout()])
+        self.assertRaises(requests.exceptions.ReadTimeout, c.service_group.create, 'sg1')
+        self.assertEqual(1, len(self.raw.service_group.calls))
+
+    def test_create_retried_when_not_applied(self):
+        c = self._client([requests.exceptions.ConnectTimeout(), acos_errors.ACOSSystemIsBusy()])
+        self.assertEqual('create', c.service_group.create('sg1'))
+        self.assertEqual(3, len(self.raw.service_group.calls))
+
+    def test_device_errors_not_retried(self):
+        c = self._client([acos_errors.NotFound()])
+        self.assertRaises(acos_errors.NotFound, c.service_group.get, 'sg1')
+        self.assertEqual(1, len(self.raw.service_group.calls))
+
+    def test_attempts_exhausted(self):
+        c = self._client([acos_errors.ACOSUnknownError()] * 3, attempts=2)
+        self.assertRaises(acos_errors.ACOSUnknownError, c.service_group.get, 'sg1')
+        self.assertEqual(3, len(self.raw.service_group.calls))
+
+    def test_deadline(self):
+        c = self._client([acos_errors.ACOSUnknownError()] * 3, deadline=0)
+        with mock.patch.object(retry.time, 'sleep') as sleep:
+            self.assertRaises(acos_errors.ACOSUnknownError, c.service_group.get, 'sg1')
+        sleep.assert_not_called()
+        self.assertEqual(1, self.policy.gave_up)
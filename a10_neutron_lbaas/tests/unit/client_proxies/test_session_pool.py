@@ -0,0 +1,94 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import acos_client.errors as acos_errors
+import mock
+
+from a10_neutron_lbaas.client_proxies import session_pool
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas.tests.unit.unit_config import helper
+
+
+DEVICE = {
+    'host': '10.10.100.20',
+    'port': 443,
+    'protocol': 'https',
+    'username': 'admin',
+    'password': 'a10',
+    'api_version': '3.0',
+}
+
+
+class TestSessionPool(test_case.TestCase):
+
+    def _pool(self, size=2, idle_timeout=300):
+        config = helper.config({'session_pool_size': size,
+                                'session_pool_idle_timeout': idle_timeout})
+        factory = mock.Mock(side_effect=lambda *args, **kwargs: mock.MagicMock())
+        return session_pool.SessionPool(config, factory)
+
+    def test_disabled_closes_on_release(self):
+        pool = self._pool(size=0)
+        c = pool.acquire(DEVICE)
+        pool.release(DEVICE, c)
+        c.session.close.assert_called_with()
+        self.assertIsNot(c, pool.acquire(DEVICE))
+
+    def test_reuse(self):
+        pool = self._pool()
+        c = pool.acquire(DEVICE, action='create')
+        pool.client_factory.assert_called_with(DEVICE, action='create')
+        pool.release(DEVICE, c)
+        c.session.close.assert_not_called()
+        self.assertIs(c, pool.acquire(DEVICE))
+        self.assertEqual(1, pool.client_factory.call_count)
+        self.assertEqual(1, pool.stats()['hits'])
+
+    def test_device_override(self):
+        pool = self._pool(size=0)
+        device = dict(DEVICE, session_pool_size=1)
+        c = pool.acquire(device)
+        pool.release(device, c)
+        self.assertIs(c, pool.acquire(device))
+
+    def test_full_pool_closes(self):
+        pool = self._pool(size=1)
+        c1 = pool.acquire(DEVICE)
+        c2 = pool.acquire(DEVICE)
+        pool.release(DEVICE, c1)
+        pool.release(DEVICE, c2)
+        c1.session.close.assert_not_called()
+        c2.session.close.assert_called_with()
+
+    def test_invalid_session_discarded(self):
+        pool = self._pool()
+        c = pool.acquire(DEVICE)
+        pool.release(DEVICE, c, acos_errors.InvalidSessionID())
+        c.session.close.assert_called_with()
+        self.assertIsNot(c, pool.acquire(DEVICE))
+
+    def test_idle_timeout(self):
+        pool = self._pool(idle_timeout=10)
+        c = pool.acquire(DEVICE)
+        with mock.patch.object(session_pool.time, 'time', return_value=0):
+            pool.release(DEVICE, c)
+        with mock.patch.object(session_pool.time, 'time', return_value=11):
+            self.assertIsNot(c, pool.acquire(DEVICE))
+        c.session.close.assert_called_with()
+
+    def test_close_all(self):
+        pool = self._pool()
+        c = pool.acquire(DEVICE)
+        pool.release(DEVICE, c)
+        pool.close_all()
+        c.session.close.assert_called_with()
+        self.assertEqual({}, pool.stats()['idle'])
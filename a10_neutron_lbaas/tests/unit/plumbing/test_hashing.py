@@ -0,0 +1,59 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+from a10_neutron_lbaas.plumbing import hashing
+from a10_neutron_lbaas.tests import test_case
+
+TENANTS = ['tenant-%d' % i for i in range(2000)]
+
+
+class TestBoundedLoadHash(test_case.TestCase):
+
+    def test_stable(self):
+        a = hashing.BoundedLoadHash(['a', 'b', 'c'])
+        b = hashing.BoundedLoadHash(['c', 'b', 'a'])
+        for t in TENANTS[:50]:
+            self.assertEqual(a.get_server(t), b.get_server(t))
+
+    def test_adding_a_device_moves_few(self):
+        before = hashing.BoundedLoadHash(['a', 'b', 'c', 'd'])
+        after = hashing.BoundedLoadHash(['a', 'b', 'c', 'd', 'e'])
+        moved = [t for t in TENANTS if before.get_server(t) != after.get_server(t)]
+        self.assertTrue(all(after.get_server(t) == 'e' for t in moved))
+        self.assertLess(len(moved), len(TENANTS) * 0.3)
+
+    def test_capacity(self):
+        ring = hashing.BoundedLoadHash(['small', 'big'], {'big': 3})
+        counts = collections.Counter(ring.get_server(t) for t in TENANTS)
+        self.assertGreater(counts['big'], 2 * counts['small'])
+
+    def test_bounded(self):
+        ring = hashing.BoundedLoadHash(['a', 'b', 'c'])
+        loads = collections.Counter()
+        for t in TENANTS[:300]:
+            loads[ring.get_server(t, loads, 1.1)] += 1
+        self.assertLessEqual(max(loads.values()), 110)
+
+    def test_full_home_skipped(self):
+        ring = hashing.BoundedLoadHash(['a', 'b'])
+        t = TENANTS[0]
+        home = ring.get_server(t)
+        other = 'b' if home == 'a' else 'a'
+        self.assertEqual(other, ring.get_server(t, {home: 10, other: 0}, 1.25))
+        self.assertEqual(home, ring.get_server(t, {home: 1, other: 1}, 1.25))
+
+    def test_get_ring_shared(self):
+        ring = hashing.get_ring(['a', 'b'], {'a': 2})
+        self.assertIs(ring, hashing.get_ring(['b', 'a'], {'a': 2}))
+        self.assertIsNot(ring, hashing.get_ring(['a', 'b']))
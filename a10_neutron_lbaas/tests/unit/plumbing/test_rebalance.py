@@ -0,0 +1,95 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+import shutil
+import tempfile
+
+from a10_neutron_lbaas.plumbing import rebalance
+from a10_neutron_lbaas.tests import test_case
+
+
+def _bindings(**counts):
+    rv = {}
+    for device_name, n in counts.items():
+        for i in range(n):
+            rv['%s-tenant-%03d' % (device_name, i)] = device_name
+    return rv
+
+
+class TestRebalancePlan(test_case.TestCase):
+
+    def setUp(self):
+        self.devices = {'a': {'v_method': 'ADP'}, 'b': {'v_method': 'LSI'}, 'c': {}}
+
+    def moves(self, p):
+        return [m for step in p['steps'] for m in step['moves']]
+
+    def test_balanced_needs_no_moves(self):
+        p = rebalance.plan(_bindings(a=10, b=10, c=10), self.devices)
+        self.assertEqual(0, p['moves'])
+        self.assertEqual([], p['steps'])
+
+    def test_new_device_gets_minimal_moves(self):
+        # Within 10% of the target of 10, a and b may keep 11 each
+        p = rebalance.plan(_bindings(a=15, b=15), self.devices)
+        self.assertEqual(8, p['moves'])
+
+        p = rebalance.plan(_bindings(a=15, b=15), self.devices, tolerance=0)
+        self.assertEqual(10, p['moves'])
+        self.assertTrue(all(m['to'] == 'c' for m in self.moves(p)))
+        after = dict((k, v['tenants_after']) for k, v in p['devices'].items())
+        self.assertEqual({'a': 10, 'b': 10, 'c': 10}, after)
+
+    def test_tolerance(self):
+        p = rebalance.plan(_bindings(a=12, b=9, c=9), self.devices, tolerance=0.2)
+        self.assertEqual(0, p['moves'])
+        p = rebalance.plan(_bindings(a=12, b=9, c=9), self.devices, tolerance=0)
+        self.assertEqual(2, p['moves'])
+
+    def test_capacity(self):
+        self.devices['c']['capacity'] = 2
+        p = rebalance.plan(_bindings(a=10, b=10, c=0), self.devices, tolerance=0)
+        self.assertEqual(10, p['devices']['c']['tenants_after'])
+        self.assertEqual(10, p['moves'])
+
+    def test_removed_device_drained(self):
+        p = rebalance.plan(_bindings(a=5, b=5, c=5, gone=3), self.devices)
+        gone = [m for m in self.moves(p) if m['from'] == 'gone']
+        self.assertEqual(3, len(gone))
+        self.assertEqual(0, p['devices']['gone']['tenants_after'])
+
+    def test_standby_neither_gives_nor_takes(self):
+        self.devices['c']['ha_role'] = 'standby'
+        p = rebalance.plan(_bindings(a=20, b=0, c=7), self.devices, tolerance=0)
+        self.assertEqual(7, p['devices']['c']['tenants_after'])
+        self.assertEqual(10, p['moves'])
+
+    def test_steps_by_partition(self):
+        p = rebalance.plan(_bindings(a=15, b=15), self.devices, tolerance=0)
+        steps = dict(((s['device'], s['partition']), s['moves']) for s in p['steps'])
+        self.assertEqual(5, len(steps[('b', 'shared')]))
+        adp = [k for k in steps if k[0] == 'a']
+        self.assertEqual(5, len(adp))
+        for device_name, partition in adp:
+            self.assertEqual(steps[(device_name, partition)][0]['tenant_id'][0:13], partition)
+
+    def test_write_plan(self):
+        d = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, d)
+        path = os.path.join(d, 'plan.json')
+        p = rebalance.plan(_bindings(a=15, b=15), self.devices)
+        rebalance.write_plan(p, path)
+        with open(path) as f:
+            self.assertEqual(p, json.load(f))
+        self.assertEqual(['plan.json'], os.listdir(d))
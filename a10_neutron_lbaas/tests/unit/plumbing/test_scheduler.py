@@ -0,0 +1,103 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import acos_client
+
+from a10_neutron_lbaas import a10_exceptions as a10_ex
+from a10_neutron_lbaas.plumbing import scheduler
+from a10_neutron_lbaas.tests import test_case
+
+
+def _devices(**kwargs):
+    return dict((k, dict(v, name=k)) for k, v in kwargs.items())
+
+
+class TestDeviceScheduler(test_case.TestCase):
+
+    def setUp(self):
+        self.config = {
+            'device_scheduling_filters': ['status', 'api_version', 'partition_quota',
+                                          'ha_role'],
+            'device_scheduling_weighers': {},
+            'device_scheduling_api_versions': None,
+        }
+        self.loads = {}
+
+    def select(self, tenant_id, devices, ring=None):
+        return scheduler.DeviceScheduler(self.config).select(
+            tenant_id, devices, lambda k: self.loads.get(k, {}), ring=ring)['name']
+
+    def test_no_weighers_is_hash(self):
+        devices = _devices(a={}, b={}, c={})
+        ring = acos_client.Hash(list(devices))
+        for t in ('t1', 't2', 't3', 't4'):
+            self.assertEqual(ring.get_server(t), self.select(t, devices))
+            self.assertEqual(ring.get_server(t), self.select(t, devices, ring=ring))
+
+    def test_filters(self):
+        devices = _devices(
+            down={'status': False},
+            old={'api_version': '2.1'},
+            full={'v_method': 'ADP', 'max_partitions': 2},
+            standby={'ha_role': 'standby'},
+            ok={'api_version': '3.0', 'v_method': 'ADP', 'max_partitions': 3})
+        self.config['device_scheduling_api_versions'] = ['3.0']
+        self.loads = {'full': {'tenants': 2}, 'ok': {'tenants': 2}}
+        self.assertEqual('ok', self.select('t1', devices))
+
+        self.loads['ok'] = {'tenants': 3}
+        self.assertRaises(a10_ex.NoDevicesAvailableError, self.select, 't1', devices)
+
+    def test_weighers_fill_by_capacity(self):
+        devices = _devices(small={'capacity': 1}, big={'capacity': 4})
+        self.config['device_scheduling_weighers'] = {'tenant_count': 1.0}
+        self.loads = {'small': {'tenants': 2}, 'big': {'tenants': 4}}
+        self.assertEqual('big', self.select('t1', devices))
+        self.loads['big'] = {'tenants': 9}
+        self.assertEqual('small', self.select('t1', devices))
+
+    def test_multipliers(self):
+        devices = _devices(a={'capacity': 2}, b={'capacity': 1})
+        self.loads = {'a': {'tenants': 10}, 'b': {'tenants': 0}}
+        self.config['device_scheduling_weighers'] = {'capacity': 1.0, 'tenant_count': 2.0}
+        self.assertEqual('b', self.select('t1', devices))
+        self.config['device_scheduling_weighers'] = {'capacity': 3.0, 'tenant_count': 2.0}
+        self.assertEqual('a', self.select('t1', devices))
+
+    def test_bounded_load_hash(self):
+        devices = _devices(a={}, b={})
+        self.config['device_hash_load_factor'] = 1.25
+        self.config['device_hash_vnodes'] = 40
+        home = self.select('t1', devices)
+        other = 'b' if home == 'a' else 'a'
+        self.loads = {home: {'tenants': 8}, other: {'tenants': 2}}
+        self.assertEqual(other, self.select('t1', devices))
+
+    def test_health(self):
+        devices = _devices(a={}, b={}, c={})
+        self.config['device_scheduling_filters'] = ['health']
+        self.config['device_scheduling_weighers'] = {'health': 1.0}
+        self.loads = {'a': {'down': 1}, 'b': {'degraded': 1}}
+        self.assertEqual('c', self.select('t1', devices))
+        self.loads['c'] = {'degraded': 1}
+        self.assertIn(self.select('t1', devices), ('b', 'c'))
+        self.loads['b'] = self.loads['c'] = {'down': 1}
+        self.assertRaises(a10_ex.NoDevicesAvailableError, self.select, 't1', devices)
+
+    def test_custom_filter(self):
+        devices = _devices(a={}, b={})
+        self.config['device_scheduling_filters'] = [lambda d, load, config: d['name'] == 'b']
+        self.assertEqual('b', self.select('t1', devices))
+
+    def test_unknown_name(self):
+        self.config['device_scheduling_weighers'] = {'bogus': 1.0}
+        self.assertRaises(a10_ex.InvalidConfig, self.select, 't1', _devices(a={}))
@@ -0,0 +1,160 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from a10_neutron_lbaas.plumbing import simple
+from a10_neutron_lbaas.plumbing import tenant_bindings
+from a10_neutron_lbaas.tests import test_case
+
+
+class FakeRow(object):
+
+    def __init__(self, id, tenant_id, device_name, updated_at):
+        self.id = id
+        self.tenant_id = tenant_id
+        self.device_name = device_name
+        self.updated_at = updated_at
+
+
+class FakeModel(object):
+
+    def __init__(self):
+        self.rows = {}
+        self.find_all_calls = 0
+        self.created = []
+
+    def put(self, id, tenant_id, device_name, updated_at):
+        self.rows[id] = FakeRow(id, tenant_id, device_name, updated_at)
+
+    def find_all(self, db_session=None):
+        self.find_all_calls += 1
+        return list(self.rows.values())
+
+    def find_updated_since(self, when, db_session=None):
+        return [r for r in self.rows.values() if r.updated_at >= when]
+
+    def version(self, db_session=None):
+        if not self.rows:
+            return (0, None)
+        return (len(self.rows), max(r.updated_at for r in self.rows.values()))
+
+    def find_by_tenant_id(self, tenant_id, db_session=None):
+        for r in self.rows.values():
+            if r.tenant_id == tenant_id:
+                return r
+
+    def create_and_save(self, tenant_id, device_name, db_session=None):
+        id = 'new%d' % len(self.created)
+        self.put(id, tenant_id, device_name, 100)
+        self.created.append(tenant_id)
+        return self.rows[id]
+
+
+class TestTenantBindingCache(test_case.TestCase):
+
+    def setUp(self):
+        self.config = {'tenant_binding_refresh_interval': 0}
+        self.model = FakeModel()
+        self.model.put('id1', 't1', 'dev1', 1)
+        self.model.put('id2', 't2', 'dev2', 2)
+        self.cache = tenant_bindings.TenantBindingCache(self.config)
+        self.cache._model = lambda: self.model
+        self.cache.load()
+
+    def test_lookup(self):
+        self.assertEqual('dev1', self.cache.get('t1'))
+        self.assertIsNone(self.cache.get('t3'))
+        self.assertEqual(1, self.model.find_all_calls)
+        self.assertEqual({'bindings': 2, 'hits': 1, 'misses': 1, 'full_loads': 1},
+                         self.cache.stats())
+
+    def test_other_worker_changes_seen(self):
+        self.model.put('id3', 't3', 'dev1', 3)
+        self.model.put('id1', 't1', 'dev2', 4)
+        self.assertEqual('dev1', self.cache.get('t3'))
+        self.assertEqual('dev2', self.cache.get('t1'))
+        self.assertEqual(1, self.model.find_all_calls)
+
+    def test_delete_forces_full_load(self):
+        del self.model.rows['id1']
+        self.assertIsNone(self.cache.get('t1'))
+        self.assertEqual(2, self.model.find_all_calls)
+
+    def test_refresh_interval(self):
+        self.config['tenant_binding_refresh_interval'] = 3600
+        self.cache.get('t1')
+        self.model.put('id1', 't1', 'dev2', 4)
+        self.assertEqual('dev1', self.cache.get('t1'))
+        self.cache.invalidate('t1')
+        self.assertEqual('dev2', self.cache.get('t1'))
+
+    def test_tenant_count(self):
+        self.model.put('id3', 't3', 'dev1', 3)
+        self.model.put('id2', 't2', 'dev1', 4)
+        self.cache.get('t1')
+        self.assertEqual(3, self.cache.tenant_count('dev1'))
+        self.assertEqual(0, self.cache.tenant_count('dev2'))
+        self.cache.invalidate('t3')
+        self.assertEqual(2, self.cache.tenant_count('dev1'))
+
+    def test_put(self):
+        self.config['tenant_binding_refresh_interval'] = 3600
+        self.cache.put(FakeRow('id3', 't3', 'dev2', 3))
+        self.assertEqual('dev2', self.cache.get('t3'))
+
+
+class TestSimpleTenantBindings(test_case.TestCase):
+
+    def setUp(self):
+        self.model = FakeModel()
+        self.model.put('id1', 't1', 'dev2', 1)
+        mock.patch.object(simple.models, 'A10TenantBinding', self.model).start()
+        mock.patch.object(tenant_bindings.TenantBindingCache, '_model',
+                          return_value=self.model).start()
+        self.addCleanup(mock.patch.stopall)
+        driver = mock.Mock()
+        driver.config = {'use_database': True, 'tenant_binding_refresh_interval': 3600}
+        self.devices = {'dev1': {'name': 'dev1'}, 'dev2': {'name': 'dev2'}}
+        self.hooks = simple.PlumbingHooks(driver, devices=self.devices)
+
+    def test_bulk_loaded_at_late_init(self):
+        self.hooks._late_init()
+        self.assertEqual(1, self.model.find_all_calls)
+        self.assertEqual('dev2', self.hooks.select_device('t1')['name'])
+        self.assertEqual(1, self.model.find_all_calls)
+
+    def test_new_binding_written_through(self):
+        self.hooks._late_init()
+        d = self.hooks.select_device('t9')
+        self.assertEqual(['t9'], self.model.created)
+        self.assertEqual(d, self.hooks.select_device('t9'))
+        self.assertEqual(['t9'], self.model.created)
+        self.assertEqual(1, self.hooks.tenant_bindings.misses)
+
+    def test_uncached_tenant_checked_in_db(self):
+        self.hooks._late_init()
+        self.model.put('id5', 't5', 'dev1', 0)
+        self.assertEqual('dev1', self.hooks.select_device('t5')['name'])
+        self.assertEqual([], self.model.created)
+
+    def test_health_in_load(self):
+        self.hooks._late_init()
+        self.hooks.driver.health.status.side_effect = (
+            lambda d: 'down' if d['name'] == 'dev1' else 'healthy')
+        self.assertEqual({'tenants': 0, 'down': 1}, self.hooks._device_load('dev1'))
+        self.assertEqual({'tenants': 1}, self.hooks._device_load('dev2'))
+
+    def test_device_load(self):
+        self.hooks._late_init()
+        self.assertEqual({'tenants': 1}, self.hooks._device_load('dev2'))
+        self.assertEqual({'tenants': 0}, self.hooks._device_load('dev1'))
@@ -0,0 +1,43 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from a10_neutron_lbaas.plumbing import utils
+from a10_neutron_lbaas.tests import test_case
+
+
+class TestIPHelpers(test_case.TestCase):
+
+    def unused(self, pools, in_use, n=100):
+        gen = utils.IPHelpers.unused_ips(pools, in_use)
+        return [ip for i, ip in zip(range(n), gen)]
+
+    def test_skips_used(self):
+        self.assertEqual(['10.0.0.3', '10.0.0.5'],
+                         self.unused([('10.0.0.2', '10.0.0.5')],
+                                     ['10.0.0.4', '10.0.0.2', '10.0.0.99']))
+
+    def test_all_pools_in_order(self):
+        pools = [('10.0.1.10', '10.0.1.11'), ('10.0.0.2', '10.0.0.3')]
+        self.assertEqual(['10.0.0.3', '10.0.1.11'],
+                         self.unused(pools, ['10.0.0.2', '10.0.1.10']))
+
+    def test_full(self):
+        self.assertEqual([], self.unused([('10.0.0.2', '10.0.0.3')], ['10.0.0.3', '10.0.0.2']))
+        self.assertEqual([], self.unused([], []))
+
+    def test_large_pool_is_lazy(self):
+        pool = [('10.0.0.1', '10.0.255.254')]
+        self.assertEqual(['10.0.0.3', '10.0.0.4'],
+                         self.unused(pool, ['10.0.0.1', '10.0.0.2'], n=2))
+
+    def test_ipv6(self):
+        self.assertEqual(['fd00::3'], self.unused([('fd00::2', 'fd00::3')], ['fd00::2']))
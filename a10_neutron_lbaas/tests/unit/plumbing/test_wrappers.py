@@ -0,0 +1,59 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from neutron_lib import exceptions as n_exc
+from oslo_db import exception as db_exc
+
+from a10_neutron_lbaas.plumbing import wrappers
+from a10_neutron_lbaas.tests import test_case
+
+SUBNET = {"id": "subnet1", "network_id": "net1", "cidr": "10.0.0.0/24"}
+
+
+class TestAllocateIp(test_case.TestCase):
+
+    def setUp(self):
+        self.session = mock.MagicMock()
+        self.db = wrappers.NeutronDbWrapper(self.session)
+        self.pools = [mock.Mock(first_ip="10.0.0.2", last_ip="10.0.0.4"),
+                      mock.Mock(first_ip="10.0.0.10", last_ip="10.0.0.10")]
+        self.in_use = ["10.0.0.2", "10.0.0.3"]
+        mock.patch.object(self.db, "get_ipallocationpools_by_subnet_id",
+                          side_effect=lambda s: self.pools).start()
+        mock.patch.object(self.db, "get_allocated_ips_by_subnet_id",
+                          side_effect=lambda s: self.in_use).start()
+        self.create = mock.patch.object(self.db, "create_ipallocation").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def allocate(self):
+        return self.db.a10_allocate_ip_from_dhcp_range(SUBNET, "vlan", None, "port1")
+
+    def test_first_free(self):
+        self.assertEqual(("10.0.0.4", "10.0.0.0/24", "port1"), self.allocate())
+        self.create.assert_called_once_with({"ip_address": "10.0.0.4", "network_id": "net1",
+                                             "port_id": "port1", "subnet_id": "subnet1"})
+        self.session.begin_nested.assert_called_once_with()
+
+    def test_next_pool(self):
+        self.in_use.append("10.0.0.4")
+        self.assertEqual("10.0.0.10", self.allocate()[0])
+
+    def test_taken_meanwhile(self):
+        self.create.side_effect = [db_exc.DBDuplicateEntry(), mock.Mock()]
+        self.assertEqual("10.0.0.10", self.allocate()[0])
+        self.assertEqual(2, self.create.call_count)
+
+    def test_full(self):
+        self.create.side_effect = db_exc.DBDuplicateEntry()
+        self.assertRaises(n_exc.IpAddressGenerationFailure, self.allocate)
+        self.assertEqual(2, self.create.call_count)
@@ -12,6 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import shutil
+import tempfile
+
+import mock
+
+from a10_neutron_lbaas import a10_config
+from a10_neutron_lbaas import device_registry
 from a10_neutron_lbaas.tests.unit import test_base
 
 
@@ -96,3 +104,86 @@ class TestA10ConfigProvider(test_base.UnitTestBase):
         v = self.a.config.get_vthunder_config()
         self.assertEqual(v['api_version'], '9.9')
         self.assertEqual(v['nova_flavor'], 'acos.min')
+
+
+class TestA10ConfigDatabaseDevices(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ConfigDatabaseDevices, self).setUp()
+        self.a.config._config.use_database = True
+        self.registry = mock.Mock()
+        self.registry.devices.return_value = {'db1': {'name': 'db1'}}
+        self.cache = device_registry.DeviceCache(self.a.config)
+        for name, value in (('get_registry', self.registry), ('get_cache', self.cache)):
+            p = mock.patch.object(device_registry, name, return_value=value)
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_get_devices_merges_registry(self):
+        devices = self.a.config.get_devices()
+        self.assertEqual(11, len(devices))
+        self.assertEqual({'name': 'db1'}, devices['db1'])
+
+    def test_invalidate_devices(self):
+        self.cache.put('db1', {'id': 'fake-id'})
+        self.a.config.invalidate_devices('fake-id')
+        self.registry.invalidate.assert_called_once_with('fake-id')
+        self.assertEqual(0, self.cache.stats()['devices'])
+
+    @mock.patch('a10_neutron_lbaas.db.models.A10DeviceInstance.find_by')
+    def test_get_device_cached(self, find_by):
+        find_by.return_value.as_dict.return_value = {'id': 'fake-id', 'name': 'db1'}
+        self.assertEqual('fake-id', self.a.config.get_device('db1')['id'])
+        self.assertEqual('fake-id', self.a.config.get_device('db1')['id'])
+        self.assertEqual(1, find_by.call_count)
+        self.assertNotIn('db1', self.a.config._devices)
+
+    @mock.patch('a10_neutron_lbaas.db.models.A10DeviceInstance.find_by')
+    def test_get_device_static_first(self, find_by):
+        self.assertEqual(8443, self.a.config.get_device('ax1')['port'])
+        find_by.assert_not_called()
+        self.assertEqual(0, self.cache.misses)
+
+
+class TestA10ConfigNameMatcher(test_base.UnitTestBase):
+
+    def test_precompiled(self):
+        expressions = self.a.config.get_vport_expressions()
+        matcher = self.a.config.get_name_matcher(expressions)
+        self.assertIs(matcher, self.a.config.get_name_matcher(expressions))
+        self.assertEqual({"setting1": True}, matcher.match("ABC123-listener"))
+
+    def test_other_table(self):
+        expressions = {"x": {"regex": "x$", "json": {"x": 1}}}
+        self.assertEqual({"x": 1}, self.a.config.get_name_matcher(expressions).match("xx"))
+
+
+class TestSharedConfig(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestSharedConfig, self).setUp()
+        p = mock.patch.object(a10_config, '_shared', {})
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_get_config_shared(self):
+        config = a10_config.get_config()
+        self.assertIs(config, a10_config.get_config())
+        self.assertIsNot(config, a10_config.get_config(provider='prov1'))
+        self.assertEqual(10, len(config.get_devices()))
+
+    def test_neutron_conf_parsed_once(self):
+        d = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, d)
+        path = os.path.join(d, 'neutron.conf')
+        with open(path, 'w') as f:
+            f.write("[database]\nconnection = sqlite://\n")
+
+        with mock.patch.object(a10_config.ini, 'ConfigParser',
+                               wraps=a10_config.ini.ConfigParser) as parser:
+            a = a10_config._read_neutron_conf(path)
+            self.assertIs(a, a10_config._read_neutron_conf(path))
+            self.assertEqual(1, parser.call_count)
+            os.utime(path, (1, 1))
+            self.assertIsNot(a, a10_config._read_neutron_conf(path))
+        self.assertIsNone(a10_config._read_neutron_conf(os.path.join(d, 'missing')))
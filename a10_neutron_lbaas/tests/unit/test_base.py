@@ -43,6 +43,7 @@ class FakeA10OpenstackLB(object):
     def _get_a10_client(self, device_info, **kwargs):
         self.device_info = device_info
         self.last_client = mock.MagicMock()
+        self.last_client.current_partition = 'shared'
         return self.last_client
 
     def reset_mocks(self):
@@ -0,0 +1,111 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+import mock
+
+from a10_neutron_lbaas import a10_config
+from a10_neutron_lbaas import config_manager
+from a10_neutron_lbaas.tests import test_case
+
+CONFIG = """
+devices = {
+    "ax1": {"host": "10.10.100.20", "username": "admin", "password": "a10"},
+    %s
+}
+vport_expressions = {
+    "web": {"regex": "web$", "json": {"x": 1}},
+}
+"""
+
+AX2 = '"ax2": {"host": "10.10.100.21", "username": "admin", "password": "a10"},'
+
+
+class TestConfigManager(test_case.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'config.py')
+        self.write(CONFIG % '', 1000)
+        self.config = a10_config.A10Config(config_dir=self.dir)
+        self.manager = config_manager.ConfigManager(self.config, self.load, self.path)
+
+    def write(self, text, mtime):
+        with open(self.path, 'w') as f:
+            f.write(text)
+        os.utime(self.path, (mtime, mtime))
+
+    def load(self, previous):
+        return a10_config.A10Config(config_dir=self.dir, previous=previous)
+
+    def test_unchanged_file(self):
+        self.assertFalse(self.manager.check())
+        self.assertIs(self.config, self.manager.current())
+
+    def test_reload(self):
+        listener = mock.Mock()
+        self.manager.add_listener(listener)
+        self.write(CONFIG % AX2, 2000)
+
+        self.assertTrue(self.manager.check())
+        new = self.manager.current()
+        self.assertIsNot(self.config, new)
+        self.assertEqual(['ax1', 'ax2'], sorted(new.get_devices()))
+        self.assertEqual(['ax1', 'ax2'], sorted(self.manager.get_devices()))
+        listener.assert_called_once_with(self.config, new)
+        self.assertFalse(self.manager.check())
+
+    def test_unchanged_parts_reused(self):
+        self.write(CONFIG % AX2, 2000)
+        self.manager.check()
+        new = self.manager.current()
+
+        self.assertIs(self.config.get_device('ax1'), new.get_device('ax1'))
+        expressions = new.get_vport_expressions()
+        self.assertIs(self.config.get_name_matcher(self.config.get_vport_expressions()),
+                      new.get_name_matcher(expressions))
+
+    def test_reload_leaves_old_vport_rules(self):
+        rules = self.config.get_vport_rules()
+        layers = dict(rules._layers)
+        self.write(CONFIG % AX2, 2000)
+        self.manager.check()
+
+        self.assertIsNot(rules, self.manager.current().get_vport_rules())
+        self.assertEqual(layers, rules._layers)
+
+    @mock.patch('a10_neutron_lbaas.device_registry.reconfigure')
+    def test_reload_reconfigures_registry(self, reconfigure):
+        self.write(CONFIG % AX2, 2000)
+        self.manager.check()
+        reconfigure.assert_called_once_with(self.manager.current())
+
+    def test_bad_file_keeps_config(self):
+        self.write("devices = {", 2000)
+        self.assertFalse(self.manager.check())
+        self.assertIs(self.config, self.manager.current())
+        self.assertEqual(1, self.manager.errors)
+        # Not retried until it changes again
+        self.assertFalse(self.manager.check())
+        self.assertEqual(1, self.manager.errors)
+
+    def test_pin(self):
+        self.manager.pin()
+        self.write(CONFIG % AX2, 2000)
+        self.manager.check()
+        self.assertIs(self.config, self.manager.current())
+        self.manager.unpin()
+        self.assertIsNot(self.config, self.manager.current())
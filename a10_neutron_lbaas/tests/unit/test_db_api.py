@@ -0,0 +1,146 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from a10_neutron_lbaas.db import api as db_api
+from a10_neutron_lbaas.db import models
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas.tests.unit.unit_config import helper
+
+URL = 'sqlite://'
+
+
+class TestDbApi(test_case.TestCase):
+
+    def setUp(self):
+        super(TestDbApi, self).setUp()
+        self.config = helper.config({'use_database': True, 'database_connection': URL,
+                                     'db_pool_pre_ping': True})
+        p = mock.patch.object(db_api, 'A10_CFG', self.config)
+        p.start()
+        self.addCleanup(p.stop)
+        self.addCleanup(db_api.dispose_engines)
+        db_api.dispose_engines()
+
+    def test_engine_cached(self):
+        engine = db_api.get_engine()
+        self.assertIs(engine, db_api.get_engine(URL))
+        self.assertIsNot(engine, db_api.get_engine('sqlite:///:memory:'))
+
+    def test_engine_args(self):
+        self.assertEqual({'pool_recycle': 3600, 'pool_pre_ping': True},
+                         db_api._engine_args(URL))
+        args = db_api._engine_args('mysql+pymysql://u:p@localhost/neutron')
+        self.assertEqual(5, args['pool_size'])
+        self.assertEqual(10, args['max_overflow'])
+        self.assertEqual(30, args['pool_timeout'])
+
+    def test_disabled(self):
+        self.config._config.use_database = False
+        self.assertRaises(Exception, db_api.get_engine)
+
+    def test_sessions_share_engine(self):
+        a = db_api.get_session()
+        b = db_api.get_session()
+        self.assertIsNot(a, b)
+        self.assertIs(a.get_bind(), b.get_bind())
+
+    def test_magic_session(self):
+        with db_api.magic_session() as db:
+            self.assertEqual(1, db.execute("select 1").scalar())
+
+    def test_pool_stats(self):
+        with db_api.magic_session() as db:
+            db.execute("select 1")
+        stats = db_api.pool_stats()
+        self.assertEqual([URL], list(stats))
+        self.assertIn('status', stats[URL])
+
+    def test_dispose(self):
+        engine = db_api.get_engine()
+        db_api.dispose_engines()
+        self.assertIsNot(engine, db_api.get_engine())
+
+
+class TestRequestSession(test_case.TestCase):
+
+    def setUp(self):
+        super(TestRequestSession, self).setUp()
+        self.config = helper.config({'use_database': True,
+                                     'database_connection': 'sqlite:///:memory:'})
+        p = mock.patch.object(db_api, 'A10_CFG', self.config)
+        p.start()
+        self.addCleanup(p.stop)
+        self.addCleanup(db_api.dispose_engines)
+        db_api.dispose_engines()
+
+    def test_lookups_share_session(self):
+        with db_api.request_session() as session:
+            with db_api.magic_session() as a, db_api.magic_session() as b:
+                self.assertIs(session, a)
+                self.assertIs(session, b)
+        self.assertIsNone(db_api.current_session())
+
+    def test_nested_joins(self):
+        outer = db_api.begin_request()
+        self.assertIs(outer, db_api.begin_request())
+        db_api.end_request()
+        self.assertIs(outer, db_api.current_session())
+        db_api.end_request()
+        self.assertIsNone(db_api.current_session())
+
+    def test_commit_once_at_end(self):
+        with mock.patch.object(db_api, 'get_session') as get_session:
+            session = get_session.return_value
+            with db_api.request_session():
+                with db_api.magic_session():
+                    pass
+                with db_api.magic_session():
+                    pass
+                self.assertFalse(session.commit.called)
+        session.commit.assert_called_once_with()
+        session.close.assert_called_once_with()
+
+    def test_rollback_on_exception(self):
+        with mock.patch.object(db_api, 'get_session') as get_session:
+            session = get_session.return_value
+
+            def fail():
+                with db_api.request_session():
+                    raise ValueError()
+
+            self.assertRaises(ValueError, fail)
+        self.assertFalse(session.commit.called)
+        session.rollback.assert_called_once_with()
+        session.close.assert_called_once_with()
+        self.assertIsNone(db_api.current_session())
+
+    def test_explicit_session_wins(self):
+        other = mock.Mock()
+        with db_api.request_session():
+            with db_api.magic_session(other) as db:
+                self.assertIs(other, db)
+
+    def test_saves_wait_for_end(self):
+        binding = models.A10TenantBinding
+        binding.__table__.create(db_api.get_engine())
+
+        def fail():
+            with db_api.request_session():
+                binding.create_and_save(tenant_id='t1', device_name='ax1')
+                binding.bulk_create_and_save([{'tenant_id': 't2', 'device_name': 'ax1'}])
+                self.assertEqual(2, len(binding.find_all()))
+                raise ValueError()
+
+        self.assertRaises(ValueError, fail)
+        self.assertEqual([], binding.find_all())
@@ -0,0 +1,169 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from a10_neutron_lbaas import device_registry
+from a10_neutron_lbaas.tests import test_case
+
+
+class FakeRow(object):
+
+    def __init__(self, id, name, updated_at):
+        self.id = id
+        self.name = name
+        self.updated_at = updated_at
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+class FakeModel(object):
+
+    def __init__(self):
+        self.rows = {}
+        self.find_all_calls = 0
+
+    def put(self, id, name, updated_at):
+        self.rows[id] = FakeRow(id, name, updated_at)
+
+    def find_all(self, db_session=None):
+        self.find_all_calls += 1
+        return list(self.rows.values())
+
+    def find_updated_since(self, when, db_session=None):
+        return [r for r in self.rows.values() if r.updated_at >= when]
+
+    def version(self, db_session=None):
+        if not self.rows:
+            return (0, None)
+        return (len(self.rows), max(r.updated_at for r in self.rows.values()))
+
+
+class TestDeviceRegistry(test_case.TestCase):
+
+    def setUp(self):
+        self.config = {'device_registry_refresh_interval': 0,
+                       'database_connection': 'sqlite://'}
+        self.model = FakeModel()
+        self.model.put('id1', 'dev1', 1)
+        self.model.put('id2', 'dev2', 2)
+        self.registry = device_registry.DeviceRegistry(self.config)
+        self.registry._model = lambda: self.model
+
+    def test_index_by_name_and_id(self):
+        devices = self.registry.devices()
+        self.assertEqual(['dev1', 'dev2'], sorted(devices))
+        self.assertEqual('dev2', self.registry.get('id2')['name'])
+        self.assertIsNone(self.registry.get('missing'))
+
+    def test_unchanged_table_not_reread(self):
+        self.registry.devices()
+        self.registry.devices()
+        self.assertEqual(1, self.model.find_all_calls)
+        self.assertEqual(0, self.registry.incremental_loads)
+
+    def test_updated_rows_loaded_incrementally(self):
+        self.registry.devices()
+        self.model.put('id3', 'dev3', 3)
+        self.model.put('id1', 'renamed', 4)
+        devices = self.registry.devices()
+        self.assertEqual(['dev2', 'dev3', 'renamed'], sorted(devices))
+        self.assertEqual(1, self.model.find_all_calls)
+        self.assertEqual(1, self.registry.incremental_loads)
+
+    def test_deleted_row_forces_full_load(self):
+        self.registry.devices()
+        del self.model.rows['id1']
+        self.assertEqual(['dev2'], sorted(self.registry.devices()))
+        self.assertEqual(2, self.model.find_all_calls)
+
+    def test_refresh_interval(self):
+        self.config['device_registry_refresh_interval'] = 3600
+        self.registry.devices()
+        self.model.put('id3', 'dev3', 3)
+        self.assertNotIn('dev3', self.registry.devices())
+        self.registry.invalidate()
+        self.assertIn('dev3', self.registry.devices())
+
+    def test_invalidate_one(self):
+        self.config['device_registry_refresh_interval'] = 3600
+        self.registry.devices()
+        del self.model.rows['id1']
+        self.registry.invalidate('id1')
+        self.assertEqual(['dev2'], sorted(self.registry.devices()))
+        self.assertEqual(1, self.model.find_all_calls)
+
+    def test_invalidate_unchanged_row_reloads(self):
+        self.registry.devices()
+        self.registry.invalidate('id1')
+        self.assertEqual(['dev1', 'dev2'], sorted(self.registry.devices()))
+
+    def test_shared_per_database(self):
+        other = {'database_connection': 'sqlite://other'}
+        with mock.patch.object(device_registry, '_registries', {}):
+            a = device_registry.get_registry(self.config)
+            self.assertIs(a, device_registry.get_registry(dict(self.config)))
+            self.assertIsNot(a, device_registry.get_registry(other))
+
+    def test_reconfigure(self):
+        new = dict(self.config)
+        with mock.patch.object(device_registry, '_registries', {}):
+            with mock.patch.object(device_registry, '_caches', {}):
+                registry = device_registry.get_registry(self.config)
+                cache = device_registry.get_cache(self.config)
+                device_registry.reconfigure(new)
+                self.assertIs(new, registry.config)
+                self.assertIs(new, cache.config)
+
+
+class TestDeviceCache(test_case.TestCase):
+
+    def setUp(self):
+        self.config = {'device_cache_size': 2, 'device_cache_ttl': 300}
+        self.cache = device_registry.DeviceCache(self.config)
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get('dev1'))
+        self.cache.put('dev1', {'id': 'id1'})
+        self.assertEqual({'id': 'id1'}, self.cache.get('dev1'))
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_lru_bound(self):
+        self.cache.put('dev1', {'id': 'id1'})
+        self.cache.put('dev2', {'id': 'id2'})
+        self.cache.get('dev1')
+        self.cache.put('dev3', {'id': 'id3'})
+        self.assertIsNone(self.cache.get('dev2'))
+        self.assertIsNotNone(self.cache.get('dev1'))
+        self.assertEqual(2, self.cache.stats()['devices'])
+
+    def test_ttl(self):
+        with mock.patch.object(device_registry.time, 'time', return_value=1000):
+            self.cache.put('dev1', {'id': 'id1'})
+        with mock.patch.object(device_registry.time, 'time', return_value=1301):
+            self.assertIsNone(self.cache.get('dev1'))
+
+    def test_disabled(self):
+        self.config['device_cache_size'] = 0
+        self.cache.put('dev1', {'id': 'id1'})
+        self.assertIsNone(self.cache.get('dev1'))
+
+    def test_evict(self):
+        self.cache.put('dev1', {'id': 'id1'})
+        self.cache.put('dev2', {'id': 'id2'})
+        self.cache.evict('id1')
+        self.assertIsNone(self.cache.get('dev1'))
+        self.assertIsNotNone(self.cache.get('dev2'))
+        self.cache.evict()
+        self.assertIsNone(self.cache.get('dev2'))
@@ -0,0 +1,51 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+from a10_neutron_lbaas import name_expressions
+from a10_neutron_lbaas.tests import test_case
+
+
+class TestNameMatcher(test_case.TestCase):
+
+    def setUp(self):
+        self.expressions = collections.OrderedDict([
+            ("begin", {"regex": "^secure", "json": {"begin": True}}),
+            ("end", {"regex": "web$", "json": {"end": True}}),
+            ("class", {"regex": "[w]{2}", "json": {"class": True}}),
+            ("dot", {"regex": "^a.c", "json": {"dot": True}}),
+        ])
+        self.matcher = name_expressions.NameMatcher(self.expressions)
+
+    def test_literal_prefix(self):
+        self.assertEqual("secure", name_expressions._literal_prefix("^secure"))
+        self.assertIsNone(name_expressions._literal_prefix("^a.c"))
+        self.assertIsNone(name_expressions._literal_prefix("secure"))
+
+    def test_first_match_wins(self):
+        self.assertEqual({"begin": True}, self.matcher.match("secureweb"))
+        self.assertEqual({"end": True}, self.matcher.match("lbweb"))
+        self.assertEqual({"class": True}, self.matcher.match("lbwwlb"))
+
+    def test_regex_prefix(self):
+        self.assertEqual({"dot": True}, self.matcher.match("abc"))
+        self.assertIsNone(self.matcher.match("a.b"))
+
+    def test_no_match(self):
+        self.assertIsNone(self.matcher.match("mylb"))
+
+    def test_memo(self):
+        self.matcher.match("lbweb")
+        self.matcher._rules = []
+        self.assertEqual({"end": True}, self.matcher.match("lbweb"))
+        self.assertIsNone(self.matcher.match("secure"))
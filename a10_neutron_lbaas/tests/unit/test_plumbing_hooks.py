@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 from a10_neutron_lbaas.tests.unit import test_base
 
 from a10_neutron_lbaas import plumbing_hooks
@@ -25,3 +27,18 @@ class TestPlumbingHooks(test_base.UnitTestBase):
         a = hooks.select_device("first-token")
         hooks.select_device("second-token")
         self.assertEqual(a, hooks.select_device("first-token"))
+
+    def test_config_reloaded(self):
+        hooks = plumbing_hooks.PlumbingHooks(self.a)
+        hooks.select_device("first-token")
+        ring = hooks.appliance_hash
+
+        new_config = mock.Mock()
+        new_config.get_devices.return_value = dict(hooks.devices)
+        hooks.config_reloaded(self.a.config, new_config)
+        self.assertIs(ring, hooks.appliance_hash)
+
+        new_config.get_devices.return_value = {'ax1': self.a.config.get_device('ax1')}
+        hooks.config_reloaded(self.a.config, new_config)
+        self.assertIsNot(ring, hooks.appliance_hash)
+        self.assertEqual('ax1', hooks.select_device("first-token")['name'])
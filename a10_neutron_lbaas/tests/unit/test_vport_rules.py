@@ -0,0 +1,77 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from a10_neutron_lbaas import a10_exceptions as a10_ex
+from a10_neutron_lbaas.tests import test_case
+from a10_neutron_lbaas import vport_rules
+
+
+def http_only(value):
+    return {"value": value,
+            "condition": {"field": "protocol", "op": "in", "value": ["HTTP", "HTTPS"]}}
+
+
+class TestVportRules(test_case.TestCase):
+
+    def setUp(self):
+        self.rules = vport_rules.VportRules()
+
+    def test_plain_values(self):
+        rv = self.rules.resolve([{"gslb-enable": 1}, None, {}], "TCP")
+        self.assertEqual({"gslb-enable": 1}, rv)
+
+    def test_later_layer_wins(self):
+        rv = self.rules.resolve([{"a": 1, "b": 1}, {"b": 2}], "tcp")
+        self.assertEqual({"a": 1, "b": 2}, rv)
+
+    def test_condition(self):
+        layers = [{"template-cache": http_only("cache1")}]
+        self.assertEqual({"template-cache": "cache1"}, self.rules.resolve(layers, "HTTP"))
+        self.assertEqual({}, self.rules.resolve(layers, "TCP"))
+
+    def test_override_replaces_condition(self):
+        layers = [{"x": http_only(1)}, {"x": 2}]
+        self.assertEqual({"x": 2}, self.rules.resolve(layers, "tcp"))
+
+    def test_builtin_conditions(self):
+        layers = [{"ha-conn-mirror": 1, "template-http": "t", "no-dest-nat": 1}]
+        self.assertEqual({"ha-conn-mirror": 1, "no-dest-nat": 1},
+                         self.rules.resolve(layers, "UDP"))
+        self.assertEqual({"template-http": "t"}, self.rules.resolve(layers, "https"))
+
+    def test_explicit_condition_beats_builtin(self):
+        layers = [{"no-dest-nat": {"value": 1, "condition": {
+            "field": "protocol", "op": "!=", "value": "tcp"}}}]
+        self.assertEqual({"no-dest-nat": 1}, self.rules.resolve(layers, "http"))
+        self.assertEqual({}, self.rules.resolve(layers, "tcp"))
+
+    def test_memoized(self):
+        layers = [{"a": 1}]
+        self.rules.resolve(layers, "tcp")
+        self.rules._merge = None
+        rv = self.rules.resolve(layers, "TCP")
+        self.assertEqual({"a": 1}, rv)
+        rv["b"] = 2
+        self.assertEqual({"a": 1}, self.rules.resolve(layers, "tcp"))
+
+    def test_bad_condition(self):
+        self.assertRaises(a10_ex.InvalidConfig, self.rules.layer,
+                          {"x": {"value": 1, "condition": {"field": "port", "op": "=",
+                                                           "value": 80}}})
+        self.assertRaises(a10_ex.InvalidConfig, self.rules.layer,
+                          {"x": {"value": 1, "condition": {"field": "protocol", "op": "~",
+                                                           "value": "tcp"}}})
+
+    def test_apply_builtin(self):
+        args = {"template-http": "t", "template_client_ssl": "s"}
+        vport_rules.apply_builtin(args, "TCP")
+        self.assertEqual({"template_client_ssl": "s"}, args)
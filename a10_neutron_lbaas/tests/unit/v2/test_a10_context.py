@@ -12,10 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import acos_client.errors as acos_errors
 import mock
+import requests
 import sys
 import types
 
+from a10_neutron_lbaas import a10_exceptions as a10_ex
+from a10_neutron_lbaas import config_manager
 from a10_neutron_lbaas.tests.unit.v2 import fake_objs
 from a10_neutron_lbaas.tests.unit.v2 import test_base
 from a10_neutron_lbaas.v2 import v2_context as a10
@@ -188,3 +192,402 @@ class TestA10ContextHA(TestA10Context):
             c
         self.a.last_client.ha.sync.assert_called_with('1.1.1.1', 'admin', 'a10')
         self.a.last_client.session.close.assert_called_with()
+
+
+class TestA10ContextWriteMemory(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ContextWriteMemory, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_status_after_write(self):
+        calls = mock.Mock()
+        self.a.openstack_driver.pool.successful_completion = calls.successful_completion
+        with a10.A10WriteStatusContext(self.handler, self.ctx, self.m,
+                                       device_name='ax-write') as c:
+            c.client.system.action.activate_and_write = calls.activate_and_write
+        self.assertEqual(['activate_and_write', 'successful_completion'],
+                         [x[0] for x in calls.mock_calls])
+        self.assertEqual(1, self.a.write_scheduler.writes)
+
+    def test_write_failure_reports_failed(self):
+        manager = self.a.openstack_driver.pool
+        manager.successful_completion = mock.Mock()
+        manager.failed_completion = mock.Mock()
+
+        def write():
+            with a10.A10WriteStatusContext(self.handler, self.ctx, self.m,
+                                           device_name='ax-write') as c:
+                c.client.system.action.activate_and_write.side_effect = FakeException()
+
+        self.assertRaises(FakeException, write)
+        self.assertFalse(manager.successful_completion.called)
+        manager.failed_completion.assert_called_once_with(self.ctx, self.m)
+
+
+class TestA10ContextPartition(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ContextPartition, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_activate(self):
+        with a10.A10Context(self.handler, self.ctx, self.m, device_name='axadp-alt') as c:
+            c.client.system.partition.active.assert_called_once_with('mypart')
+
+    def test_create_when_not_found(self):
+        self.a.hooks.partition_create = mock.Mock()
+        with mock.patch.object(self.a.session_pool, 'client_factory') as get_client:
+            client = get_client.return_value
+            client.system.partition.active.side_effect = [acos_errors.NotFound(), None]
+            with a10.A10Context(self.handler, self.ctx, self.m, device_name='axadp-alt'):
+                pass
+        self.a.hooks.partition_create.assert_called_once_with(client, self.ctx, 'mypart')
+        self.assertEqual(2, client.system.partition.active.call_count)
+
+    def test_created_meanwhile(self):
+        self.a.hooks.partition_create = mock.Mock(side_effect=acos_errors.Exists())
+        with mock.patch.object(self.a.session_pool, 'client_factory') as get_client:
+            client = get_client.return_value
+            client.system.partition.active.side_effect = [acos_errors.NotFound(), None]
+            with a10.A10Context(self.handler, self.ctx, self.m, device_name='axadp-alt'):
+                pass
+        self.assertEqual(2, client.system.partition.active.call_count)
+
+    def test_shared_resets_pooled_session(self):
+        with mock.patch.object(self.a.session_pool, 'client_factory') as get_client:
+            get_client.return_value.current_partition = 'mypart'
+            with a10.A10Context(self.handler, self.ctx, self.m, device_name='ax1') as c:
+                c.client.system.partition.active.assert_called_once_with('shared')
+
+
+class TestA10ContextTiming(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ContextTiming, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_phases(self):
+        self.a.hooks.a10_context_phase_timing = mock.Mock()
+        with a10.A10WriteStatusContext(self.handler, self.ctx, self.m, device_name='ax4'):
+            pass
+        phases = set(k[0] for k in self.a.metrics.snapshot())
+        self.assertEqual(set(['device', 'queue', 'client', 'partition_key', 'partition',
+                              'body', 'write_memory', 'ha_sync', 'status', 'total']), phases)
+        key = [k for k in self.a.metrics.snapshot() if k[0] == 'total'][0]
+        self.assertEqual(('total', 'PoolHandler', '', 'ax4', 'shared'), key)
+        self.assertEqual(10, self.a.hooks.a10_context_phase_timing.call_count)
+
+    def test_body_recorded_on_error(self):
+        try:
+            with a10.A10WriteStatusContext(self.handler, self.ctx, self.m, device_name='ax4'):
+                raise FakeException()
+        except FakeException:
+            pass
+        phases = set(k[0] for k in self.a.metrics.snapshot())
+        self.assertIn('body', phases)
+        self.assertIn('status', phases)
+        self.assertNotIn('write_memory', phases)
+
+
+class TestA10BatchContext(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10BatchContext, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key',
+                                    autospec=True,
+                                    side_effect=lambda c: setattr(c, 'partition_key', c.tenant_id))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(self.a.session_pool, 'client_factory',
+                                    wraps=self.a.session_pool.client_factory)
+        self.client_factory = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = mock.Mock()
+        manager = self.a.openstack_driver.pool
+        manager.successful_completion = self.calls.successful_completion
+        manager.failed_completion = self.calls.failed_completion
+
+    def _batch(self):
+        return a10.A10BatchContext(self.handler, self.ctx, self.m, device_name='ax-write')
+
+    def _status(self, obj):
+        return a10.A10WriteStatusContext(self.handler, self.ctx, obj, device_name='ax-write')
+
+    def test_one_session_one_write(self):
+        m2 = fake_objs.FakeLoadBalancer()
+        with self._batch() as b:
+            b.client.system.action.activate_and_write = self.calls.activate_and_write
+            with self._status(self.m) as c1:
+                self.assertIs(b.client, c1.client)
+            with self._status(m2) as c2:
+                self.assertIs(b.client, c2.client)
+            self.calls.successful_completion.assert_not_called()
+        self.assertEqual(['activate_and_write', 'successful_completion',
+                          'successful_completion'],
+                         [x[0] for x in self.calls.mock_calls])
+        self.assertEqual(1, self.client_factory.call_count)
+        b.client.session.close.assert_called_once_with()
+
+    def test_failure_reports_all_failed(self):
+        try:
+            with self._batch() as b:
+                with self._status(self.m):
+                    pass
+                raise FakeException()
+        except FakeException:
+            pass
+        self.calls.failed_completion.assert_called_once_with(self.ctx, self.m)
+        self.calls.successful_completion.assert_not_called()
+        b.client.system.action.activate_and_write.assert_not_called()
+
+    def test_delete_reported_after_batch(self):
+        with self._batch() as b:
+            b.client.system.action.activate_and_write = self.calls.activate_and_write
+            with a10.A10DeleteContext(self.handler, self.ctx, self.m, device_name='ax-write'):
+                pass
+            self.calls.successful_completion.assert_not_called()
+        self.assertEqual(['activate_and_write', 'successful_completion'],
+                         [x[0] for x in self.calls.mock_calls])
+        self.calls.successful_completion.assert_called_once_with(self.ctx, self.m, delete=True)
+
+    def test_failed_batch_reports_no_delete(self):
+        try:
+            with self._batch():
+                with a10.A10DeleteContext(self.handler, self.ctx, self.m,
+                                          device_name='ax-write'):
+                    pass
+                raise FakeException()
+        except FakeException:
+            pass
+        self.calls.successful_completion.assert_not_called()
+        self.calls.failed_completion.assert_called_once_with(self.ctx, self.m)
+
+    def test_other_tenant_not_joined(self):
+        other = fake_objs.FakeLoadBalancer()
+        other.tenant_id = 'someone-else'
+        with self._batch() as b:
+            with self._status(other) as c:
+                self.assertIsNot(b.client, c.client)
+            self.calls.successful_completion.assert_called_once_with(self.ctx, other)
+
+
+class TestA10ContextCircuitBreaker(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ContextCircuitBreaker, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fails_fast_when_open(self):
+        client = mock.MagicMock()
+        type(client.session).id = mock.PropertyMock(
+            side_effect=requests.exceptions.ConnectionError())
+        with mock.patch.object(self.a.session_pool, 'client_factory',
+                               return_value=client) as client_factory:
+            for i in range(self.a.config.get('circuit_breaker_threshold')):
+                self.assertRaises(requests.exceptions.ConnectionError,
+                                  a10.A10Context(self.handler, self.ctx, self.m,
+                                                 device_name='ax1').__enter__)
+            calls = client_factory.call_count
+            self.assertRaises(a10_ex.DeviceUnavailable,
+                              a10.A10Context(self.handler, self.ctx, self.m,
+                                             device_name='ax1').__enter__)
+            self.assertEqual(calls, client_factory.call_count)
+
+    def test_pooled_session_is_no_answer(self):
+        breaker = self.a.circuit_breaker
+        breaker.failure(self.a.config.get_device('ax1'))
+        self.assertEqual(1, breaker._devices['10.10.100.20'].failures)
+        with a10.A10Context(self.handler, self.ctx, self.m, device_name='ax1'):
+            # Logged in already; the device hasn't said anything yet
+            self.assertEqual(1, breaker._devices['10.10.100.20'].failures)
+        self.assertEqual(0, breaker._devices['10.10.100.20'].failures)
+
+
+class TestA10ContextHealth(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ContextHealth, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fails_fast_when_down(self):
+        device = self.a.config.get_device('ax1')
+        for i in range(self.a.config.get('health_check_down_failures')):
+            self.a.health.record(device, exc_value=requests.exceptions.ConnectionError())
+        with mock.patch.object(self.a.session_pool, 'client_factory') as client_factory:
+            self.assertRaises(a10_ex.DeviceUnavailable,
+                              a10.A10Context(self.handler, self.ctx, self.m,
+                                             device_name='ax1').__enter__)
+            self.assertEqual(0, client_factory.call_count)
+
+        self.a.health.record(device, latency=0.1)
+        with a10.A10Context(self.handler, self.ctx, self.m, device_name='ax1'):
+            pass
+
+
+class TestA10ContextConcurrency(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ContextConcurrency, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.device = self.a.config.get_device('ax1')
+        self.device['max_concurrent_sessions'] = 1
+        self.addCleanup(self.device.pop, 'max_concurrent_sessions')
+
+    def test_slot_released(self):
+        for i in range(2):
+            with a10.A10Context(self.handler, self.ctx, self.m, device_name='ax1'):
+                self.assertEqual(1, self.a.concurrency.stats()['10.10.100.20']['active'])
+        self.assertEqual(0, self.a.concurrency.stats()['10.10.100.20']['active'])
+
+    def test_slot_released_when_enter_fails(self):
+        with mock.patch.object(a10.a10_context.A10Context, 'select_appliance_partition',
+                               side_effect=FakeException()):
+            self.assertRaises(FakeException,
+                              a10.A10Context(self.handler, self.ctx, self.m,
+                                             device_name='ax1').__enter__)
+        self.assertEqual(0, self.a.concurrency.stats()['10.10.100.20']['active'])
+
+    def test_slot_released_when_write_memory_fails(self):
+        e = FakeException()
+
+        def write():
+            with a10.A10WriteContext(self.handler, self.ctx, self.m, device_name='ax1') as c:
+                c.client.system.action.activate_and_write.side_effect = e
+                return c
+
+        with mock.patch.object(self.a.session_pool, 'release') as release:
+            with mock.patch.object(self.a.circuit_breaker, 'record') as record:
+                self.assertRaises(FakeException, write)
+        self.assertEqual(0, self.a.concurrency.stats()['10.10.100.20']['active'])
+        self.assertIs(e, release.call_args[0][2])
+        self.assertIs(e, record.call_args[0][1])
+
+
+class TestA10ContextConfigSnapshot(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ContextConfigSnapshot, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.old = self.a.config
+        self.new = mock.Mock()
+        self.a.config_manager = config_manager.ConfigManager(self.old, None, '/nonexistent')
+        self.addCleanup(setattr, self.a, 'config_manager', None)
+
+    def swap(self):
+        self.a.config_manager._config = self.new
+
+    def test_context_keeps_snapshot(self):
+        with a10.A10Context(self.handler, self.ctx, self.m, device_name='ax1'):
+            self.swap()
+            self.assertIs(self.old, self.a.config)
+        self.assertIs(self.new, self.a.config)
+
+    def test_unpinned_when_enter_fails(self):
+        with mock.patch.object(a10.a10_context.A10Context, 'select_appliance_partition',
+                               side_effect=FakeException()):
+            self.assertRaises(FakeException,
+                              a10.A10Context(self.handler, self.ctx, self.m,
+                                             device_name='ax1').__enter__)
+        self.swap()
+        self.assertIs(self.new, self.a.config)
+
+    def test_unpinned_when_write_memory_fails(self):
+        def write():
+            with a10.A10WriteContext(self.handler, self.ctx, self.m, device_name='ax1') as c:
+                c.client.system.action.activate_and_write.side_effect = FakeException()
+
+        self.assertRaises(FakeException, write)
+        self.swap()
+        self.assertIs(self.new, self.a.config)
+
+
+class TestA10ContextDbSession(test_base.UnitTestBase):
+
+    def setUp(self):
+        super(TestA10ContextDbSession, self).setUp()
+        self.handler = self.a.pool
+        self.ctx = mock.Mock()
+        self.m = fake_objs.FakeLoadBalancer()
+        patcher = mock.patch.object(a10.a10_context.A10Context, 'get_partition_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.a.config._config.use_database = True
+        self.db_api = mock.patch.object(a10.a10_context, 'db_api').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_one_session_for_selection(self):
+        with a10.A10Context(self.handler, self.ctx, self.m, device_name='ax1') as c:
+            # Committed before the body makes its AXAPI calls
+            self.db_api.end_request.assert_called_once_with(None)
+            self.assertIsNone(c.db_session)
+        self.db_api.begin_request.assert_called_once_with()
+        self.db_api.end_request.assert_called_once_with(None)
+
+    def test_body_error_after_commit(self):
+        try:
+            with a10.A10Context(self.handler, self.ctx, self.m, device_name='ax1'):
+                raise FakeException()
+        except FakeException:
+            pass
+        self.db_api.end_request.assert_called_once_with(None)
+
+    def test_commit_failure_releases(self):
+        self.db_api.end_request.side_effect = FakeException()
+        with mock.patch.object(self.a.session_pool, 'release') as release:
+            self.assertRaises(FakeException,
+                              a10.A10Context(self.handler, self.ctx, self.m,
+                                             device_name='ax1').__enter__)
+        self.assertEqual(1, release.call_count)
+
+    def test_ended_when_enter_fails(self):
+        with mock.patch.object(a10.a10_context.A10Context, 'select_appliance_partition',
+                               side_effect=FakeException()):
+            self.assertRaises(FakeException,
+                              a10.A10Context(self.handler, self.ctx, self.m,
+                                             device_name='ax1').__enter__)
+        self.assertEqual(1, self.db_api.end_request.call_count)
+
+    def test_no_session_without_database(self):
+        self.a.config._config.use_database = False
+        with a10.A10Context(self.handler, self.ctx, self.m, device_name='ax1') as c:
+            self.assertIsNone(c.db_session)
+        self.assertFalse(self.db_api.begin_request.called)
@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 from a10_neutron_lbaas.tests.unit.v2 import fake_objs
 from a10_neutron_lbaas.tests.unit.v2 import test_base
 
@@ -51,3 +53,19 @@ class TestL7Policy(test_base.HandlerTestBase):
         self.a.l7policy.delete(None, m)
         sm = str(self.a.last_client.mock_calls)
         self.assertTrue('fake-listen-id-001' in sm)
+
+    def test_create_l7policy_one_write(self):
+        lb = fake_objs.FakeLoadBalancer()
+        flist = fake_objs.FakeListener('HTTP', 80, pool=None,
+                                       loadbalancer=lb)
+        flist.loadbalancer_id = "fake-lb-id-001"
+        m = fake_objs.FakeL7Policy(flist, "REDIRECT_TO_URL", None,
+                                   "http//:google.com", 23)
+        with mock.patch.object(self.a.session_pool, 'client_factory',
+                               wraps=self.a.session_pool.client_factory) as client_factory:
+            self.a.l7policy.create(None, m)
+        self.assertEqual(1, client_factory.call_count)
+        self.a.last_client.system.action.activate_and_write.assert_called_once_with('shared')
+        self.a.openstack_driver.l7policy.successful_completion.assert_called_once_with(None, m)
+        self.a.openstack_driver.listener.successful_completion.assert_called_once_with(
+            None, flist)
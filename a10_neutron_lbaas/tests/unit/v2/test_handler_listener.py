@@ -19,6 +19,7 @@ from a10_neutron_lbaas.tests.unit.v2 import fake_objs
 from a10_neutron_lbaas.tests.unit.v2 import test_base
 
 import a10_neutron_lbaas.a10_exceptions as a10_ex
+from a10_neutron_lbaas.acos import openstack_mappings
 from a10_neutron_lbaas import constants
 
 LOG = logging.getLogger(__name__)
@@ -439,6 +440,34 @@ class TestListeners(test_base.HandlerTestBase):
         self.assertIn("vport.create", s)
         self.assertIn(str(expected), s)
 
+    def _test_create_vport_defaults_condition(self, p):
+        self._set_device_config("vport_defaults", {
+            "ha-conn-mirror": 1,
+            "template-cache": {"value": "cache1", "condition": {
+                "field": "protocol", "op": "in", "value": ["http", "https"]}},
+        })
+
+        lb = fake_objs.FakeLoadBalancer()
+        pool = fake_objs.FakePool(p, 'ROUND_ROBIN', None)
+        m = fake_objs.FakeListener(p, 2222, pool=pool,
+                                   loadbalancer=lb)
+        with mock.patch.object(openstack_mappings, 'vip_protocols', return_value=p):
+            self.a.listener.create(None, m)
+
+        s = str(self.a.last_client.mock_calls)
+        self.assertIn("vport.create", s)
+        return s
+
+    def test_create_vport_defaults_condition_tcp(self):
+        s = self._test_create_vport_defaults_condition('TCP')
+        self.assertIn("'ha-conn-mirror': 1", s)
+        self.assertNotIn("template-cache", s)
+
+    def test_create_vport_defaults_condition_http(self):
+        s = self._test_create_vport_defaults_condition('HTTP')
+        self.assertNotIn("ha-conn-mirror", s)
+        self.assertIn("'template-cache': 'cache1'", s)
+
     def test_create_vport_defaults_global(self):
         expected = self.a.config.get_vport_defaults()
 
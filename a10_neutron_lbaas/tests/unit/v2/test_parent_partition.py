@@ -17,6 +17,7 @@ import mock
 
 from a10_neutron_lbaas.tests.unit.v2 import fake_objs
 from a10_neutron_lbaas.tests.unit.v2 import test_base
+from a10_neutron_lbaas.vthunder import keystone as keystone_helpers
 
 
 class TestA10PartitionKey(test_base.UnitTestBase):
@@ -33,12 +34,17 @@ class TestA10PartitionKey(test_base.UnitTestBase):
         self.ctx = self._build_openstack_context()
         self.m = fake_objs.FakeLoadBalancer()
 
+    def _patch_keystone(self, fake_keystone):
+        patcher = mock.patch.object(keystone_helpers, 'KeystoneFromContext',
+                                    return_value=fake_keystone)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
     def test_use_parent(self):
         fake_keystone = mock.MagicMock()
         fake_keystone.client.projects.get = mock.MagicMock(
             return_value=fake_objs.FakeKeystoneClient("brick"))
-        a10.a10_context.keystone_helpers.KeystoneFromContext = mock.MagicMock(
-            return_value=fake_keystone)
+        self._patch_keystone(fake_keystone)
 
         with a10.A10WriteContext(self.handler, self.ctx, self.m, device_name='axadp-noalt') as c:
             self.assertEqual(c.partition_key, "brick")
@@ -47,8 +53,67 @@ class TestA10PartitionKey(test_base.UnitTestBase):
         fake_keystone = mock.MagicMock()
         fake_keystone.client.projects.get = mock.MagicMock(
             return_value=fake_objs.FakeKeystoneClient())
-        a10.a10_context.keystone_helpers.KeystoneFromContext = mock.MagicMock(
-            return_value=fake_keystone)
+        self._patch_keystone(fake_keystone)
 
         with a10.A10WriteContext(self.handler, self.ctx, self.m, device_name='axadp-noalt') as c:
             self.assertEqual(c.partition_key, "get-off-my-lawn")
+
+    def test_parent_cached(self):
+        fake_keystone = mock.MagicMock()
+        fake_keystone.client.projects.get = mock.MagicMock(
+            return_value=fake_objs.FakeKeystoneClient("brick"))
+        self._patch_keystone(fake_keystone)
+
+        for i in range(2):
+            with a10.A10WriteContext(self.handler, self.ctx, self.m,
+                                     device_name='axadp-noalt') as c:
+                self.assertEqual(c.partition_key, "brick")
+        fake_keystone.client.projects.get.assert_called_once_with(self.m.tenant_id)
+
+
+class TestA10RemainingRootObjects(test_base.UnitTestBase):
+
+    def setUp(self, **kwargs):
+        super(TestA10RemainingRootObjects, self).setUp(**kwargs)
+        self.handler = self.a.pool
+        self.handler.neutron = mock.Mock()
+        self.ctx = mock.Mock()
+        self.fake_keystone = mock.MagicMock()
+        self.fake_keystone.client.projects.list.return_value = [
+            mock.Mock(id='child1', parent_id='brick'),
+            mock.Mock(id='child2', parent_id='brick'),
+        ]
+        patcher = mock.patch.object(keystone_helpers, 'KeystoneFromContext',
+                                    return_value=self.fake_keystone)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+    def _remaining(self):
+        c = a10.A10DeleteContext(self.handler, self.ctx, fake_objs.FakeLoadBalancer())
+        c.tenant_id = 'child1'
+        c.partition_key = 'brick'
+        return c.remaining_root_objects()
+
+    def test_children_cached(self):
+        self.handler.neutron.loadbalancer_parent.return_value = 1
+        self.assertEqual(1, self._remaining())
+        self.assertEqual(1, self._remaining())
+        self.fake_keystone.client.projects.list.assert_called_once_with(parent='brick')
+        self.handler.neutron.loadbalancer_parent.assert_called_with(
+            self.ctx, ['child1', 'child2'])
+
+    def test_refresh_before_reporting_empty(self):
+        self.handler.neutron.loadbalancer_parent.return_value = 1
+        self._remaining()
+        self.handler.neutron.loadbalancer_parent.return_value = 0
+        self.assertEqual(0, self._remaining())
+        self.assertEqual(2, self.fake_keystone.client.projects.list.call_count)
+
+    def test_expired_children_not_refetched(self):
+        self.handler.neutron.loadbalancer_parent.return_value = 0
+        self._remaining()
+        with mock.patch('time.time', return_value=10 ** 10):
+            self.assertFalse(self.a.projects.has_children('brick'))
+            self.assertEqual(0, self._remaining())
+        # Expired entry: one fresh list, no second list to double-check it
+        self.assertEqual(2, self.fake_keystone.client.projects.list.call_count)
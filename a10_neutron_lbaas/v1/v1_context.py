@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+
 import a10_neutron_lbaas.a10_context as a10_context
 
 
@@ -23,34 +25,33 @@ class A10WriteContext(a10_context.A10WriteContext):
     pass
 
 
+class A10BatchContext(a10_context.A10BatchContext):
+    pass
+
+
 class A10WriteStatusContext(a10_context.A10WriteContext):
 
     def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None:
-            self.openstack_driver._active(
-                self.openstack_context,
-                self.handler._model_type(),
-                self.openstack_lbaas_obj['id'])
-        else:
-            self.openstack_driver._failed(
-                self.openstack_context,
+        self.end_body()
+        args = (self.openstack_context,
                 self.handler._model_type(),
                 self.openstack_lbaas_obj['id'])
-
-        super(A10WriteStatusContext, self).__exit__(exc_type, exc_value,
-                                                    traceback)
+        with self.exit_after(super(A10WriteStatusContext, self).__exit__,
+                             exc_type, exc_value, traceback):
+            self.report_status(
+                exc_type is None,
+                functools.partial(self.openstack_driver._active, *args),
+                functools.partial(self.openstack_driver._failed, *args))
 
 
 class A10DeleteContext(a10_context.A10DeleteContextBase):
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None:
-            self.openstack_driver._db_delete(
-                self.openstack_context,
+    def status_callbacks(self):
+        args = (self.openstack_context,
                 self.handler._model_type(),
                 self.openstack_lbaas_obj['id'])
-
-        super(A10DeleteContext, self).__exit__(exc_type, exc_value, traceback)
+        return (functools.partial(self.openstack_driver._db_delete, *args),
+                functools.partial(self.openstack_driver._failed, *args))
 
     def remaining_root_objects(self):
         ctx = self.openstack_context
@@ -62,29 +63,29 @@ class A10DeleteContext(a10_context.A10DeleteContextBase):
 class A10WriteHMStatusContext(a10_context.A10WriteContext):
 
     def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None:
-            self.openstack_driver._hm_active(
-                self.openstack_context,
-                self.openstack_lbaas_obj['id'],
-                self.openstack_lbaas_obj['pool_id'])
-        else:
-            self.openstack_driver._hm_failed(
-                self.openstack_context,
+        self.end_body()
+        args = (self.openstack_context,
                 self.openstack_lbaas_obj['id'],
                 self.openstack_lbaas_obj['pool_id'])
-
-        super(A10WriteHMStatusContext, self).__exit__(exc_type, exc_value,
-                                                      traceback)
+        with self.exit_after(super(A10WriteHMStatusContext, self).__exit__,
+                             exc_type, exc_value, traceback):
+            self.report_status(
+                exc_type is None,
+                functools.partial(self.openstack_driver._hm_active, *args),
+                functools.partial(self.openstack_driver._hm_failed, *args))
 
 
 class A10DeleteHMContext(a10_context.A10WriteContext):
 
     def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None:
-            self.openstack_driver._hm_db_delete(
-                self.openstack_context,
-                self.openstack_lbaas_obj['id'],
-                self.openstack_lbaas_obj['pool_id'])
-
-        super(A10DeleteHMContext, self).__exit__(exc_type, exc_value,
-                                                 traceback)
+        self.end_body()
+        with self.exit_after(super(A10DeleteHMContext, self).__exit__,
+                             exc_type, exc_value, traceback):
+            if exc_type is None:
+                args = (self.openstack_context,
+                        self.openstack_lbaas_obj['id'],
+                        self.openstack_lbaas_obj['pool_id'])
+                self.report_status(
+                    True,
+                    functools.partial(self.openstack_driver._hm_db_delete, *args),
+                    functools.partial(self.openstack_driver._hm_failed, *args))
@@ -29,7 +29,9 @@ class L7PolicyHandler(handler_base_v2.HandlerBaseV2):
         set_method(file=file, script=script, size=size, action=action)
 
     def create(self, context, l7policy, **kwargs):
-        with a10.A10WriteStatusContext(self, context, l7policy) as c:
+        # The listener update below shares this session and write memory
+        with a10.A10BatchContext(self, context, l7policy), \
+                a10.A10WriteStatusContext(self, context, l7policy) as c:
             try:
                 filename = l7policy.id
                 action = "import"
@@ -81,5 +83,6 @@ class L7PolicyHandler(handler_base_v2.HandlerBaseV2):
                 pass
 
     def delete(self, context, l7policy):
-        with a10.A10DeleteContext(self, context, l7policy) as c:
+        with a10.A10BatchContext(self, context, l7policy), \
+                a10.A10DeleteContext(self, context, l7policy) as c:
             self._delete(c, context, l7policy)
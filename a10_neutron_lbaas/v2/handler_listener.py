@@ -24,6 +24,7 @@ from a10_neutron_lbaas.v2 import handler_base_v2
 from a10_neutron_lbaas.v2 import handler_persist
 from a10_neutron_lbaas.v2 import v2_context as a10
 from a10_neutron_lbaas.v2 import wrapper_certmgr as certwrapper
+from a10_neutron_lbaas import vport_rules
 
 
 LOG = logging.getLogger(__name__)
@@ -153,28 +154,8 @@ class ListenerHandler(handler_base_v2.HandlerBaseV2):
         # TODO(mdurrant): This breaks if we introduce non-template args
         # template_args.update(**self._get_vport_defaults(c, os_name))
 
-        vport_defaults = self._get_vport_defaults(c, os_name)
-
-        # ADD A CONDITION TO VPORT DEFAULTS TO FIX THIS
-        # EXAMPLE:
-        # "condition": {"field": "protocol", "op": "=", "value": "http"}}
-        if "ha-conn-mirror" in vport_defaults and protocol.lower() not in ("tcp", "udp"):
-            del vport_defaults["ha-conn-mirror"]
-
-        if "ha-conn-mirror" in template_args and protocol.lower() not in ("tcp", "udp"):
-            del template_args["ha-conn-mirror"]
-
-        if "template-http" in vport_defaults and protocol.lower() not in ("http", "https"):
-            del vport_defaults["template-http"]
-
-        if "template-http" in template_args and protocol.lower() not in ("http", "https"):
-            del template_args["template-http"]
-
-        if "no-dest-nat" in vport_defaults and protocol.lower() in ("http", "https"):
-            del vport_defaults["no-dest-nat"]
-
-        if "no-dest-nat" in template_args and protocol.lower() in ("http", "https"):
-            del template_args["no-dest-nat"]
+        vport_defaults = self._get_vport_defaults(c, os_name, protocol)
+        vport_rules.apply_builtin(template_args, protocol)
 
         if hasattr(listener, 'aflex'):
             template_args["aflex-scripts"] = listener.aflex
@@ -367,14 +348,14 @@ class ListenerHandler(handler_base_v2.HandlerBaseV2):
     def _get_device_vport_defaults(self, c):
         return c.device_cfg.get("vport_defaults")
 
-    def _get_vport_defaults(self, c, vport_name):
-        rv = {}
-        # Device-specific defaults have precedence over global
-        rv.update(self._get_global_vport_defaults(c))
-        rv.update(self._get_device_vport_defaults(c))
+    def _get_vport_defaults(self, c, vport_name, protocol):
+        # Device-specific defaults have precedence over global, and the
+        # matching vport expression over both
+        layers = [self._get_global_vport_defaults(c), self._get_device_vport_defaults(c)]
         if vport_name and len(vport_name) > 0:
-            self._get_name_matches(rv, vport_name, self._get_expressions(c))
-        return rv
+            matcher = self.a10_driver.config.get_name_matcher(self._get_expressions(c))
+            layers.append(matcher.match(vport_name))
+        return self.a10_driver.config.get_vport_rules().resolve(layers, protocol)
 
     def _get_expressions(self, c):
         rv = {}
@@ -12,9 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import a10_neutron_lbaas.a10_context as a10_context
+import functools
 
-from a10_neutron_lbaas.vthunder import keystone as keystone_helpers
+import a10_neutron_lbaas.a10_context as a10_context
 
 
 class A10Context(a10_context.A10Context):
@@ -25,40 +25,50 @@ class A10WriteContext(a10_context.A10WriteContext):
     pass
 
 
+class A10BatchContext(a10_context.A10BatchContext):
+    pass
+
+
 class A10WriteStatusContext(a10_context.A10WriteContext):
 
     def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None:
-            self.handler.openstack_manager.successful_completion(
-                self.openstack_context,
-                self.openstack_lbaas_obj)
-        else:
-            self.handler.openstack_manager.failed_completion(
-                self.openstack_context,
-                self.openstack_lbaas_obj)
-
-        super(A10WriteStatusContext, self).__exit__(exc_type, exc_value,
-                                                    traceback)
+        self.end_body()
+        manager = self.handler.openstack_manager
+        with self.exit_after(super(A10WriteStatusContext, self).__exit__,
+                             exc_type, exc_value, traceback):
+            self.report_status(
+                exc_type is None,
+                functools.partial(manager.successful_completion,
+                                  self.openstack_context,
+                                  self.openstack_lbaas_obj),
+                functools.partial(manager.failed_completion,
+                                  self.openstack_context,
+                                  self.openstack_lbaas_obj))
 
 
 class A10DeleteContext(a10_context.A10DeleteContextBase):
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None:
-            self.handler.openstack_manager.successful_completion(
-                self.openstack_context,
-                self.openstack_lbaas_obj,
-                delete=True)
-
-        super(A10DeleteContext, self).__exit__(exc_type, exc_value, traceback)
+    def status_callbacks(self):
+        manager = self.handler.openstack_manager
+        return (functools.partial(manager.successful_completion,
+                                  self.openstack_context,
+                                  self.openstack_lbaas_obj,
+                                  delete=True),
+                functools.partial(manager.failed_completion,
+                                  self.openstack_context,
+                                  self.openstack_lbaas_obj))
 
     def remaining_root_objects(self):
         ctx = self.openstack_context
         if self.partition_key == self.tenant_id:
             return self.handler.neutron.loadbalancer_total(ctx, self.partition_key)
         else:
-            keystone_context = keystone_helpers.KeystoneFromContext(self.a10_driver.config,
-                                                                    self.openstack_context)
-            projects = keystone_context.client.projects.list()
-            idlist = [x.id for x in projects if x.parent_id == self.partition_key]
-            return self.handler.neutron.loadbalancer_parent(ctx, idlist)
+            projects = self.a10_driver.projects
+            cached = projects.has_children(self.partition_key)
+            idlist = projects.children(ctx, self.partition_key)
+            n = self.handler.neutron.loadbalancer_parent(ctx, idlist)
+            if n == 0 and cached:
+                # A stale child list must not get an in-use partition deleted
+                idlist = projects.children(ctx, self.partition_key, refresh=True)
+                n = self.handler.neutron.loadbalancer_parent(ctx, idlist)
+            return n
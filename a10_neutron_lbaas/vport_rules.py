@@ -0,0 +1,150 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+from six import iteritems
+from six import string_types
+
+from a10_neutron_lbaas import a10_exceptions as a10_ex
+
+MEMO_SIZE = 1024
+
+FIELDS = ('protocol',)
+
+OPS = {
+    '=': lambda a, b: a == b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    'in': lambda a, b: a in b,
+    'not in': lambda a, b: a not in b,
+}
+
+# vport settings that only make sense for some protocols, applied when the
+# config gives the setting without a condition of its own.
+BUILTIN_CONDITIONS = {
+    "ha-conn-mirror": {"field": "protocol", "op": "in", "value": ["tcp", "udp"]},
+    "template-http": {"field": "protocol", "op": "in", "value": ["http", "https"]},
+    "no-dest-nat": {"field": "protocol", "op": "not in", "value": ["http", "https"]},
+}
+
+
+def _lower(value):
+    if isinstance(value, string_types):
+        return value.lower()
+    if isinstance(value, (list, tuple, set)):
+        return [_lower(x) for x in value]
+    return value
+
+
+def is_rule(value):
+    """True for {"value": ..., "condition": {...}} entries."""
+
+    return isinstance(value, dict) and set(value) == set(("value", "condition"))
+
+
+def compile_condition(condition):
+    """Turn a condition dict into a function of the facts dict."""
+
+    field = condition.get("field")
+    op = condition.get("op")
+    if field not in FIELDS:
+        raise a10_ex.InvalidConfig("vport_defaults condition on unknown field %s" % field)
+    if op not in OPS:
+        raise a10_ex.InvalidConfig("vport_defaults condition with unknown op %s" % op)
+
+    test = OPS[op]
+    value = _lower(condition.get("value"))
+    return lambda facts: test(facts[field], value)
+
+
+_BUILTIN = dict((k, compile_condition(v)) for k, v in iteritems(BUILTIN_CONDITIONS))
+
+
+class Layer(object):
+    """One vport_defaults dict, with its conditions compiled."""
+
+    def __init__(self, defaults):
+        self.defaults = defaults
+        self.entries = {}
+        for k, v in iteritems(defaults):
+            if is_rule(v):
+                self.entries[k] = (v["value"], compile_condition(v["condition"]))
+            else:
+                self.entries[k] = (v, None)
+
+
+class VportRules(object):
+    """Resolves stacked vport_defaults dicts for a protocol.
+
+    Layers (global vport_defaults, the device's vport_defaults, the json of
+    the matching vport expression) are compiled once, and the merged,
+    filtered result is remembered per (layers, protocol), so a listener
+    write is a dictionary lookup. A later layer overrides both the value
+    and the condition of an earlier one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._layers = {}
+        self._memo = {}
+
+    def layer(self, defaults):
+        with self._lock:
+            return self._layer(defaults)
+
+    def _layer(self, defaults):
+        # Keyed by identity; the stored dict keeps the id from being reused
+        entry = self._layers.get(id(defaults))
+        if entry is None or entry.defaults is not defaults:
+            if entry is not None or len(self._layers) >= MEMO_SIZE:
+                self._layers.clear()
+                self._memo.clear()
+            entry = self._layers[id(defaults)] = Layer(defaults)
+        return entry
+
+    def resolve(self, layers, protocol):
+        """The merged defaults that apply to protocol, as a new dict."""
+
+        layers = [x for x in layers if x]
+        protocol = _lower(protocol)
+        with self._lock:
+            compiled = [self._layer(x) for x in layers]
+            key = tuple(id(x) for x in layers) + (protocol,)
+            rv = self._memo.get(key)
+            if rv is None:
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.clear()
+                rv = self._memo[key] = self._merge(compiled, protocol)
+        return dict(rv)
+
+    def _merge(self, compiled, protocol):
+        merged = {}
+        for layer in compiled:
+            merged.update(layer.entries)
+
+        facts = {'protocol': protocol}
+        rv = {}
+        for k, (value, condition) in iteritems(merged):
+            condition = condition or _BUILTIN.get(k)
+            if condition is None or condition(facts):
+                rv[k] = value
+        return rv
+
+
+def apply_builtin(args, protocol):
+    """Drop the keys of args that BUILTIN_CONDITIONS rule out for protocol."""
+
+    facts = {'protocol': _lower(protocol)}
+    for k in [k for k in args if k in _BUILTIN]:
+        if not _BUILTIN[k](facts):
+            del args[k]
@@ -10,6 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import threading
+import time
+
 from keystoneauth1.identity import v2
 from keystoneauth1.identity import v3
 from keystoneauth1 import session
@@ -96,3 +100,87 @@ class KeystoneFromContext(KeystoneBase):
             raise a10_ex.InvalidConfig('keystone version must be protocol version 2 or 3')
 
         return self._get_keystone_stuff(ks_version, auth)
+
+
+class ProjectHierarchy(object):
+    """In-process index of project -> parent and parent -> children.
+
+    Entries live for keystone_project_cache_ttl seconds, and each index
+    holds at most keystone_project_cache_size entries, dropping the least
+    recently used. A ttl of 0 sends every lookup to keystone.
+    """
+
+    def __init__(self, a10_config):
+        self.config = a10_config
+        self._lock = threading.Lock()
+        self._parents = collections.OrderedDict()
+        self._children = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, entry):
+        ttl = self.config.get('keystone_project_cache_ttl')
+        return entry is not None and ttl and time.time() - entry[0] <= ttl
+
+    def _get(self, index, key):
+        with self._lock:
+            entry = index.pop(key, None)
+            if not self._fresh(entry):
+                self.misses += 1
+                return None
+            index[key] = entry
+            self.hits += 1
+            return entry
+
+    def _put(self, index, key, value):
+        if not self.config.get('keystone_project_cache_ttl'):
+            return
+        max_size = self.config.get('keystone_project_cache_size')
+        with self._lock:
+            index.pop(key, None)
+            index[key] = (time.time(), value)
+            while len(index) > max_size:
+                index.popitem(last=False)
+
+    def _client(self, openstack_context):
+        return KeystoneFromContext(self.config, openstack_context).client
+
+    def parent(self, openstack_context, project_id):
+        """The parent project, or None for a project directly under its domain."""
+
+        entry = self._get(self._parents, project_id)
+        if entry is not None:
+            return entry[1]
+
+        project = self._client(openstack_context).projects.get(project_id)
+        parent_id = None
+        if not project.parent_id == project.domain_id:
+            parent_id = project.parent_id
+        self._put(self._parents, project_id, parent_id)
+        return parent_id
+
+    def has_children(self, parent_id):
+        """Whether children() would answer parent_id from the cache."""
+
+        with self._lock:
+            return bool(self._fresh(self._children.get(parent_id)))
+
+    def children(self, openstack_context, parent_id, refresh=False):
+        """IDs of the projects directly under parent_id."""
+
+        if not refresh:
+            entry = self._get(self._children, parent_id)
+            if entry is not None:
+                return entry[1]
+
+        projects = self._client(openstack_context).projects.list(parent=parent_id)
+        ids = [x.id for x in projects if x.parent_id == parent_id]
+        self._put(self._children, parent_id, ids)
+        for project_id in ids:
+            self._put(self._parents, project_id, parent_id)
+        return ids
+
+    def invalidate(self):
+        with self._lock:
+            self._parents.clear()
+            self._children.clear()